@@ -0,0 +1,118 @@
+import time
+import logging
+import threading
+from typing import Optional
+from contextlib import contextmanager
+from .metrics import REGISTRY
+
+logging.basicConfig()
+logger = logging.getLogger('ADMISSION')
+logger.setLevel(logging.INFO)
+
+ADMITTED = REGISTRY.counter('osw_admission_admitted_total', 'Jobs admitted, by lane', labels=('lane',))
+DEFERRED = REGISTRY.counter('osw_admission_deferred_total', 'Jobs that had to wait for budget, by lane',
+                            labels=('lane',))
+WAIT_SECONDS = REGISTRY.histogram('osw_admission_wait_seconds', 'Time jobs waited for budget', labels=('lane',))
+RESERVED_BYTES = REGISTRY.gauge('osw_admission_reserved_bytes', 'Budget reserved by running jobs',
+                                labels=('resource',))
+
+
+class AdmissionController:
+    """
+    Admits validation jobs against a memory and a disk budget, estimated from the archive size
+    before anything is downloaded. A job that does not fit waits until running jobs give back
+    their share, which holds the message and keeps the listener from taking more work.
+
+    Archives above `large_job_threshold_bytes` go through a separate lane that runs at most
+    `large_job_concurrency` of them at once, so small archives keep flowing next to them.
+    A job bigger than the whole budget is only admitted once nothing else runs.
+    Jobs of unknown size are admitted as if they were empty.
+    """
+    SMALL = 'small'
+    LARGE = 'large'
+
+    def __init__(self, memory_budget_bytes: int, disk_budget_bytes: int, memory_factor: float = 20,
+                 disk_factor: float = 11, large_job_threshold_bytes: int = 256 * 1024 * 1024,
+                 large_job_concurrency: int = 1):
+        self.memory_budget_bytes = int(memory_budget_bytes)
+        self.disk_budget_bytes = int(disk_budget_bytes)
+        self.memory_factor = float(memory_factor)
+        self.disk_factor = float(disk_factor)
+        self.large_job_threshold_bytes = int(large_job_threshold_bytes)
+        self.large_job_concurrency = max(int(large_job_concurrency), 1)
+        self.memory_reserved = 0
+        self.disk_reserved = 0
+        self.running = {self.SMALL: 0, self.LARGE: 0}
+        self._waiting = {self.SMALL: [], self.LARGE: []}
+        self._condition = threading.Condition()
+        RESERVED_BYTES.set_function(lambda: {('memory',): self.memory_reserved, ('disk',): self.disk_reserved})
+
+    def estimate(self, archive_bytes: Optional[int]) -> tuple:
+        """Memory and disk a job needs: the archive and its extracted files on disk, the parsed features in memory"""
+        archive_bytes = archive_bytes or 0
+        return int(archive_bytes * self.memory_factor), int(archive_bytes * self.disk_factor)
+
+    def lane_for(self, archive_bytes: Optional[int]) -> str:
+        return self.LARGE if (archive_bytes or 0) > self.large_job_threshold_bytes else self.SMALL
+
+    @property
+    def waiting(self) -> int:
+        with self._condition:
+            return sum(len(tickets) for tickets in self._waiting.values())
+
+    @contextmanager
+    def admit(self, archive_bytes: Optional[int]):
+        """Blocks until the job fits in the budget, and gives the budget back when the block exits"""
+        memory, disk = self.estimate(archive_bytes)
+        ticket = _Ticket(lane=self.lane_for(archive_bytes), memory=memory, disk=disk,
+                         oversized=memory > self.memory_budget_bytes or disk > self.disk_budget_bytes)
+        start_time = time.perf_counter()
+        with self._condition:
+            self._waiting[ticket.lane].append(ticket)
+            if not self._can_admit(ticket):
+                DEFERRED.inc(lane=ticket.lane)
+                logger.info(f' Deferring {ticket.lane} job of {archive_bytes} bytes, {self.memory_reserved} bytes '
+                            f'of memory and {self.disk_reserved} bytes of disk are reserved')
+                while not self._can_admit(ticket):
+                    self._condition.wait()
+            self._waiting[ticket.lane].remove(ticket)
+            self.memory_reserved += memory
+            self.disk_reserved += disk
+            self.running[ticket.lane] += 1
+            # The next job of the lane may fit as well
+            self._condition.notify_all()
+        ADMITTED.inc(lane=ticket.lane)
+        WAIT_SECONDS.observe(time.perf_counter() - start_time, lane=ticket.lane)
+        try:
+            yield ticket.lane
+        finally:
+            with self._condition:
+                self.memory_reserved -= memory
+                self.disk_reserved -= disk
+                self.running[ticket.lane] -= 1
+                self._condition.notify_all()
+
+    def _can_admit(self, ticket) -> bool:
+        # First come, first served within a lane
+        if self._waiting[ticket.lane][0] is not ticket:
+            return False
+        if ticket.lane == self.LARGE and self.running[self.LARGE] >= self.large_job_concurrency:
+            return False
+        # Hold the other lane back while an oversized job waits for the running jobs to drain
+        other_lane = self.SMALL if ticket.lane == self.LARGE else self.LARGE
+        if not ticket.oversized and self._waiting[other_lane] and self._waiting[other_lane][0].oversized:
+            return False
+        if not any(self.running.values()):
+            return True
+        if ticket.oversized:
+            return False
+        return (self.memory_reserved + ticket.memory <= self.memory_budget_bytes and
+                self.disk_reserved + ticket.disk <= self.disk_budget_bytes)
+
+
+class _Ticket:
+    def __init__(self, lane: str, memory: int, disk: int, oversized: bool):
+        self.lane = lane
+        self.memory = memory
+        self.disk = disk
+        self.oversized = oversized
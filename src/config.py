@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 from pydantic import BaseSettings
 
@@ -17,7 +18,47 @@ class Settings(BaseSettings):
     app_name: str = 'python-osw-validation'
     event_bus = EventBusSettings()
     auth_permission_url: str = os.environ.get('AUTH_PERMISSION_URL', None)
+    backend_provider: str = os.environ.get('BACKEND_PROVIDER', 'core')
+    local_storage_dir: str = os.environ.get('LOCAL_STORAGE_DIR', f'{Path.cwd()}/local/storage')
+    local_topic_dir: str = os.environ.get('LOCAL_TOPIC_DIR', f'{Path.cwd()}/local/topics')
+    local_topic_poll_interval_ms: int = os.environ.get('LOCAL_TOPIC_POLL_INTERVAL_MS', 100)
+    local_topic_max_delivery_count: int = os.environ.get('LOCAL_TOPIC_MAX_DELIVERY_COUNT', 10)
     max_concurrent_messages: int = os.environ.get('MAX_CONCURRENT_MESSAGES', 2)
+    download_chunk_size: int = os.environ.get('DOWNLOAD_CHUNK_SIZE', 4 * 1024 * 1024)
+    validation_workers: int = os.environ.get('VALIDATION_WORKERS', os.environ.get('MAX_CONCURRENT_MESSAGES', 2))
+    validation_max_tasks_per_child: int = os.environ.get('VALIDATION_MAX_TASKS_PER_CHILD', 10)
+    validation_timeout_seconds: float = os.environ.get('VALIDATION_TIMEOUT_SECONDS', 300)
+    validation_timeout_per_mb_seconds: float = os.environ.get('VALIDATION_TIMEOUT_PER_MB_SECONDS', 2)
+    validation_timeout_max_seconds: float = os.environ.get('VALIDATION_TIMEOUT_MAX_SECONDS', 7200)
+    validation_fail_fast: bool = os.environ.get('VALIDATION_FAIL_FAST', False)
+    validation_file_workers: int = os.environ.get('VALIDATION_FILE_WORKERS', 0)
+    validation_streaming: bool = os.environ.get('VALIDATION_STREAMING', False)
+    validation_read_from_archive: bool = os.environ.get('VALIDATION_READ_FROM_ARCHIVE', False)
+    validation_vectorized_integrity: bool = os.environ.get('VALIDATION_VECTORIZED_INTEGRITY', False)
+    validation_compiled_schemas: bool = os.environ.get('VALIDATION_COMPILED_SCHEMAS', False)
+    validation_columnar_output: bool = os.environ.get('VALIDATION_COLUMNAR_OUTPUT', False)
+    publish_batch_size: int = os.environ.get('PUBLISH_BATCH_SIZE', 1)
+    publish_flush_interval_ms: int = os.environ.get('PUBLISH_FLUSH_INTERVAL_MS', 500)
+    permission_cache_enabled: bool = os.environ.get('PERMISSION_CACHE_ENABLED', True)
+    permission_cache_max_entries: int = os.environ.get('PERMISSION_CACHE_MAX_ENTRIES', 1024)
+    permission_cache_positive_ttl_seconds: int = os.environ.get('PERMISSION_CACHE_POSITIVE_TTL_SECONDS', 300)
+    permission_cache_negative_ttl_seconds: int = os.environ.get('PERMISSION_CACHE_NEGATIVE_TTL_SECONDS', 30)
+    gc_policy: str = os.environ.get('GC_POLICY', 'rss')
+    gc_rss_threshold_mb: int = os.environ.get('GC_RSS_THRESHOLD_MB', 1024)
+    gc_every_n_jobs: int = os.environ.get('GC_EVERY_N_JOBS', 10)
+    result_cache_enabled: bool = os.environ.get('RESULT_CACHE_ENABLED', True)
+    result_cache_dir: str = os.environ.get('RESULT_CACHE_DIR', f'{Path.cwd()}/cache/results')
+    result_cache_max_bytes: int = os.environ.get('RESULT_CACHE_MAX_BYTES', 100 * 1024 * 1024)
+    result_cache_ttl_seconds: int = os.environ.get('RESULT_CACHE_TTL_SECONDS', 24 * 60 * 60)
+    admission_enabled: bool = os.environ.get('ADMISSION_ENABLED', False)
+    admission_memory_budget_mb: int = os.environ.get('ADMISSION_MEMORY_BUDGET_MB', 4096)
+    admission_disk_budget_mb: int = os.environ.get('ADMISSION_DISK_BUDGET_MB', 20480)
+    admission_memory_factor: float = os.environ.get('ADMISSION_MEMORY_FACTOR', 20)
+    admission_disk_factor: float = os.environ.get('ADMISSION_DISK_FACTOR', 11)
+    large_job_threshold_mb: int = os.environ.get('LARGE_JOB_THRESHOLD_MB', 256)
+    large_job_concurrency: int = os.environ.get('LARGE_JOB_CONCURRENCY', 1)
+    readiness_min_free_disk_mb: int = os.environ.get('READINESS_MIN_FREE_DISK_MB', 1024)
+    readiness_min_free_memory_mb: int = os.environ.get('READINESS_MIN_FREE_MEMORY_MB', 512)
 
     @property
     def auth_provider(self) -> str:
@@ -0,0 +1,88 @@
+import os
+import hashlib
+import logging
+from typing import Optional
+
+logging.basicConfig()
+logger = logging.getLogger('FILE_DOWNLOADER')
+logger.setLevel(logging.INFO)
+
+# 4 MB, same as the default block size azure-storage-blob uses for ranged gets
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class FileDownloader:
+    """
+    Streams a storage file entity to disk in fixed-size chunks so the peak
+    memory used by a download is bounded by `chunk_size`, not by the size of the blob.
+    The sha256 of the content is computed on the way, see `content_hash`.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        chunk_size = int(chunk_size)
+        if chunk_size <= 0:
+            raise ValueError('chunk_size must be a positive number of bytes')
+        self.chunk_size = chunk_size
+        self.bytes_downloaded = 0
+        self.chunks_written = 0
+        self.content_hash = None
+
+    def download(self, file, destination: str) -> int:
+        """Writes the content of `file` to `destination` and returns the number of bytes written."""
+        return self.write_chunks(self.iter_chunks(file), destination)
+
+    def copy(self, stream, destination: str) -> int:
+        """Copies a binary file-like object to `destination` chunk by chunk."""
+        return self.write_chunks(iter(lambda: stream.read(self.chunk_size), b''), destination)
+
+    def write_chunks(self, chunks, destination: str) -> int:
+        self.bytes_downloaded = 0
+        self.chunks_written = 0
+        self.content_hash = None
+        hasher = hashlib.sha256()
+        with open(destination, 'wb') as target:
+            for chunk in chunks:
+                target.write(chunk)
+                hasher.update(chunk)
+                self.bytes_downloaded += len(chunk)
+                self.chunks_written += 1
+        self.content_hash = hasher.hexdigest()
+        logger.info(f' Downloaded {self.bytes_downloaded} bytes in {self.chunks_written} chunks')
+        return self.bytes_downloaded
+
+    @staticmethod
+    def size_of(file) -> Optional[int]:
+        """Size of the file in storage without downloading it, None when the provider cannot tell"""
+        blob_client = getattr(file, 'blob_client', None)
+        try:
+            if blob_client is not None and hasattr(blob_client, 'get_blob_properties'):
+                return int(blob_client.get_blob_properties().size)
+            file_path = getattr(file, 'file_path', None)
+            if file_path and os.path.isfile(file_path):
+                return os.path.getsize(file_path)
+        except Exception as e:
+            logger.warning(f' Could not read the size of {getattr(file, "name", file)}: {e}')
+        return None
+
+    def iter_chunks(self, file):
+        blob_client = getattr(file, 'blob_client', None)
+        if blob_client is not None and hasattr(blob_client, 'download_blob'):
+            # Azure blobs are read range by range, only one chunk is held at a time
+            stream = blob_client.download_blob(max_concurrency=1)
+            while True:
+                chunk = stream.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        elif callable(getattr(file, 'open', None)):
+            # Files of the local directory storage are read straight from disk
+            with file.open() as stream:
+                yield from iter(lambda: stream.read(self.chunk_size), b'')
+        else:
+            # Providers without a ranged read API only hand back the whole body
+            content = file.get_stream()
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            view = memoryview(content)
+            for offset in range(0, len(view), self.chunk_size):
+                yield view[offset:offset + self.chunk_size]
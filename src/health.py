@@ -0,0 +1,100 @@
+import os
+import shutil
+import datetime
+from typing import Optional
+import psutil
+
+CGROUP_MEMORY_MAX = '/sys/fs/cgroup/memory.max'
+CGROUP_MEMORY_CURRENT = '/sys/fs/cgroup/memory.current'
+
+
+def free_disk_bytes(path: str) -> int:
+    # The download directory is only created with the first job
+    while path and not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return shutil.disk_usage(path or '/').free
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path) as f:
+            value = f.read().strip()
+        return int(value) if value.isdigit() else None
+    except OSError:
+        return None
+
+
+def memory_headroom_bytes() -> int:
+    """Memory left before the container limit, or the available memory of the host when there is no limit"""
+    limit = _read_int(CGROUP_MEMORY_MAX)
+    usage = _read_int(CGROUP_MEMORY_CURRENT)
+    if limit is not None and usage is not None:
+        return max(limit - usage, 0)
+    return psutil.virtual_memory().available
+
+
+def queue_lag_seconds(published_date: Optional[str], received_at: Optional[datetime.datetime] = None) -> Optional[float]:
+    """Seconds between the publication of a message and its reception, None when the date cannot be read"""
+    if not published_date:
+        return None
+    try:
+        published_at = datetime.datetime.fromisoformat(str(published_date).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=datetime.timezone.utc)
+    received_at = received_at or datetime.datetime.now(datetime.timezone.utc)
+    return max((received_at - published_at).total_seconds(), 0.0)
+
+
+class HealthMonitor:
+    """
+    Liveness and readiness of the service.
+
+    * live: the listener thread of the validator is running
+    * ready: live, a slot is free for another job, and there is enough free disk in the download
+      directory and enough memory left for it
+    """
+
+    def __init__(self, validator, download_dir: str, min_free_disk_mb: int = 1024, min_free_memory_mb: int = 512):
+        self.validator = validator
+        self.download_dir = download_dir
+        self.min_free_disk_bytes = int(min_free_disk_mb) * 1024 * 1024
+        self.min_free_memory_bytes = int(min_free_memory_mb) * 1024 * 1024
+
+    def listener_alive(self) -> bool:
+        listener_thread = getattr(self.validator, 'listener_thread', None)
+        return bool(listener_thread and listener_thread.is_alive())
+
+    def liveness(self) -> dict:
+        listener_alive = self.listener_alive()
+        return {
+            'status': 'ok' if listener_alive else 'failed',
+            'listener_alive': listener_alive
+        }
+
+    def readiness(self) -> dict:
+        listener_alive = self.listener_alive()
+        in_flight = self.validator.jobs_in_flight if self.validator else 0
+        max_in_flight = int(self.validator.max_concurrent_messages) if self.validator else 0
+        free_disk = free_disk_bytes(self.download_dir)
+        memory_headroom = memory_headroom_bytes()
+        checks = {
+            'listener': listener_alive,
+            'capacity': in_flight < max_in_flight,
+            'disk': free_disk >= self.min_free_disk_bytes,
+            'memory': memory_headroom >= self.min_free_memory_bytes
+        }
+        return {
+            'status': 'ok' if all(checks.values()) else 'failed',
+            'checks': checks,
+            'listener_alive': listener_alive,
+            'jobs_in_flight': in_flight,
+            'max_concurrent_messages': max_in_flight,
+            'queue_lag_seconds': self.validator.queue_lag_seconds if self.validator else None,
+            'free_disk_bytes': free_disk,
+            'memory_headroom_bytes': memory_headroom
+        }
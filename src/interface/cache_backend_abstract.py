@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class CacheBackendAbstract(ABC):
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: dict) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
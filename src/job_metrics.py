@@ -0,0 +1,142 @@
+import json
+import time
+import logging
+import threading
+import psutil
+from typing import Optional
+from contextlib import contextmanager
+from .metrics import REGISTRY, DEFAULT_SIZE_BUCKETS, DEFAULT_COUNT_BUCKETS
+
+logging.basicConfig()
+logger = logging.getLogger('JOB_METRICS')
+logger.setLevel(logging.INFO)
+
+STAGE_SECONDS = REGISTRY.histogram('osw_job_stage_seconds', 'Time spent in each stage of a validation job',
+                                   labels=('stage',))
+JOB_SECONDS = REGISTRY.histogram('osw_job_seconds', 'Total time of a validation job')
+DOWNLOAD_BYTES = REGISTRY.histogram('osw_job_download_bytes', 'Bytes downloaded by a validation job',
+                                    buckets=DEFAULT_SIZE_BUCKETS)
+PEAK_RSS_BYTES = REGISTRY.histogram('osw_job_peak_rss_bytes',
+                                    'Resident memory a validation job added to its process at its peak',
+                                    buckets=DEFAULT_SIZE_BUCKETS)
+DOWNLOAD_BYTES_TOTAL = REGISTRY.counter('osw_download_bytes_total', 'Bytes downloaded by all validation jobs')
+FEATURES = REGISTRY.histogram('osw_job_features', 'Number of features in a validated dataset',
+                              buckets=DEFAULT_COUNT_BUCKETS)
+
+
+class PeakRSS:
+    """
+    Samples the resident memory of the current process every `interval` seconds while a job runs.
+    `peak_bytes` is the highest sample above the memory at the start, so a process that serves many jobs
+    does not report the peak of an earlier one.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self._process = psutil.Process()
+        self._baseline = 0
+        self._peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> 'PeakRSS':
+        self._baseline = self._peak = self._process.memory_info().rss
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    @property
+    def peak_bytes(self) -> int:
+        return max(self._peak - self._baseline, 0)
+
+    def _sample(self) -> None:
+        self._peak = max(self._peak, self._process.memory_info().rss)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+
+class JobMetrics:
+    """
+    Timings and resource usage of one validation job.
+
+    Stages are `download`, `extraction` (unzip and layout checks), `schema`, `integrity` (id, reference and
+    geometry checks), `validation` (the whole OSW validation, including the three before) and `publish`.
+    `finish` logs everything as one JSON record tied to `message_id` and adds it to the histograms.
+    """
+
+    def __init__(self, message_id: Optional[str] = None):
+        self.message_id = message_id
+        self.stages = {}
+        self.download_bytes = 0
+        self.archive_bytes = 0
+        self.peak_rss_bytes = 0
+        self.feature_counts = {}
+        self.is_valid = None
+        self.cached = False
+        self._start_time = time.perf_counter()
+        self._finished = False
+
+    @contextmanager
+    def stage(self, name: str):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start_time)
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_validation(self, metrics: Optional[dict]) -> None:
+        """Merges the metrics reported by `run_osw_validation`"""
+        if not metrics:
+            return
+        for name, seconds in metrics.get('stages', {}).items():
+            self.add_stage(name, seconds)
+        self.feature_counts.update(metrics.get('feature_counts', {}))
+        self.peak_rss_bytes = max(self.peak_rss_bytes, metrics.get('peak_rss_bytes', 0))
+
+    @property
+    def feature_count(self) -> int:
+        return sum(self.feature_counts.values())
+
+    def to_dict(self) -> dict:
+        return {
+            'message_id': self.message_id,
+            'is_valid': self.is_valid,
+            'cached': self.cached,
+            'duration_seconds': round(time.perf_counter() - self._start_time, 6),
+            'stages': {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            'download_bytes': self.download_bytes,
+            'archive_bytes': self.archive_bytes,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'feature_counts': self.feature_counts,
+            'features': self.feature_count
+        }
+
+    def finish(self) -> dict:
+        """Logs the record of the job and adds it to the histograms. Only the first call has an effect."""
+        record = self.to_dict()
+        if self._finished:
+            return record
+        self._finished = True
+        logger.info(json.dumps(record, default=str))
+        for name, seconds in self.stages.items():
+            STAGE_SECONDS.observe(seconds, stage=name)
+        JOB_SECONDS.observe(record['duration_seconds'])
+        if self.download_bytes:
+            DOWNLOAD_BYTES.observe(self.download_bytes)
+            DOWNLOAD_BYTES_TOTAL.inc(self.download_bytes)
+        if self.peak_rss_bytes:
+            PEAK_RSS_BYTES.observe(self.peak_rss_bytes)
+        if self.feature_counts:
+            FEATURES.observe(self.feature_count)
+        return record
@@ -0,0 +1,402 @@
+import os
+import json
+import time
+import uuid
+import queue
+import shutil
+import logging
+import threading
+import urllib.parse
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from python_ms_core.core.topic.abstract.topic_abstract import TopicAbstract
+from python_ms_core.core.storage.abstract.file_entity import FileEntity
+from python_ms_core.core.storage.abstract.storage_client import StorageClient
+from python_ms_core.core.storage.abstract.storage_container import StorageContainer
+from python_ms_core.core.auth.abstracts.authorizer_abstract import AuthorizerAbstract
+from python_ms_core.core.queue.models.queue_message import QueueMessage
+
+logging.basicConfig()
+logger = logging.getLogger('LOCAL_BACKENDS')
+logger.setLevel(logging.INFO)
+
+MEMORY = 'memory'
+LOCAL = 'local'
+
+
+class LocalCore:
+    """
+    Stand-in for `python_ms_core.Core` that runs on one machine without any cloud service.
+
+    Files live in `storage_dir`, one directory per container. Topics are kept in memory
+    (`topic_provider='memory'`), which only works within the process, or in `topic_dir`
+    (`topic_provider='local'`), which other processes on the machine can publish to and read from.
+    Permissions are always granted.
+    """
+
+    def __init__(self, storage_dir: str, topic_dir: str = None, topic_provider: str = MEMORY,
+                 poll_interval_ms: int = 100, max_delivery_count: int = 10):
+        if topic_provider not in (MEMORY, LOCAL):
+            raise ValueError(f'Unknown topic provider: {topic_provider}, expected {MEMORY} or {LOCAL}')
+        if topic_provider == LOCAL and not topic_dir:
+            raise ValueError('topic_dir is required for file-backed topics')
+        self.storage_dir = storage_dir
+        self.topic_dir = topic_dir
+        self.topic_provider = topic_provider
+        self.poll_interval = max(int(poll_interval_ms), 1) / 1000
+        self.max_delivery_count = max(int(max_delivery_count), 1)
+        self._topics = {}
+        self._topics_lock = threading.Lock()
+
+    def get_logger(self):
+        return logging.getLogger('LOCAL_CORE')
+
+    def get_topic(self, topic_name: str, max_concurrent_messages=os.cpu_count()):
+        if self.topic_provider == LOCAL:
+            return FileTopic(self.topic_dir, topic_name, max_concurrent_messages=max_concurrent_messages,
+                             poll_interval=self.poll_interval, max_delivery_count=self.max_delivery_count)
+        # Publishers and subscribers of a topic share one instance, as they would share a bus
+        with self._topics_lock:
+            topic = self._topics.get(topic_name)
+            if topic is None:
+                topic = self._topics[topic_name] = InMemoryTopic(topic_name, poll_interval=self.poll_interval,
+                                                                 max_delivery_count=self.max_delivery_count)
+        return topic.with_concurrency(max_concurrent_messages)
+
+    def get_storage_client(self):
+        return DirectoryStorageClient(self.storage_dir)
+
+    def get_authorizer(self, config: dict = None):
+        return LocalAuthorizer(config=config)
+
+
+class LocalAuthorizer(AuthorizerAbstract):
+    def __init__(self, config=None):
+        self.config = config
+
+    def has_permission(self, request_params) -> bool:
+        return True
+
+
+class DirectoryFileEntity(FileEntity):
+    """File of a `DirectoryStorageClient`, `file_path` is its absolute path on disk"""
+
+    def __init__(self, name: str, path: str):
+        super().__init__(name)
+        self.file_path = path
+
+    def open(self):
+        return open(self.file_path, 'rb')
+
+    def get_stream(self):
+        with self.open() as f:
+            return f.read()
+
+    def get_body_text(self):
+        return self.get_stream().decode('utf-8')
+
+    def upload(self, upload_stream):
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        with open(self.file_path, 'wb') as target:
+            if isinstance(upload_stream, str):
+                target.write(upload_stream.encode('utf-8'))
+            elif isinstance(upload_stream, (bytes, bytearray, memoryview)):
+                target.write(upload_stream)
+            else:
+                shutil.copyfileobj(upload_stream, target)
+
+    def get_remote_url(self):
+        return f'file://{urllib.parse.quote(self.file_path)}'
+
+    def delete_file(self):
+        if os.path.isfile(self.file_path):
+            os.remove(self.file_path)
+
+
+class DirectoryStorageContainer(StorageContainer):
+    excluded_files = ['.DS_Store']
+
+    def __init__(self, name: str, path: str):
+        super().__init__(name=name)
+        self.path = path
+
+    def list_files(self):
+        files = []
+        for directory, _, file_names in os.walk(self.path):
+            for file_name in sorted(file_names):
+                if file_name not in self.excluded_files:
+                    file_path = os.path.join(directory, file_name)
+                    files.append(DirectoryFileEntity(os.path.relpath(file_path, self.path), file_path))
+        return files
+
+    def create_file(self, name: str, mimetype: str = None):
+        return DirectoryFileEntity(name, self.file_path(name))
+
+    def file_path(self, name: str) -> str:
+        path = os.path.abspath(os.path.join(self.path, name.lstrip('/')))
+        if os.path.commonpath([path, os.path.abspath(self.path)]) != os.path.abspath(self.path):
+            raise ValueError(f'{name} is outside of container {self.name}')
+        return path
+
+
+class DirectoryStorageClient(StorageClient):
+    """
+    Storage client over a local directory, with one sub-directory per container.
+
+    Files can be addressed by the URLs this client hands out (`file:///<root>/<container>/<name>`),
+    by absolute paths under `root_dir`, or by blob style URLs (`https://<account>/<container>/<name>`),
+    so messages recorded against cloud storage can be replayed once their files are copied under `root_dir`.
+    """
+
+    def __init__(self, root_dir: str):
+        super().__init__()
+        self.root_dir = os.path.abspath(root_dir)
+
+    def get_container(self, container_name: str):
+        if not container_name:
+            logger.error('Container name is required!')
+            return None
+        return DirectoryStorageContainer(name=container_name, path=os.path.join(self.root_dir, container_name))
+
+    def get_file(self, container_name: str, file_name: str):
+        return self.get_container(container_name).create_file(file_name)
+
+    def get_file_from_url(self, container_name: str, full_url: str):
+        path = urllib.parse.unquote(urllib.parse.urlparse(full_url).path)
+        if path.startswith(self.root_dir + os.sep):
+            # Handed out by this client, the container is part of the path
+            container_name, _, name = os.path.relpath(path, self.root_dir).partition(os.sep)
+        else:
+            name = path.lstrip('/')
+            if name.startswith(f'{container_name}/'):
+                name = name[len(container_name) + 1:]
+        return self.get_container(container_name).create_file(name)
+
+    def get_sas_url(self, container_name: str, file_path: str, expiry_hours: int) -> str:
+        return self.get_file_from_url(container_name, file_path).get_remote_url()
+
+    def clone_file(self, file_url: str, destination_container_name: str, destination_file_path: str):
+        source = self.get_file_from_url(destination_container_name, file_url)
+        destination = self.get_file(destination_container_name, destination_file_path)
+        with source.open() as stream:
+            destination.upload(stream)
+        return destination
+
+
+class _PollingTopic(TopicAbstract, ABC):
+    """
+    Subscriptions of the local topics. `subscribe` blocks like the service bus one and runs the callback
+    for up to `max_concurrent_messages` messages at once. A message whose callback raises is put back,
+    until it has been delivered `max_delivery_count` times. It is then dead-lettered, like on the service bus.
+    """
+
+    def __init__(self, config=None, topic_name=None, max_concurrent_messages: int = 1, poll_interval: float = 0.1,
+                 max_delivery_count: int = 10):
+        self.topic = topic_name
+        self.max_concurrent_messages = max(int(max_concurrent_messages or 1), 1)
+        self.poll_interval = poll_interval
+        self.max_delivery_count = max(int(max_delivery_count), 1)
+        self._stopped = threading.Event()
+
+    def subscribe(self, subscription=None, callback=None):
+        if not subscription:
+            logger.error('Subscription name is required!')
+            return
+        self.create_subscription(subscription)
+        slots = threading.BoundedSemaphore(self.max_concurrent_messages)
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_messages) as executor:
+            while not self._stopped.is_set():
+                slots.acquire()
+                received = self._receive(subscription)
+                if received is None:
+                    slots.release()
+                    continue
+                executor.submit(self._process, subscription, received, callback, slots)
+
+    def close(self):
+        """Makes `subscribe` return once the messages being processed are done"""
+        self._stopped.set()
+
+    def _process(self, subscription, received, callback, slots):
+        body, receipt, delivery_count = received
+        try:
+            callback(QueueMessage.data_from(body))
+            self._complete(subscription, receipt)
+        except Exception as e:
+            logger.error(f'Error in processing message: {e}')
+            if delivery_count >= self.max_delivery_count:
+                logger.error(f'Message delivered {delivery_count} times on {self.topic}/{subscription}, '
+                             f'it is dead-lettered')
+                self._dead_letter(subscription, receipt)
+            else:
+                self._abandon(subscription, receipt)
+        finally:
+            slots.release()
+
+    @abstractmethod
+    def create_subscription(self, subscription: str):
+        pass
+
+    @abstractmethod
+    def _receive(self, subscription: str):
+        """
+        Returns the body of the next message, a receipt to settle it and how many times it has been delivered,
+        this time included. None after `poll_interval` without one
+        """
+        pass
+
+    @abstractmethod
+    def _complete(self, subscription: str, receipt) -> None:
+        pass
+
+    @abstractmethod
+    def _abandon(self, subscription: str, receipt) -> None:
+        pass
+
+    @abstractmethod
+    def _dead_letter(self, subscription: str, receipt) -> None:
+        pass
+
+
+class InMemoryTopic(_PollingTopic):
+    """
+    Topic kept in the memory of the process. Every subscription gets its own copy of a message,
+    messages published while a topic has no subscription are dropped, like on the service bus.
+    Dead-lettered messages are dropped too, there is no dead-letter queue to read them from.
+    """
+
+    def __init__(self, topic_name=None, max_concurrent_messages: int = 1, poll_interval: float = 0.1,
+                 max_delivery_count: int = 10, subscriptions: dict = None, lock=None):
+        super().__init__(topic_name=topic_name, max_concurrent_messages=max_concurrent_messages,
+                         poll_interval=poll_interval, max_delivery_count=max_delivery_count)
+        self._subscriptions = {} if subscriptions is None else subscriptions
+        self._lock = lock or threading.Lock()
+
+    def with_concurrency(self, max_concurrent_messages) -> 'InMemoryTopic':
+        """Another handle on the same subscriptions, with its own concurrency"""
+        return InMemoryTopic(self.topic, max_concurrent_messages=max_concurrent_messages,
+                             poll_interval=self.poll_interval, max_delivery_count=self.max_delivery_count,
+                             subscriptions=self._subscriptions, lock=self._lock)
+
+    def create_subscription(self, subscription: str):
+        with self._lock:
+            self._subscriptions.setdefault(subscription, queue.Queue())
+
+    def pending(self, subscription: str) -> int:
+        with self._lock:
+            messages = self._subscriptions.get(subscription)
+        return messages.qsize() if messages else 0
+
+    def publish(self, data=None):
+        # Serialized on the way in so subscribers never share an object with the publisher
+        body = json.dumps(QueueMessage.to_dict(data))
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+        if not subscriptions:
+            logger.warning(f'No subscription on topic {self.topic}, the message is dropped')
+        for messages in subscriptions:
+            # Along with the number of times it has been delivered
+            messages.put((body, 0))
+
+    def _receive(self, subscription: str):
+        with self._lock:
+            messages = self._subscriptions[subscription]
+        try:
+            body, delivery_count = messages.get(timeout=self.poll_interval)
+        except queue.Empty:
+            return None
+        return body, (body, delivery_count + 1), delivery_count + 1
+
+    def _complete(self, subscription: str, receipt) -> None:
+        pass
+
+    def _abandon(self, subscription: str, receipt) -> None:
+        with self._lock:
+            messages = self._subscriptions[subscription]
+        messages.put(receipt)
+
+    def _dead_letter(self, subscription: str, receipt) -> None:
+        pass
+
+
+class FileTopic(_PollingTopic):
+    """
+    Topic kept on disk, so separate processes can exchange messages through it.
+
+    Every subscription is a directory `<root_dir>/<topic>/<subscription>` with one JSON file per message,
+    named so that they sort in publication order. A subscriber claims a message by renaming it,
+    which lets several processes share a subscription. A message claimed by a process that died stays
+    as a `.processing` file and is not delivered again. A message put back is renamed `<name>-<deliveries>.json`
+    and a dead-lettered one is kept as a `.deadletter` file.
+    """
+    MESSAGE_SUFFIX = '.json'
+    CLAIMED_SUFFIX = '.processing'
+    DEAD_LETTER_SUFFIX = '.deadletter'
+
+    def __init__(self, root_dir: str, topic_name: str, max_concurrent_messages: int = 1, poll_interval: float = 0.1,
+                 max_delivery_count: int = 10):
+        super().__init__(topic_name=topic_name, max_concurrent_messages=max_concurrent_messages,
+                         poll_interval=poll_interval, max_delivery_count=max_delivery_count)
+        self.path = os.path.join(root_dir, topic_name)
+        os.makedirs(self.path, exist_ok=True)
+
+    def create_subscription(self, subscription: str):
+        os.makedirs(self.subscription_path(subscription), exist_ok=True)
+
+    def subscription_path(self, subscription: str) -> str:
+        return os.path.join(self.path, subscription)
+
+    def pending(self, subscription: str) -> int:
+        return len(self._message_files(subscription))
+
+    def publish(self, data=None):
+        body = json.dumps(QueueMessage.to_dict(data))
+        subscriptions = [entry.path for entry in os.scandir(self.path) if entry.is_dir()]
+        if not subscriptions:
+            logger.warning(f'No subscription on topic {self.topic}, the message is dropped')
+        file_name = f'{time.time_ns():020d}-{uuid.uuid4().hex}'
+        for subscription_path in subscriptions:
+            temp_path = os.path.join(subscription_path, f'.{file_name}.tmp')
+            with open(temp_path, 'w') as f:
+                f.write(body)
+            # Readers never see a message before it is fully written
+            os.replace(temp_path, os.path.join(subscription_path, file_name + self.MESSAGE_SUFFIX))
+
+    def _message_files(self, subscription: str) -> list:
+        try:
+            names = os.listdir(self.subscription_path(subscription))
+        except FileNotFoundError:
+            return []
+        return sorted(name for name in names if name.endswith(self.MESSAGE_SUFFIX) and not name.startswith('.'))
+
+    def _receive(self, subscription: str):
+        for name in self._message_files(subscription):
+            path = os.path.join(self.subscription_path(subscription), name)
+            claimed_path = path + self.CLAIMED_SUFFIX
+            try:
+                os.rename(path, claimed_path)
+            except FileNotFoundError:
+                # Claimed by another subscriber
+                continue
+            with open(claimed_path) as f:
+                return f.read(), claimed_path, self._delivery_count(name) + 1
+        self._stopped.wait(self.poll_interval)
+        return None
+
+    def _complete(self, subscription: str, receipt) -> None:
+        os.remove(receipt)
+
+    def _abandon(self, subscription: str, receipt) -> None:
+        directory, name = os.path.split(receipt[:-len(self.CLAIMED_SUFFIX)])
+        # The publication time stays first, so the message keeps its place
+        time_and_id = '-'.join(name[:-len(self.MESSAGE_SUFFIX)].split('-')[:2])
+        put_back = f'{time_and_id}-{self._delivery_count(name) + 1}{self.MESSAGE_SUFFIX}'
+        os.replace(receipt, os.path.join(directory, put_back))
+
+    def _dead_letter(self, subscription: str, receipt) -> None:
+        os.replace(receipt, receipt[:-len(self.MESSAGE_SUFFIX + self.CLAIMED_SUFFIX)] + self.DEAD_LETTER_SUFFIX)
+
+    def _delivery_count(self, name: str) -> int:
+        # `<time>-<id>.json` until the message is put back once
+        stem = name[:-len(self.MESSAGE_SUFFIX)].split('-')
+        return int(stem[2]) if len(stem) > 2 else 0
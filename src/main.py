@@ -1,9 +1,15 @@
 import os
 import psutil
-from fastapi import FastAPI, APIRouter, Depends, status
+from fastapi import FastAPI, APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import JSONResponse
 from functools import lru_cache
 from .config import Settings
 from .osw_validator import OSWValidator
+from .validation import Validation, DOWNLOAD_DIR
+from .validation_engine import ValidationTimeoutError
+from .metrics import REGISTRY
+from .health import HealthMonitor
+from .pipeline.schemas import warm_schemas
 
 app = FastAPI()
 
@@ -20,6 +26,8 @@ def get_settings():
 @app.on_event('startup')
 async def startup_event(settings: Settings = Depends(get_settings)) -> None:
     try:
+        # Jobs validated in this process find their schemas compiled
+        warm_schemas()
         # OSWValidator()
         app.validator = OSWValidator()
     except:
@@ -57,4 +65,70 @@ def ping():
     return "I'm healthy !!"
 
 
+def get_health_monitor() -> HealthMonitor:
+    settings = get_settings()
+    return HealthMonitor(
+        validator=app.validator,
+        download_dir=DOWNLOAD_DIR,
+        min_free_disk_mb=settings.readiness_min_free_disk_mb,
+        min_free_memory_mb=settings.readiness_min_free_memory_mb
+    )
+
+
+# Fails when the listener thread has died, so the orchestrator restarts the service
+@prefix_router.get('/live', status_code=status.HTTP_200_OK)
+def live():
+    health = get_health_monitor().liveness()
+    status_code = status.HTTP_200_OK if health['status'] == 'ok' else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=status_code, content=health)
+
+
+# Fails while every slot is busy or disk and memory run low, so work goes to other instances
+@prefix_router.get('/ready', status_code=status.HTTP_200_OK)
+def ready():
+    health = get_health_monitor().readiness()
+    status_code = status.HTTP_200_OK if health['status'] == 'ok' else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(status_code=status_code, content=health)
+
+
+# Prometheus text format, scraped by the autoscaler and the dashboards
+@app.get('/metrics', status_code=status.HTTP_200_OK)
+def metrics():
+    return Response(content=REGISTRY.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Synchronous validation of an uploaded OSW zip, without going through the queue and storage.
+# Declared with `def` so FastAPI runs it in its thread pool and the event loop stays free.
+@app.post('/validate', status_code=status.HTTP_200_OK)
+def validate(file: UploadFile = File(...), max_errors: int = Query(20, gt=0)):
+    validator = app.validator
+    validation = Validation(
+        file_path=os.path.basename(file.filename or 'upload.zip'),
+        engine=validator.engine if validator else None,
+        result_cache=validator.result_cache if validator else None,
+        admission=validator.admission if validator else None
+    )
+    if validator:
+        validator.start_job()
+    try:
+        result = validation.validate_stream(file.file, max_errors=max_errors)
+    except ValidationTimeoutError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                            detail=f'Validation timed out after {e.timeout_seconds:.0f} seconds')
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail=f'Error occurred while validating OSW request {e}')
+    finally:
+        file.file.close()
+        validation.job_metrics.finish()
+        if validator:
+            validator.end_job()
+        if validator and validator.memory_policy:
+            validator.memory_policy.job_finished()
+    return {
+        'is_valid': result.is_valid,
+        'validation_message': result.validation_message
+    }
+
+
 app.include_router(prefix_router)
@@ -0,0 +1,72 @@
+import gc
+import time
+import logging
+import threading
+import psutil
+
+logging.basicConfig()
+logger = logging.getLogger('MEMORY_POLICY')
+logger.setLevel(logging.INFO)
+
+
+class MemoryPolicy:
+    """
+    Decides when a finished job is followed by a full garbage collection.
+
+    * `always`: collect after every job
+    * `rss`: collect when the resident memory of the process is above `rss_threshold_mb`
+    * `interval`: collect after every `every_n_jobs` jobs
+    * `never`: leave it to the interpreter
+    """
+    ALWAYS = 'always'
+    RSS = 'rss'
+    INTERVAL = 'interval'
+    NEVER = 'never'
+    MODES = (ALWAYS, RSS, INTERVAL, NEVER)
+
+    def __init__(self, mode: str = RSS, rss_threshold_mb: int = 1024, every_n_jobs: int = 10):
+        mode = (mode or self.RSS).lower()
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown memory policy {mode}, expected one of: {", ".join(self.MODES)}')
+        self.mode = mode
+        self.rss_threshold_bytes = int(rss_threshold_mb) * 1024 * 1024
+        self.every_n_jobs = max(int(every_n_jobs), 1)
+        self.jobs_finished = 0
+        self.collections = 0
+        self.total_collect_seconds = 0.0
+        self.last_collect_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def job_finished(self) -> bool:
+        """Records a finished job and collects if the policy asks for it. Returns whether it collected."""
+        with self._lock:
+            self.jobs_finished += 1
+            jobs_finished = self.jobs_finished
+        if self.should_collect(jobs_finished):
+            self.collect()
+            return True
+        return False
+
+    def should_collect(self, jobs_finished: int) -> bool:
+        if self.mode == self.ALWAYS:
+            return True
+        if self.mode == self.INTERVAL:
+            return jobs_finished % self.every_n_jobs == 0
+        if self.mode == self.RSS:
+            return self.current_rss() > self.rss_threshold_bytes
+        return False
+
+    def collect(self) -> float:
+        start_time = time.perf_counter()
+        unreachable = gc.collect()
+        time_taken = time.perf_counter() - start_time
+        with self._lock:
+            self.collections += 1
+            self.total_collect_seconds += time_taken
+            self.last_collect_seconds = time_taken
+        logger.info(f'Garbage collection ({self.mode}) found {unreachable} objects in {time_taken:.3f} seconds')
+        return time_taken
+
+    @staticmethod
+    def current_rss() -> int:
+        return psutil.Process().memory_info().rss
@@ -0,0 +1,229 @@
+import math
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Buckets in seconds, from a small archive served from the cache to a multi-GB dataset
+DEFAULT_TIME_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+# Buckets in bytes, 64 KB to 8 GB
+DEFAULT_SIZE_BUCKETS = tuple(64 * 1024 * 4 ** power for power in range(10))
+# Buckets in number of features
+DEFAULT_COUNT_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+class _LabelledMetric:
+    """Shared parts of the counters and gauges: one value per combination of label values"""
+    type_name = ''
+
+    def __init__(self, name: str, documentation: str = '', labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._function = None
+        self._lock = threading.Lock()
+
+    def set_function(self, function: Optional[Callable]) -> None:
+        """
+        Reads the value from `function` at collection time instead of the recorded values.
+        Without labels it returns a number, with labels a dict of label values tuple to number.
+        """
+        self._function = function
+
+    def value(self, **labels) -> float:
+        return self.samples().get(self._label_values(labels), 0)
+
+    def samples(self) -> Dict[Tuple[str, ...], float]:
+        if self._function is not None:
+            value = self._function()
+            if not self.labels:
+                return {(): value}
+            return {tuple(str(label) for label in key): sample for key, sample in value.items()}
+        with self._lock:
+            values = dict(self._values)
+        # A metric without labels always has a value, zero until it is first recorded
+        if not self.labels and not values:
+            values[()] = 0
+        return values
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _add(self, amount: float, labels: dict) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _label_values(self, labels: dict) -> Tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f'{self.name} expects the labels: {", ".join(self.labels) or "none"}')
+        return tuple(str(labels[label]) for label in self.labels)
+
+
+class Counter(_LabelledMetric):
+    """Value that only goes up, like the number of messages received"""
+    type_name = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if amount < 0:
+            raise ValueError(f'{self.name} can only be increased')
+        self._add(amount, labels)
+
+
+class Gauge(_LabelledMetric):
+    """Value that goes up and down, like the number of jobs in flight"""
+    type_name = 'gauge'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self._add(-amount, labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """
+    Cumulative histogram with fixed upper bounds, one series per combination of label values.
+    Values above the last bucket are only counted in the implicit `+Inf` bucket.
+    """
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str = '', buckets: Iterable[float] = DEFAULT_TIME_BUCKETS,
+                 labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        self.labels = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._label_values(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0}
+            if index < len(self.buckets):
+                series['buckets'][index] += 1
+            series['count'] += 1
+            series['sum'] += value
+
+    def snapshot(self) -> Dict[Tuple[str, ...], dict]:
+        """Returns, for every label values tuple, the cumulative bucket counts, the count and the sum"""
+        with self._lock:
+            series = {key: (list(value['buckets']), value['count'], value['sum'])
+                      for key, value in self._series.items()}
+        snapshot = {}
+        for key, (buckets, count, total) in series.items():
+            cumulative, running = [], 0
+            for upper_bound, bucket_count in zip(self.buckets, buckets):
+                running += bucket_count
+                cumulative.append((upper_bound, running))
+            snapshot[key] = {'buckets': cumulative, 'count': count, 'sum': total}
+        return snapshot
+
+    def count(self, **labels) -> int:
+        series = self.snapshot().get(self._label_values(labels))
+        return series['count'] if series else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def _label_values(self, labels: dict) -> Tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f'{self.name} expects the labels: {", ".join(self.labels) or "none"}')
+        return tuple(str(labels[label]) for label in self.labels)
+
+
+class MetricsRegistry:
+    """Holds the metrics of the process by name, so every module records into the same instances"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str = '', labels: Tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation=documentation, labels=labels)
+
+    def gauge(self, name: str, documentation: str = '', labels: Tuple[str, ...] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation=documentation, labels=labels)
+
+    def histogram(self, name: str, documentation: str = '', buckets: Iterable[float] = DEFAULT_TIME_BUCKETS,
+                  labels: Tuple[str, ...] = ()) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation=documentation, buckets=buckets, labels=labels)
+
+    def get(self, name: str):
+        with self._lock:
+            return self._metrics.get(name)
+
+    def metrics(self) -> list:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self) -> str:
+        """Returns every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in sorted(self.metrics(), key=lambda item: item.name):
+            lines.append(f'# HELP {metric.name} {_escape_help(metric.documentation)}')
+            lines.append(f'# TYPE {metric.name} {metric.type_name}')
+            if isinstance(metric, Histogram):
+                for label_values, series in sorted(metric.snapshot().items()):
+                    labels = list(zip(metric.labels, label_values))
+                    for upper_bound, count in series['buckets']:
+                        lines.append(_sample(f'{metric.name}_bucket', labels + [('le', _format(upper_bound))], count))
+                    lines.append(_sample(f'{metric.name}_bucket', labels + [('le', '+Inf')], series['count']))
+                    lines.append(_sample(f'{metric.name}_sum', labels, series['sum']))
+                    lines.append(_sample(f'{metric.name}_count', labels, series['count']))
+            else:
+                try:
+                    samples = metric.samples()
+                except Exception:
+                    # A failing callback should not take the other metrics down with it
+                    continue
+                for label_values, value in sorted(samples.items()):
+                    lines.append(_sample(metric.name, list(zip(metric.labels, label_values)), value))
+        return '\n'.join(lines) + '\n'
+
+    def _get_or_create(self, metric_class, name: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f'{name} is already registered as a {type(metric).__name__}')
+            return metric
+
+
+def _format(value: float) -> str:
+    value = float(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _sample(name: str, labels: list, value: float) -> str:
+    if labels:
+        label_text = ','.join(f'{label}="{_escape_label(str(label_value))}"' for label, label_value in labels)
+        return f'{name}{{{label_text}}} {_format(value)}'
+    return f'{name} {_format(value)}'
+
+
+REGISTRY = MetricsRegistry()
@@ -1,11 +1,22 @@
-import gc
 import logging
 import urllib.parse
+import psutil
 from typing import List
 from python_ms_core import Core
 from python_ms_core.core.queue.models.queue_message import QueueMessage
 from python_ms_core.core.auth.models.permission_request import PermissionRequest
 from .validation import Validation
+from .validation_engine import ValidationEngine, ValidationTimeoutError
+from .result_cache import ResultCache, LocalDiskCacheBackend
+from .topic_publisher import TopicPublisher
+from .permission_cache import PermissionCache
+from .memory_policy import MemoryPolicy
+from .admission import AdmissionController
+from .local_backends import LocalCore, LOCAL, MEMORY
+from .pipeline import PipelineOptions
+from .job_metrics import JobMetrics
+from .metrics import REGISTRY
+from .health import queue_lag_seconds
 from .models.queue_message_content import Upload, ValidationResult
 from .config import Settings
 import threading
@@ -15,12 +26,42 @@ logging.basicConfig()
 logger = logging.getLogger('OSW_VALIDATOR')
 logger.setLevel(logging.INFO)
 
+# Messages without a publishedDate of their own get this default of the QueueMessage class
+DEFAULT_PUBLISHED_DATE = QueueMessage.publishedDate
+
+MESSAGES_RECEIVED = REGISTRY.counter('osw_messages_received_total', 'Messages received for validation')
+MESSAGES_VALIDATED = REGISTRY.counter('osw_messages_validated_total', 'Messages validated, by validation result',
+                                      labels=('result',))
+MESSAGES_FAILED = REGISTRY.counter('osw_messages_failed_total', 'Messages that could not be validated')
+MESSAGES_TIMED_OUT = REGISTRY.counter('osw_messages_timed_out_total', 'Messages whose validation ran past its deadline')
+JOBS_IN_FLIGHT = REGISTRY.gauge('osw_jobs_in_flight', 'Messages being validated right now')
+MAX_CONCURRENT_MESSAGES = REGISTRY.gauge('osw_max_concurrent_messages', 'Messages the service validates at once')
+VALIDATION_WORKERS = REGISTRY.gauge('osw_validation_workers', 'Running validation worker processes')
+QUEUE_LAG_SECONDS = REGISTRY.gauge('osw_queue_lag_seconds',
+                                   'Time between the publication and the reception of the last message')
+PROCESS_RSS_BYTES = REGISTRY.gauge('osw_process_rss_bytes', 'Resident memory of the service and of its workers',
+                                   labels=('process',))
+RESULT_CACHE_REQUESTS = REGISTRY.counter('osw_result_cache_requests_total', 'Result cache lookups, by outcome',
+                                         labels=('result',))
+PERMISSION_CACHE_REQUESTS = REGISTRY.counter('osw_permission_cache_requests_total',
+                                             'Permission cache lookups, by outcome', labels=('result',))
+
 
 class OSWValidator:
     _settings = Settings()
+    engine = None
+    publisher = None
+    result_cache = None
+    permission_cache = None
+    memory_policy = None
+    admission = None
+    jobs_in_flight = 0
+    queue_lag_seconds = None
 
     def __init__(self):
-        self.core = Core()
+        self.core = self.create_core()
+        self.max_concurrent_messages = int(self._settings.max_concurrent_messages)
+        self._jobs_lock = threading.Lock()
         options = {
             'provider': self._settings.auth_provider,
             'api_url': self._settings.auth_permission_url
@@ -28,16 +69,100 @@ class OSWValidator:
         listening_topic_name = self._settings.event_bus.upload_topic or ''
         self.subscription_name = self._settings.event_bus.upload_subscription or ''
         self.listening_topic = self.core.get_topic(topic_name=listening_topic_name, max_concurrent_messages=self._settings.max_concurrent_messages)
+        self.publisher = TopicPublisher(
+            core=self.core,
+            topic_name=self._settings.event_bus.validation_topic,
+            batch_size=self._settings.publish_batch_size,
+            flush_interval_ms=self._settings.publish_flush_interval_ms
+        )
         self.logger = self.core.get_logger()
         self.storage_client = self.core.get_storage_client()
         self.auth = self.core.get_authorizer(config=options)
+        self.memory_policy = MemoryPolicy(
+            mode=self._settings.gc_policy,
+            rss_threshold_mb=self._settings.gc_rss_threshold_mb,
+            every_n_jobs=self._settings.gc_every_n_jobs
+        )
+        if self._settings.permission_cache_enabled:
+            self.permission_cache = PermissionCache(
+                max_entries=self._settings.permission_cache_max_entries,
+                positive_ttl_seconds=self._settings.permission_cache_positive_ttl_seconds,
+                negative_ttl_seconds=self._settings.permission_cache_negative_ttl_seconds
+            )
+        # Validation work runs in worker processes, the listener threads only receive and publish
+        if int(self._settings.validation_workers) > 0:
+            self.engine = ValidationEngine(
+                max_workers=self._settings.validation_workers,
+                max_tasks_per_child=self._settings.validation_max_tasks_per_child,
+                timeout_seconds=self._settings.validation_timeout_seconds,
+                timeout_per_mb_seconds=self._settings.validation_timeout_per_mb_seconds,
+                max_timeout_seconds=self._settings.validation_timeout_max_seconds
+            )
+        if self._settings.admission_enabled:
+            self.admission = AdmissionController(
+                memory_budget_bytes=int(self._settings.admission_memory_budget_mb) * 1024 * 1024,
+                disk_budget_bytes=int(self._settings.admission_disk_budget_mb) * 1024 * 1024,
+                memory_factor=self._settings.admission_memory_factor,
+                disk_factor=self._settings.admission_disk_factor,
+                large_job_threshold_bytes=int(self._settings.large_job_threshold_mb) * 1024 * 1024,
+                large_job_concurrency=self._settings.large_job_concurrency
+            )
+        pipeline_options = PipelineOptions.from_settings(self._settings)
+        # A cached result has no GeoParquet files to upload next to the archive, so the cache is skipped
+        if self._settings.result_cache_enabled and pipeline_options.columnar_output:
+            logger.info('VALIDATION_COLUMNAR_OUTPUT is set, the result cache is not used')
+        elif self._settings.result_cache_enabled:
+            self.result_cache = ResultCache(backend=LocalDiskCacheBackend(
+                cache_dir=self._settings.result_cache_dir,
+                max_bytes=self._settings.result_cache_max_bytes,
+                ttl_seconds=self._settings.result_cache_ttl_seconds
+            ), variant=pipeline_options.result_variant)
+        self.register_metrics()
         self.listener_thread = threading.Thread(target=self.start_listening)
         self.listener_thread.start()
 
+    # Cloud clients of python_ms_core, or local stand-ins to run the whole service on one machine
+    def create_core(self):
+        backend_provider = str(self._settings.backend_provider).lower()
+        if backend_provider in (LOCAL, MEMORY):
+            logger.info(f'Using the {backend_provider} backends, storage in {self._settings.local_storage_dir}')
+            return LocalCore(
+                storage_dir=self._settings.local_storage_dir,
+                topic_dir=self._settings.local_topic_dir,
+                topic_provider=backend_provider,
+                poll_interval_ms=self._settings.local_topic_poll_interval_ms,
+                max_delivery_count=self._settings.local_topic_max_delivery_count
+            )
+        return Core()
+
+    def register_metrics(self):
+        MAX_CONCURRENT_MESSAGES.set(self.max_concurrent_messages)
+        QUEUE_LAG_SECONDS.set_function(lambda: self.queue_lag_seconds or 0)
+        VALIDATION_WORKERS.set_function(lambda: self.engine.worker_count if self.engine else 0)
+        PROCESS_RSS_BYTES.set_function(self.process_rss)
+        RESULT_CACHE_REQUESTS.set_function(lambda: self.cache_requests(self.result_cache))
+        PERMISSION_CACHE_REQUESTS.set_function(lambda: self.cache_requests(self.permission_cache))
+
+    def process_rss(self) -> dict:
+        workers_rss = 0
+        for pid in self.engine.worker_pids() if self.engine else []:
+            try:
+                workers_rss += psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                pass
+        return {('service',): psutil.Process().memory_info().rss, ('workers',): workers_rss}
+
+    @staticmethod
+    def cache_requests(cache) -> dict:
+        if cache is None:
+            return {}
+        return {('hit',): cache.hits, ('miss',): cache.misses}
+
     def start_listening(self):
         def process(message) -> None:
             if message is not None:
                 queue_message = QueueMessage.to_dict(message)
+                self.record_queue_lag(queue_message.get('publishedDate'))
                 upload_message = Upload.data_from(queue_message)
                 self.validate(received_message=upload_message)
 
@@ -45,8 +170,12 @@ class OSWValidator:
 
     def validate(self, received_message: Upload):
         tdei_record_id: str = ''
+        job_metrics = JobMetrics()
+        MESSAGES_RECEIVED.inc()
+        self.start_job()
         try:
             tdei_record_id = received_message.message_id
+            job_metrics.message_id = tdei_record_id
             logger.info(f'Received message for : {tdei_record_id} Message received for OSW validation !')
 
             if received_message.data.file_upload_path is None:
@@ -63,17 +192,56 @@ class OSWValidator:
 
             file_upload_path = urllib.parse.unquote(received_message.data.file_upload_path)
             if file_upload_path:
-                validation_result = Validation(file_path=file_upload_path, storage_client=self.storage_client)
+                validation_result = Validation(file_path=file_upload_path, storage_client=self.storage_client,
+                                               engine=self.engine, result_cache=self.result_cache,
+                                               job_metrics=job_metrics, admission=self.admission)
                 result = validation_result.validate()
-                self.send_status(result=result, upload_message=received_message)
+                MESSAGES_VALIDATED.inc(result='valid' if result.is_valid else 'invalid')
+                with job_metrics.stage('publish'):
+                    self.send_status(result=result, upload_message=received_message)
             else:
                 raise Exception('File entity not found')
+        except ValidationTimeoutError as e:
+            logger.error(f'{tdei_record_id} Validation timed out, {e}')
+            result = ValidationResult()
+            result.is_valid = False
+            result.validation_message = f'Validation timed out after {e.timeout_seconds:.0f} seconds'
+            MESSAGES_TIMED_OUT.inc()
+            job_metrics.is_valid = False
+            with job_metrics.stage('publish'):
+                self.send_status(result=result, upload_message=received_message)
         except Exception as e:
             logger.error(f'{tdei_record_id} Error occurred while validating OSW request, {e}')
             result = ValidationResult()
             result.is_valid = False
             result.validation_message = f'Error occurred while validating OSW request {e}'
-            self.send_status(result=result, upload_message=received_message)
+            MESSAGES_FAILED.inc()
+            job_metrics.is_valid = False
+            with job_metrics.stage('publish'):
+                self.send_status(result=result, upload_message=received_message)
+        finally:
+            self.end_job()
+            job_metrics.finish()
+            if self.memory_policy:
+                self.memory_policy.job_finished()
+
+    # Jobs in flight are counted for the readiness check, queued messages and uploads to /validate alike
+    def start_job(self):
+        with self._jobs_lock:
+            self.jobs_in_flight += 1
+        JOBS_IN_FLIGHT.inc()
+
+    def end_job(self):
+        with self._jobs_lock:
+            self.jobs_in_flight -= 1
+        JOBS_IN_FLIGHT.dec()
+
+    def record_queue_lag(self, published_date):
+        if published_date == DEFAULT_PUBLISHED_DATE:
+            return
+        lag = queue_lag_seconds(published_date)
+        if lag is not None:
+            self.queue_lag_seconds = lag
 
     def send_status(self, result: ValidationResult, upload_message: Upload):
         upload_message.data.success = result.is_valid
@@ -90,16 +258,21 @@ class OSWValidator:
             'data': resp_data
         })
         try:
-            self.core.get_topic(topic_name=self._settings.event_bus.validation_topic).publish(data=data)
+            self.publisher.publish(data=data)
             logger.info(f'Publishing message for : {upload_message.message_id}')
         except Exception as e:
             logger.error(f'Error occurred while publishing message for : {upload_message.message_id} with error: {e}')
-        finally:
-            gc.collect()
 
 
     def has_permission(self, roles: List[str], queue_message: Upload) -> bool:
         try:
+            cache_key = PermissionCache.make_key(user_id=queue_message.data.user_id,
+                                                 tdei_project_group_id=queue_message.data.tdei_project_group_id,
+                                                 roles=roles)
+            if self.permission_cache is not None:
+                is_permitted = self.permission_cache.get(cache_key)
+                if is_permitted is not None:
+                    return is_permitted
             permission_request = PermissionRequest(
                 user_id=queue_message.data.user_id,
                 project_group_id=queue_message.data.tdei_project_group_id,
@@ -107,10 +280,23 @@ class OSWValidator:
                 should_satisfy_all=False
             )
             response = self.auth.has_permission(request_params=permission_request)
-            return response if response is not None else False
+            # The hosted authorizer returns the json body, which is an error message when the request failed
+            if not isinstance(response, bool):
+                logger.error(f'Unexpected response from the permission service: {response}')
+                return False
+            if self.permission_cache is not None:
+                self.permission_cache.set(cache_key, response)
+            return response
         except Exception as error:
             print('Error validating the request authorization:', error)
             return False
 
     def stop_listening(self):
-        self.listener_thread.join(timeout=0) # Stop the thread during shutdown.Its still an attempt. Not sure if this will work.
\ No newline at end of file
+        close_topic = getattr(self.listening_topic, 'close', None)
+        if callable(close_topic):
+            close_topic()
+        self.listener_thread.join(timeout=0) # Stop the thread during shutdown.Its still an attempt. Not sure if this will work.
+        if self.publisher:
+            self.publisher.close()
+        if self.engine:
+            self.engine.shutdown()
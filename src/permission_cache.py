@@ -0,0 +1,54 @@
+import time
+import threading
+from typing import List, Optional, Tuple
+from collections import OrderedDict
+
+
+class PermissionCache:
+    """
+    Bounded LRU cache of permission decisions.
+    Granted and denied decisions expire after their own TTL, denied ones are usually kept
+    for a shorter time so a user who was just given a role does not wait long.
+    """
+
+    def __init__(self, max_entries: int = 1024, positive_ttl_seconds: float = 300, negative_ttl_seconds: float = 30):
+        self.max_entries = max(int(max_entries), 1)
+        self.positive_ttl_seconds = float(positive_ttl_seconds)
+        self.negative_ttl_seconds = float(negative_ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(user_id: str, tdei_project_group_id: str, roles: List[str]) -> Tuple:
+        return user_id, tdei_project_group_id, tuple(sorted(roles))
+
+    def get(self, key: Tuple) -> Optional[bool]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Tuple, is_permitted: bool) -> None:
+        ttl = self.positive_ttl_seconds if is_permitted else self.negative_ttl_seconds
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (is_permitted, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,2 @@
+from .options import PipelineOptions
+from .validator import PipelineValidation, ErrorBudget
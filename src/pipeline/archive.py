@@ -0,0 +1,123 @@
+import os
+import posixpath
+import zipfile
+from typing import BinaryIO, List, Optional
+from python_osw_validation.extracted_data_validator import OSW_DATASET_FILES, ALLOWED_OSW_03_FILENAMES, \
+    _FILENAME_TO_KEY
+
+
+class ArchiveMember(str):
+    """
+    A GeoJSON file inside the archive. As a string it is the GDAL path of the member, so geopandas reads
+    it without the archive being extracted, and `os.path.basename` gives the name of the file.
+    """
+
+    def __new__(cls, archive: str, member: str):
+        path = super().__new__(cls, f'/vsizip/{{{os.path.abspath(archive)}}}/{member}')
+        path.archive = archive
+        path.member = member
+        return path
+
+    def __getnewargs__(self):
+        return self.archive, self.member
+
+    def open(self) -> BinaryIO:
+        # The archive stays open until the member is closed
+        with zipfile.ZipFile(self.archive) as archive:
+            return archive.open(self.member)
+
+
+def _is_hidden(name: str) -> bool:
+    return any(part.startswith('.') for part in name.split('/'))
+
+
+class ArchiveDataValidator:
+    """
+    `ExtractedDataValidator` on the member names of the archive, so its layout is checked without extracting it.
+    `files` and `externalExtensions` are `ArchiveMember`s, `read` gives the errors of `ZipFileHandler`.
+    """
+
+    def __init__(self, zipfile_path: str):
+        self.zipfile_path = zipfile_path
+        self.files: List[ArchiveMember] = []
+        self.externalExtensions: List[ArchiveMember] = []
+        self.error: Optional[str] = None
+        self._members: List[str] = []
+
+    def read(self) -> bool:
+        try:
+            with zipfile.ZipFile(self.zipfile_path) as archive:
+                infos = archive.infolist()
+            if len(infos) == 0:
+                raise Exception('ZIP file is empty')
+        except Exception as e:
+            self.error = f'Error extracting ZIP file: {e}'
+            return False
+        # Extraction goes one level down when the archive starts with a folder
+        root = next((info.filename for info in infos if info.is_dir()), '')
+        root_level, nested = [], []
+        for info in infos:
+            if info.is_dir() or not info.filename.startswith(root) or not info.filename.endswith('.geojson'):
+                continue
+            name = info.filename[len(root):]
+            if _is_hidden(name):
+                continue
+            depth = name.count('/')
+            if depth == 0:
+                root_level.append(info.filename)
+            elif depth == 1:
+                nested.append(info.filename)
+        self._members = root_level + nested
+        return True
+
+    def is_valid(self) -> bool:
+        geojson_files = [ArchiveMember(self.zipfile_path, member) for member in self._members]
+        if not geojson_files:
+            self.error = 'No .geojson files found in the specified directory or its subdirectories.'
+            return False
+
+        basenames = [posixpath.basename(file.member) for file in geojson_files]
+        if any(name.startswith('opensidewalks.') for name in basenames):
+            if any(name not in ALLOWED_OSW_03_FILENAMES for name in basenames):
+                allowed_fmt = ', '.join(ALLOWED_OSW_03_FILENAMES)
+                self.error = f'Dataset contains non-standard file names. The only allowed file names are {{{allowed_fmt}}}'
+                return False
+            duplicate_keys = []
+            for filename in ALLOWED_OSW_03_FILENAMES:
+                occurrences = [file for file, name in zip(geojson_files, basenames) if name == filename]
+                if len(occurrences) > 1:
+                    duplicate_keys.append(_FILENAME_TO_KEY.get(filename, filename))
+                elif len(occurrences) == 1:
+                    self.files.append(occurrences[0])
+            if duplicate_keys:
+                self.error = f'Multiple .geojson files of the same type found: {", ".join(duplicate_keys)}.'
+                return False
+            self.externalExtensions.extend([file for file in geojson_files if file not in self.files])
+            return True
+
+        allowed_keys = tuple(OSW_DATASET_FILES.keys())
+        unsupported_files = sorted({name for name in basenames if not any(key in name for key in allowed_keys)})
+        if unsupported_files:
+            allowed_names = f'*.{{{", ".join(allowed_keys)}}}.geojson'
+            self.error = (f"Unsupported .geojson files present: {', '.join(unsupported_files)}. "
+                          f"Allowed file names are {allowed_names}")
+            return False
+
+        missing_files, duplicate_files = [], []
+        # Required files first, like the library
+        for key, value in sorted(OSW_DATASET_FILES.items(), key=lambda item: not item[1]['required']):
+            occurrences = [file for file, name in zip(geojson_files, basenames) if key in name]
+            if len(occurrences) == 1:
+                self.files.append(occurrences[0])
+            elif len(occurrences) > 1:
+                duplicate_files.append(key)
+            elif value['required']:
+                missing_files.append(key)
+        if missing_files:
+            self.error = f'Missing required .geojson files: {", ".join(missing_files)}.'
+            return False
+        if duplicate_files:
+            self.error = f'Multiple .geojson files of the same type found: {", ".join(duplicate_files)}.'
+            return False
+        self.externalExtensions.extend([file for file in geojson_files if file not in self.files])
+        return True
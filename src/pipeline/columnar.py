@@ -0,0 +1,38 @@
+import os
+import logging
+from typing import Dict, Optional
+import geopandas as gpd
+
+logger = logging.getLogger('VALIDATION_PIPELINE')
+
+COLUMNAR_EXTENSION = '.parquet'
+
+
+def columnar_dir(zipfile_path: str) -> str:
+    """Directory next to the archive where its files are written as GeoParquet while they are validated"""
+    return f'{os.path.splitext(str(zipfile_path))[0]}{COLUMNAR_EXTENSION}'
+
+
+def write_columnar(gdf: gpd.GeoDataFrame, output_dir: str, osw_file: str) -> Optional[str]:
+    """
+    Writes the features of one OSW file, as geopandas read them, to `<output_dir>/<osw_file>.parquet`. Gives the
+    path of the file, None when it could not be written. A file that can not be written does not fail the validation.
+    """
+    path = os.path.join(output_dir, f'{osw_file}{COLUMNAR_EXTENSION}')
+    try:
+        os.makedirs(output_dir, exist_ok=True)
+        gdf.to_parquet(path, index=False)
+    except Exception as e:
+        logger.warning(f' Could not write {osw_file} as GeoParquet: {e}')
+        if os.path.isfile(path):
+            os.remove(path)
+        return None
+    return path
+
+
+def columnar_files(output_dir: str) -> Dict[str, str]:
+    """Paths of the GeoParquet files in `output_dir`, by OSW file"""
+    if not os.path.isdir(output_dir):
+        return {}
+    return {name[:-len(COLUMNAR_EXTENSION)]: os.path.join(output_dir, name) for name in sorted(os.listdir(output_dir))
+            if name.endswith(COLUMNAR_EXTENSION)}
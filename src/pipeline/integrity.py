@@ -0,0 +1,80 @@
+from typing import List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+
+def factorize_ids(columns: Sequence[np.ndarray]) -> Tuple[List[np.ndarray], List[np.ndarray], int]:
+    """
+    Integer codes of several id columns, equal ids getting the same code whatever the column, -1 for missing ids.
+    Ids that can not go in a set are compared as strings, column by column like `OSWValidation._get_colset`.
+    Gives the codes and the columns they were taken from, one per column, and the number of distinct ids.
+    """
+    if len({column.dtype for column in columns}) > 1:
+        # numpy would otherwise turn ints into strings or floats next to them
+        columns = [column.astype(object) for column in columns]
+    try:
+        codes, uniques = pd.factorize(np.concatenate(columns) if columns else np.array([], dtype=object))
+    except TypeError:
+        columns = [_hashable(column) for column in columns]
+        codes, uniques = pd.factorize(np.concatenate(columns))
+    return np.split(codes, np.cumsum([len(column) for column in columns])[:-1]), columns, len(uniques)
+
+
+def first_positions(mask: np.ndarray, codes: np.ndarray, limit: int) -> Tuple[int, np.ndarray]:
+    """Number of distinct codes where `mask` is set, and the positions where the first `limit` of them appear first"""
+    positions = np.flatnonzero(mask)
+    first = positions[~pd.Series(codes[positions]).duplicated().to_numpy()]
+    return len(first), first[:limit]
+
+
+def find_duplicates(ids: np.ndarray, limit: int) -> Tuple[int, list]:
+    """
+    Number of ids found more than once, and the first `limit` of them in the order they first appear,
+    like `OSWValidation.are_ids_unique`. Missing ids are one id like the others.
+    """
+    codes, uniques = pd.factorize(ids)
+    missing = codes < 0
+    counts = np.bincount(codes[~missing], minlength=len(uniques))
+    repeated = np.zeros(len(ids), dtype=bool)
+    repeated[~missing] = counts[codes[~missing]] > 1
+    if missing.sum() > 1:
+        repeated |= missing
+    count, first = first_positions(repeated, codes, limit)
+    return count, list(ids[first])
+
+
+def find_unmatched(ids: np.ndarray, references: Sequence[np.ndarray], limit: int) -> List[Tuple[int, list]]:
+    """
+    For each column of `references`, the number of distinct references that are not among `ids`, and the first
+    `limit` of them in the order they first appear. Missing ids and references are ignored, and nothing is
+    unmatched when there are no ids at all, like the id sets of `OSWValidation`.
+    """
+    (id_codes, *reference_codes), (_, *references), num_ids = factorize_ids([ids, *references])
+    known = np.zeros(num_ids, dtype=bool)
+    known[id_codes[id_codes >= 0]] = True
+    if not known.any():
+        return [(0, [])] * len(references)
+    results = []
+    for codes, column in zip(reference_codes, references):
+        unmatched = codes >= 0
+        unmatched[unmatched] = ~known[codes[unmatched]]
+        count, first = first_positions(unmatched, codes, limit)
+        results.append((count, list(column[first])))
+    return results
+
+
+def _hashable(values: np.ndarray) -> np.ndarray:
+    """The ids as they go in a set, as strings when some can not, like `OSWValidation._get_colset`"""
+    try:
+        pd.factorize(values)
+    except TypeError:
+        strings = np.empty(len(values), dtype=object)
+        strings[:] = [value if value is None or value != value else str(value) for value in values]
+        return strings
+    return values
+
+
+def flatten_ids(values: np.ndarray) -> np.ndarray:
+    """Ids of a list-like column, like the `_w_id` of zones, as one array"""
+    # Empty lists explode to NaN, dropped like the values that are missing
+    return pd.Series(values, dtype=object).dropna().explode().dropna().to_numpy()
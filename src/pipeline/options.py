@@ -0,0 +1,57 @@
+class PipelineOptions:
+    """
+    Switches of the validation pipeline. With every switch off the archive is validated by
+    `python-osw-validation` itself, see `enabled`.
+
+    * `fail_fast`: stop as soon as `max_errors` problems are found, in any stage. Files after that
+      point are not read and the messages count the problems found so far, not all of them.
+    * `file_workers`: number of processes that validate the files of an archive side by side. The
+      schema checks, the reading and the geometry checks of each file run in parallel, the id and
+      reference checks across files run once all of them are read. 0 or 1 validates one file at a time.
+    * `streaming`: check the schema of each feature as it is read from the file, instead of loading the
+      whole file first, see `FeatureStream`.
+    * `read_from_archive`: read the files from the archive instead of extracting it to disk first, see
+      `ArchiveDataValidator`.
+    * `vectorized_integrity`: find duplicate ids and unmatched references on integer codes of the ids instead
+      of Python sets, see `find_duplicates` and `find_unmatched`. The ids are listed in file order.
+    * `compiled_schemas`: check each file with the validator of its schema compiled once per process, see
+      `schema_validator`, and leave only the files with errors to the library. The streaming checks always
+      use the compiled validators.
+    * `columnar_output`: write the OSW files read by the integrity checks as GeoParquet next to the archive,
+      see `write_columnar`, for the archive to be kept in a columnar form once it is found valid.
+    """
+
+    def __init__(self, fail_fast: bool = False, file_workers: int = 0, streaming: bool = False,
+                 read_from_archive: bool = False, vectorized_integrity: bool = False, compiled_schemas: bool = False,
+                 columnar_output: bool = False):
+        self.fail_fast = bool(fail_fast)
+        self.file_workers = max(int(file_workers), 0)
+        self.streaming = bool(streaming)
+        self.read_from_archive = bool(read_from_archive)
+        self.vectorized_integrity = bool(vectorized_integrity)
+        self.compiled_schemas = bool(compiled_schemas)
+        self.columnar_output = bool(columnar_output)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the pipeline replaces the library validation"""
+        return self.fail_fast or self.file_workers > 1 or self.streaming or self.read_from_archive or \
+            self.vectorized_integrity or self.compiled_schemas or self.columnar_output
+
+    @property
+    def result_variant(self) -> str:
+        """Part of the result cache key, for the switches that change the validation result"""
+        return 'fail-fast' if self.fail_fast else ''
+
+    @classmethod
+    def from_settings(cls, settings) -> 'PipelineOptions':
+        return cls(fail_fast=settings.validation_fail_fast, file_workers=settings.validation_file_workers,
+                   streaming=settings.validation_streaming, read_from_archive=settings.validation_read_from_archive,
+                   vectorized_integrity=settings.validation_vectorized_integrity,
+                   compiled_schemas=settings.validation_compiled_schemas,
+                   columnar_output=settings.validation_columnar_output)
+
+    def to_dict(self) -> dict:
+        return {'fail_fast': self.fail_fast, 'file_workers': self.file_workers, 'streaming': self.streaming,
+                'read_from_archive': self.read_from_archive, 'vectorized_integrity': self.vectorized_integrity,
+                'compiled_schemas': self.compiled_schemas, 'columnar_output': self.columnar_output}
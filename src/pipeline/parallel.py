@@ -0,0 +1,57 @@
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from .schemas import warm_schemas
+
+logging.basicConfig()
+logger = logging.getLogger('VALIDATION_PIPELINE')
+logger.setLevel(logging.INFO)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _watch_parent(parent_pid: int) -> None:
+    # A validation worker killed on timeout cannot shut its pool down, its processes leave by themselves
+    def watch():
+        while os.getppid() == parent_pid:
+            time.sleep(1)
+        os._exit(1)
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def _init_file_worker(parent_pid: int) -> None:
+    _watch_parent(parent_pid)
+    warm_schemas()
+
+
+def file_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool that runs the per-file stages, shared by every validation of this process.
+    It is started on first use and lives as long as the process, a validation worker of
+    `ValidationEngine` takes it down with it when it is replaced.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=_init_file_worker, initargs=(os.getpid(),))
+            _pool_workers = workers
+            logger.info(f' Started file validation pool with {workers} processes')
+        return _pool
+
+
+def shutdown_file_pool() -> None:
+    global _pool, _pool_workers
+    with _pool_lock:
+        pool, _pool, _pool_workers = _pool, None, 0
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,85 @@
+import json
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+import jsonschema_rs
+from python_osw_validation import DEFAULT_DATASET_SCHEMAS
+
+logger = logging.getLogger('VALIDATION_PIPELINE')
+
+# Parts of a dataset schema that get their own validator
+COLLECTION = 'collection'
+FEATURE = 'feature'
+HEADER = 'header'
+
+_schemas: Dict[str, dict] = {}
+_validators: Dict[Tuple[str, str], Optional[jsonschema_rs.Draft7Validator]] = {}
+_lock = threading.Lock()
+
+
+def load_schema(schema_path: str) -> dict:
+    """
+    The schema at `schema_path`, read once per process. Each OSW version ships its own schema files,
+    so the path stands for the version of the schema. The schema is shared, it must not be changed.
+    """
+    schema = _schemas.get(schema_path)
+    if schema is None:
+        with open(schema_path, 'r') as file:
+            schema = json.load(file)
+        with _lock:
+            schema = _schemas.setdefault(schema_path, schema)
+    return schema
+
+
+def schema_part(schema: dict, part: str) -> Optional[dict]:
+    """
+    The part of a dataset schema that validates a whole collection, one of its features, or the
+    collection without its features. None when the features do not share one schema.
+    """
+    if part == COLLECTION:
+        return schema
+    features_schema = schema.get('properties', {}).get('features', {})
+    feature_schema = features_schema.get('items') if isinstance(features_schema, dict) else None
+    if not isinstance(feature_schema, dict):
+        return None
+    if part == FEATURE:
+        return feature_schema
+    # The array checks only count the features, see `PipelineValidation.validate_osw_stream`
+    return {**schema, 'properties': {
+        **schema['properties'],
+        'features': {key: value for key, value in features_schema.items() if key not in ('items', 'additionalItems')}
+    }}
+
+
+def schema_validator(schema_path: str, part: str = COLLECTION) -> Optional[jsonschema_rs.Draft7Validator]:
+    """Compiled validator of a part of the schema at `schema_path`, compiled once per process and shared by every job"""
+    key = (schema_path, part)
+    if key not in _validators:
+        schema = schema_part(load_schema(schema_path), part)
+        validator = jsonschema_rs.Draft7Validator(schema) if schema is not None else None
+        with _lock:
+            _validators.setdefault(key, validator)
+    return _validators[key]
+
+
+def warm_schemas(schema_paths: Iterable[str] = None) -> int:
+    """
+    Compiles the validators of the dataset schemas ahead of the first job, by default the schemas the library
+    picks for each OSW file. Gives the number of schemas ready, a schema that can not be read is skipped.
+    """
+    ready = 0
+    for schema_path in dict.fromkeys(schema_paths or DEFAULT_DATASET_SCHEMAS.values()):
+        try:
+            for part in (COLLECTION, FEATURE, HEADER):
+                schema_validator(schema_path, part)
+        except Exception as e:
+            logger.warning(f' Could not compile schema {schema_path}: {e}')
+            continue
+        ready += 1
+    return ready
+
+
+def clear_schemas() -> None:
+    with _lock:
+        _schemas.clear()
+        _validators.clear()
@@ -0,0 +1,139 @@
+import io
+import json
+from typing import BinaryIO, Iterator
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+WHITESPACE = ' \t\n\r'
+
+
+class StreamDecodeError(json.JSONDecodeError):
+    """`json.JSONDecodeError` located in the whole stream, without holding the document"""
+
+    def __init__(self, msg: str, pos: int, lineno: int, colno: int):
+        ValueError.__init__(self, f'{msg}: line {lineno} column {colno} (char {pos})')
+        self.msg = msg
+        self.doc = None
+        self.pos = pos
+        self.lineno = lineno
+        self.colno = colno
+
+    def __reduce__(self):
+        return self.__class__, (self.msg, self.pos, self.lineno, self.colno)
+
+
+class FeatureStream:
+    """
+    Reads a GeoJSON FeatureCollection from a binary file one feature at a time. Iterating gives the features
+    in file order, the other members of the collection are in `header` once the iteration is over. Only the
+    feature being decoded and about `chunk_size` characters around it are held, whatever the size of the file.
+
+    `header['features']` is left out when the features are an array, `feature_count` counts them.
+    The stream can be iterated once.
+    """
+
+    def __init__(self, file: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        # Text mode like `json.load` on an open file, so errors are located on the same characters
+        self.file = io.TextIOWrapper(file, encoding='utf-8')
+        self.chunk_size = chunk_size
+        self.header = {}
+        self.feature_count = 0
+        self.has_feature_array = False
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        # Position of the buffer in the whole stream, to locate errors
+        self._offset = 0
+        self._lines = 0
+        self._line_start = 0
+
+    def __iter__(self) -> Iterator:
+        self._expect('{', 'Expecting value')
+        if self._peek() == '}':
+            self._pos += 1
+        else:
+            while True:
+                if self._peek() != '"':
+                    raise self._error('Expecting property name enclosed in double quotes')
+                key = self._value()
+                self._expect(':', "Expecting ':' delimiter")
+                if key == 'features' and self._peek() == '[':
+                    self._pos += 1
+                    self.has_feature_array = True
+                    yield from self._features()
+                else:
+                    self.header[key] = self._value()
+                if self._expect(',}', "Expecting ',' delimiter") == '}':
+                    break
+        if self._peek():
+            raise self._error('Extra data')
+
+    def _features(self) -> Iterator:
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            feature = self._value()
+            self.feature_count += 1
+            yield feature
+            if self._expect(',]', "Expecting ',' delimiter") == ']':
+                return
+
+    def _value(self):
+        """Decodes the value at the cursor, reading until it is complete"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    raise self._error(e.msg, e.pos)
+                self._read(grow=True)
+                continue
+            # A number or a literal that ends the buffer may go on in the next chunk
+            if end < len(self._buffer) or self._eof:
+                self._pos = end
+                return value
+            self._read(grow=True)
+
+    def _peek(self) -> str:
+        """Skips whitespace, gives the next character or '' at the end of the stream"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if self._eof:
+                return ''
+            self._read()
+
+    def _expect(self, characters: str, message: str) -> str:
+        character = self._peek()
+        if not character or character not in characters:
+            raise self._error(message)
+        self._pos += 1
+        return character
+
+    def _read(self, grow: bool = False) -> None:
+        # A value longer than the buffer doubles the read, so decoding it again stays linear overall
+        size = max(self.chunk_size, len(self._buffer) - self._pos) if grow else self.chunk_size
+        data = self.file.read(size)
+        if not data:
+            self._eof = True
+        consumed = self._buffer[:self._pos]
+        newlines = consumed.count('\n')
+        if newlines:
+            self._lines += newlines
+            self._line_start = self._offset + consumed.rindex('\n') + 1
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+
+    def _error(self, message: str, pos: int = None) -> StreamDecodeError:
+        pos = self._pos if pos is None else pos
+        newlines = self._buffer.count('\n', 0, pos)
+        if newlines:
+            colno = pos - self._buffer.rindex('\n', 0, pos)
+        else:
+            colno = self._offset + pos - self._line_start + 1
+        return StreamDecodeError(message, self._offset + pos, self._lines + newlines + 1, colno)
@@ -0,0 +1,608 @@
+import gc
+import io
+import os
+import json
+import time
+import traceback
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager, closing
+from typing import BinaryIO, Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import jsonschema_rs
+from python_osw_validation import OSWValidation, ValidationResult
+from python_osw_validation.helpers import _add_additional_properties_hint, _pretty_message, _rank_for
+from python_osw_validation.zipfile_handler import ZipFileHandler
+from python_osw_validation.extracted_data_validator import ExtractedDataValidator, OSW_DATASET_FILES
+from .archive import ArchiveDataValidator, ArchiveMember
+from .columnar import columnar_dir, write_columnar
+from .integrity import find_duplicates, find_unmatched, flatten_ids
+from .options import PipelineOptions
+from .parallel import file_pool, shutdown_file_pool
+from .schemas import FEATURE, HEADER, load_schema, schema_part, schema_validator
+from .streaming import FeatureStream
+
+# Columns the cross-file checks need once the geometries have been checked
+ID_COLUMNS = ('_id', '_u_id', '_v_id', '_w_id')
+
+
+class ErrorBudget:
+    """
+    Counts the problems found by the stages of a validation. The budget is spent once `max_errors`
+    problems are found, which only stops the validation when `enforced`.
+    """
+
+    def __init__(self, max_errors: int, enforced: bool = False):
+        self.max_errors = max_errors
+        self.enforced = enforced
+        self.spent = 0
+
+    def add(self, problems: int) -> None:
+        self.spent += problems
+
+    @property
+    def remaining(self) -> int:
+        return max(self.max_errors - self.spent, 0)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.enforced and self.spent >= self.max_errors
+
+
+class FileResult:
+    """What a per-file stage found in one file, merged back into the validation in file order"""
+
+    def __init__(self, value, errors: list, issues: list, feature_counts: dict, problems: int):
+        self.value = value
+        self.errors = errors
+        self.issues = issues
+        self.feature_counts = feature_counts
+        self.problems = problems
+
+
+class PipelineValidation(OSWValidation):
+    """
+    The validation of `python-osw-validation`, split into stages that `PipelineOptions` can change.
+    With the options off it gives the same result as `OSWValidation.validate`, except that a file is
+    reduced to its id columns once its own checks ran, instead of being held until the end.
+
+    Stages are timed like `InstrumentedOSWValidation`: `extraction`, `schema`, `integrity` and `validation`.
+    The schema checks and the reading of each file are per-file stages, see `map_files`, the id and
+    reference checks run once every file is read.
+    """
+
+    def __init__(self, zipfile_path: str, options: Optional[PipelineOptions] = None, **kwargs):
+        super().__init__(zipfile_path=zipfile_path, **kwargs)
+        self.options = options or PipelineOptions()
+        # Schema paths, for the validators that run the per-file stages in other processes
+        self.validator_kwargs = kwargs
+        self.stage_seconds = {}
+        self.feature_counts = {}
+        self.budget = None
+        # Document the library validates next, already loaded by `validate_osw_document`
+        self._loaded = None
+        # Where the files read by the integrity stage are written as GeoParquet, see `write_columnar`
+        self.output_dir = columnar_dir(zipfile_path) if self.options.columnar_output and zipfile_path else None
+
+    @contextmanager
+    def stage(self, name: str):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + time.perf_counter() - start_time
+
+    def validate(self, max_errors=20) -> ValidationResult:
+        self.budget = ErrorBudget(max_errors, enforced=self.options.fail_fast)
+        zip_handler = None
+        try:
+            with self.stage('validation'):
+                with self.stage('extraction'):
+                    if self.options.read_from_archive:
+                        files = self.open_members()
+                    else:
+                        zip_handler = ZipFileHandler(self.zipfile_path)
+                        files = self.open_archive(zip_handler)
+                if files is None:
+                    return ValidationResult(False, self.errors, self.issues)
+                with self.stage('schema'):
+                    self.validate_schemas(files, max_errors)
+                if self.errors:
+                    return ValidationResult(False, self.errors, self.issues)
+                with self.stage('integrity'):
+                    self.check_integrity(files, max_errors)
+            return ValidationResult(not self.errors, self.errors, self.issues)
+        except Exception as e:
+            self.log_errors(message=f'Unable to validate: {e}', filename=None, feature_index=None)
+            traceback.print_exc()
+            return ValidationResult(False, self.errors, self.issues)
+        finally:
+            if zip_handler:
+                zip_handler.remove_extracted_files()
+            gc.collect()
+
+    # Extracts the archive and checks its layout, returns the validator listing its files or None
+    def open_archive(self, zip_handler: ZipFileHandler) -> Optional[ExtractedDataValidator]:
+        self.extracted_dir = zip_handler.extract_zip()
+        if not self.extracted_dir:
+            self.log_errors(message=zip_handler.error, filename=self.zipfile_path, feature_index=None)
+            return None
+        files = ExtractedDataValidator(self.extracted_dir)
+        if not files.is_valid():
+            upload_name = os.path.basename(self.zipfile_path) if self.zipfile_path else self.extracted_dir
+            self.log_errors(message=files.error, filename=upload_name, feature_index=None)
+            return None
+        return files
+
+    # Checks the layout of the archive from its member names, the files are read from the archive
+    def open_members(self) -> Optional[ArchiveDataValidator]:
+        files = ArchiveDataValidator(self.zipfile_path)
+        if not files.read():
+            self.log_errors(message=files.error, filename=self.zipfile_path, feature_index=None)
+            return None
+        if not files.is_valid():
+            self.log_errors(message=files.error, filename=os.path.basename(self.zipfile_path), feature_index=None)
+            return None
+        return files
+
+    def map_files(self, stage: str, file_paths: list, max_errors: int) -> Iterator[FileResult]:
+        """
+        Runs the per-file `stage` on every file and yields the results in file order. With `file_workers`
+        above 1 the files are sent to the process pool all at once, otherwise each file is run here
+        when its result is asked for, so a caller that stops early skips the files after it.
+        """
+        args = (self.validator_kwargs, self.options, stage)
+        if self.options.file_workers > 1 and len(file_paths) > 1:
+            pool = file_pool(self.options.file_workers)
+            futures = [pool.submit(run_file_stage, *args, file_path, max_errors, self.budget.spent, self.output_dir)
+                       for file_path in file_paths]
+            try:
+                for future in futures:
+                    yield future.result()
+            except BrokenProcessPool:
+                # A process of the pool died, the next validation starts a new pool
+                shutdown_file_pool()
+                raise
+            finally:
+                for future in futures:
+                    future.cancel()
+        else:
+            for file_path in file_paths:
+                yield run_file_stage(*args, file_path, max_errors, self.budget.spent, self.output_dir)
+
+    def merge(self, result: FileResult):
+        self.errors.extend(result.errors)
+        self.issues.extend(result.issues)
+        self.feature_counts.update(result.feature_counts)
+        self.budget.add(result.problems)
+        return result.value
+
+    def validate_schemas(self, files: ExtractedDataValidator, max_errors: int) -> None:
+        with closing(self.map_files('schema', files.files, max_errors)) as results:
+            for result in results:
+                # The library stops once the errors of all the files so far reach max_errors
+                keep_going = self.merge(result) and len(self.errors) < max_errors
+                self.budget.spent = len(self.errors)
+                if not keep_going:
+                    break
+
+    def validate_osw_errors(self, file_path: str, max_errors: int) -> bool:
+        if self.options.streaming:
+            return self.validate_osw_stream(file_path, max_errors)
+        if self.options.compiled_schemas:
+            return self.validate_osw_document(file_path, max_errors)
+        return super().validate_osw_errors(file_path=file_path, max_errors=max_errors)
+
+    def validate_osw_document(self, file_path: str, max_errors: int) -> bool:
+        """
+        `validate_osw_errors` of the library, with the file checked first by the compiled validator of its schema,
+        see `schema_validator`. A valid file is done there, the library only goes over the files with errors, on
+        the document already loaded, to list them.
+        """
+        try:
+            geojson_data = self.load_osw_file(file_path)
+        except (json.JSONDecodeError, OSError):
+            return False
+        schema_url = geojson_data.get('$schema')
+        if not (isinstance(schema_url, str) and '0.2/schema.json' in schema_url):
+            try:
+                validator = schema_validator(self.pick_schema_for_file(file_path, geojson_data))
+            except Exception:
+                # The library reports the schema that can not be read
+                validator = None
+            if validator is not None and validator.is_valid(geojson_data):
+                return len(self.errors) < max_errors
+        self._loaded = (file_path, geojson_data)
+        try:
+            return super().validate_osw_errors(file_path=file_path, max_errors=max_errors)
+        finally:
+            self._loaded = None
+
+    def load_osw_schema(self, schema_path: str):
+        try:
+            return load_schema(schema_path)
+        except Exception:
+            # Logs and raises like the library
+            return super().load_osw_schema(schema_path)
+
+    def validate_osw_stream(self, file_path: str, max_errors: int) -> bool:
+        """
+        `validate_osw_errors` on features streamed from the file, see `FeatureStream`. Each feature is checked
+        against the feature schema as it is read, the other members of the collection once every feature is
+        read. Gives the same errors and issues, except that errors on the members of the collection come after
+        the errors on its features, and that the file stops being read once the errors go past `max_errors`.
+        """
+        filename = os.path.basename(file_path)
+        schema_path = self.pick_schema_for_file(file_path, {})
+        schema = self.load_osw_schema(schema_path)
+        feature_schema = schema_part(schema, FEATURE)
+        if feature_schema is None:
+            # The features can only be checked one at a time when they share one schema
+            return super().validate_osw_errors(file_path=file_path, max_errors=max_errors)
+        feature_validator = schema_validator(schema_path, FEATURE)
+        errors_before, issues_before = len(self.errors), len(self.issues)
+        legacy_count = 0
+        feature_issues = []
+
+        # Same cap as the library, the file stops being read at the first error past it
+        def log_schema_error(err) -> bool:
+            nonlocal legacy_count
+            if legacy_count >= max_errors:
+                return False
+            self.errors.append(f'Validation error: {_add_additional_properties_hint(getattr(err, "message", "") or "")}')
+            legacy_count += 1
+            return True
+
+        try:
+            with self.open_geojson(file_path) as file:
+                stream = FeatureStream(file)
+                stopped = False
+                for feature_index, feature in enumerate(stream):
+                    # Most features are valid, the errors are only looked for in the others
+                    if feature_validator.is_valid(feature):
+                        continue
+                    best = None
+                    for err in feature_validator.iter_errors(feature):
+                        if not log_schema_error(err):
+                            stopped = True
+                            break
+                        if best is None or _rank_for(err) < best[0]:
+                            best = (_rank_for(err), err)
+                    if best:
+                        feature_issues.append((feature_index, _pretty_message(best[1], feature_schema)))
+                    if stopped:
+                        break
+        except json.JSONDecodeError as e:
+            self.log_errors(
+                message=f"Failed to parse '{filename}' as valid JSON. {e.msg} (line {e.lineno}, column {e.colno}, "
+                        f"char {e.pos}).",
+                filename=filename,
+                feature_index=None
+            )
+            return False
+        except OSError as e:
+            self.log_errors(message=f"Unable to read file '{filename}': {e.strerror or e}", filename=filename,
+                            feature_index=None)
+            return False
+        self.feature_counts[dataset_key(file_path) or filename] = stream.feature_count
+
+        schema_url = stream.header.get('$schema')
+        if isinstance(schema_url, str) and '0.2/schema.json' in schema_url:
+            # The 0.2 checks look at the whole collection, the library reads the file again
+            del self.errors[errors_before:], self.issues[issues_before:]
+            return super().validate_osw_errors(file_path=file_path, max_errors=max_errors)
+
+        if not stopped:
+            header = dict(stream.header)
+            features_schema = schema['properties']['features']
+            if stream.has_feature_array:
+                # The array checks only count the features, placeholders stand in for them
+                header['features'] = [None] * min(stream.feature_count, features_schema.get('minItems', 0) + 1)
+            header_errors = []
+            for err in schema_validator(schema_path, HEADER).iter_errors(header):
+                if not log_schema_error(err):
+                    break
+                header_errors.append(err)
+            if header_errors:
+                best_err = min(header_errors, key=_rank_for)
+                feature_issues.append((-1, _pretty_message(best_err, schema_part(schema, HEADER))))
+
+        for feature_index, message in feature_issues:
+            self.issues.append({'filename': filename, 'feature_index': feature_index, 'error_message': [message]})
+        return len(self.errors) < max_errors
+
+    def open_geojson(self, file_path: str) -> BinaryIO:
+        if isinstance(file_path, ArchiveMember):
+            return file_path.open()
+        return open(file_path, 'rb')
+
+    def load_osw_file(self, graph_geojson_path: str):
+        if self._loaded is not None and self._loaded[0] == graph_geojson_path:
+            return self._loaded[1]
+        if isinstance(graph_geojson_path, ArchiveMember):
+            geojson_data = self.load_osw_member(graph_geojson_path)
+        else:
+            geojson_data = super().load_osw_file(graph_geojson_path)
+        features = geojson_data.get('features') if isinstance(geojson_data, dict) else None
+        self.feature_counts[dataset_key(graph_geojson_path) or os.path.basename(graph_geojson_path)] = \
+            len(features) if isinstance(features, list) else 0
+        return geojson_data
+
+    def load_osw_member(self, member: ArchiveMember):
+        """`load_osw_file` of the library, on a file read from the archive"""
+        filename = os.path.basename(member)
+        try:
+            with io.TextIOWrapper(member.open(), encoding='utf-8') as file:
+                return json.load(file)
+        except json.JSONDecodeError as e:
+            self.log_errors(
+                message=f"Failed to parse '{filename}' as valid JSON. {e.msg} (line {e.lineno}, column {e.colno}, "
+                        f"char {e.pos}).",
+                filename=filename,
+                feature_index=None
+            )
+            raise
+        except OSError as e:
+            self.log_errors(message=f"Unable to read file '{filename}': {e.strerror or e}", filename=filename,
+                            feature_index=None)
+            raise
+
+    def check_integrity(self, files: ExtractedDataValidator, max_errors: int) -> None:
+        datasets: Dict[str, Optional[gpd.GeoDataFrame]] = {}
+        invalid_geometries: Dict[str, list] = {}
+        with closing(self.map_files('integrity', files.files, max_errors)) as results:
+            for result in results:
+                osw_file, ids, invalid_ids = self.merge(result)
+                if osw_file:
+                    if invalid_ids is not None:
+                        invalid_geometries[osw_file] = invalid_ids
+                    datasets[osw_file] = ids
+                del result, ids
+                if self.budget.exhausted:
+                    break
+        self.check_duplicate_ids(datasets, max_errors)
+        if not self.budget.exhausted:
+            self.check_references(datasets, max_errors)
+        # Found along with the duplicates, logged after the references like the library does
+        self.log_invalid_geometries(invalid_geometries, max_errors)
+        del datasets
+        if not self.budget.exhausted:
+            self.check_extensions(files, max_errors)
+
+    def read_file_ids(self, file_path: str) -> tuple:
+        """
+        Reads one file and checks its geometries. Gives its OSW key, its id columns (None when it could
+        not be read) and the ids of its invalid geometries (None when not checked)
+        """
+        osw_file = dataset_key(file_path)
+        gdf = self.read_dataset(file_path)
+        if not osw_file or gdf is None:
+            return osw_file, None, None
+        invalid_ids = self.find_invalid_geometries(osw_file, gdf)
+        if self.output_dir and not invalid_ids:
+            # A file with invalid geometries makes the whole dataset invalid, nothing of it is kept
+            write_columnar(gdf, self.output_dir, osw_file)
+        return osw_file, gdf[[column for column in ID_COLUMNS if column in gdf.columns]], invalid_ids
+
+    def read_dataset(self, file_path: str) -> Optional[gpd.GeoDataFrame]:
+        try:
+            return gpd.read_file(file_path)
+        except Exception as e:
+            self.log_errors(
+                message=f"Failed to read '{os.path.basename(file_path)}' as GeoJSON: {e}",
+                filename=os.path.basename(file_path),
+                feature_index=None
+            )
+            self.budget.add(1)
+            return None
+
+    def find_invalid_geometries(self, osw_file: str, gdf: gpd.GeoDataFrame) -> list:
+        """Ids of the features with a geometry of the wrong type or not valid, the index without ids"""
+        expected_geom = OSW_DATASET_FILES.get(osw_file, {}).get('geometry')
+        if expected_geom:
+            wrong_type = gdf.geometry.type != expected_geom
+            # Only the type is checked once the budget is spent, validity is the expensive part
+            if self.budget.enforced and wrong_type.sum() >= self.budget.remaining:
+                invalid = wrong_type
+            else:
+                invalid = wrong_type | (gdf.is_valid == False)
+        else:
+            invalid = gdf.is_valid == False
+        invalid_geojson = gdf[invalid]
+        if len(invalid_geojson) == 0:
+            return []
+        ids_series = invalid_geojson['_id'] if '_id' in invalid_geojson.columns else invalid_geojson.index
+        invalid_ids = list(set(ids_series))
+        self.budget.add(len(invalid_ids))
+        return invalid_ids
+
+    def check_duplicate_ids(self, datasets: Dict[str, Optional[gpd.GeoDataFrame]], max_errors: int) -> None:
+        for osw_file, gdf in datasets.items():
+            if self.budget.exhausted:
+                return
+            if gdf is None:
+                continue
+            if self.options.vectorized_integrity:
+                total_duplicates, duplicates = find_duplicates(gdf['_id'].to_numpy(), max_errors)
+            else:
+                _, duplicates = self.are_ids_unique(gdf)
+                total_duplicates = len(duplicates)
+            if not total_duplicates:
+                continue
+            displayed = ', '.join(map(str, duplicates[:max_errors]))
+            if total_duplicates > max_errors:
+                message = (f"Duplicate _id's found in {osw_file}: showing first {max_errors} "
+                           f"of {total_duplicates} duplicates: {displayed}")
+            else:
+                message = f"Duplicate _id's found in {osw_file}: {displayed}"
+            self.log_errors(message=message, filename=osw_file, feature_index=None)
+            self.budget.add(total_duplicates)
+
+    def check_references(self, datasets: Dict[str, Optional[gpd.GeoDataFrame]], max_errors: int) -> None:
+        if self.options.vectorized_integrity:
+            self.check_reference_arrays(datasets, max_errors)
+            return
+        nodes_df = datasets.get('nodes')
+        edges_df = datasets.get('edges')
+        zones_df = datasets.get('zones')
+
+        node_ids = self._get_colset(nodes_df, '_id', 'nodes') if nodes_df is not None else set()
+        node_ids_edges_u = self._get_colset(edges_df, '_u_id', 'edges') if edges_df is not None else set()
+        node_ids_edges_v = self._get_colset(edges_df, '_v_id', 'edges') if edges_df is not None else set()
+
+        # zones: _w_id is list-like per feature
+        node_ids_zones_w = set()
+        if zones_df is not None:
+            if '_w_id' in zones_df.columns:
+                node_ids_zones_w = set(
+                    item
+                    for sub in zones_df['_w_id'].dropna().tolist()
+                    for item in (sub if isinstance(sub, (list, tuple)) else [sub])
+                )
+            else:
+                self.log_errors("Missing required column '_w_id' in zones.", 'zones', None)
+
+        for references, column, osw_file in ((node_ids_edges_u, '_u_id', 'edges'),
+                                             (node_ids_edges_v, '_v_id', 'edges'),
+                                             (node_ids_zones_w, '_w_id', 'zones')):
+            if self.budget.exhausted:
+                return
+            if node_ids and references:
+                unmatched = list(references - node_ids)
+                self.log_unmatched(len(unmatched), unmatched[:max_errors], column, osw_file, max_errors)
+
+    def check_reference_arrays(self, datasets: Dict[str, Optional[gpd.GeoDataFrame]], max_errors: int) -> None:
+        """`check_references` on integer codes of the ids, see `find_unmatched`. Lists unmatched ids in file order"""
+        node_ids = self.id_array(datasets.get('nodes'), '_id', 'nodes')
+        columns = ((self.id_array(datasets.get('edges'), '_u_id', 'edges'), '_u_id', 'edges'),
+                   (self.id_array(datasets.get('edges'), '_v_id', 'edges'), '_v_id', 'edges'),
+                   (flatten_ids(self.id_array(datasets.get('zones'), '_w_id', 'zones')), '_w_id', 'zones'))
+        results = find_unmatched(node_ids, [references for references, _, _ in columns], max_errors)
+        for (num_unmatched, unmatched), (_, column, osw_file) in zip(results, columns):
+            if self.budget.exhausted:
+                return
+            self.log_unmatched(num_unmatched, unmatched, column, osw_file, max_errors)
+
+    def id_array(self, gdf: Optional[gpd.GeoDataFrame], column: str, osw_file: str) -> np.ndarray:
+        """Values of an id column, logs a missing column like `_get_colset`"""
+        if gdf is None:
+            return np.array([], dtype=object)
+        if column not in gdf.columns:
+            self.log_errors(f"Missing required column '{column}' in {osw_file}.", osw_file, None)
+            return np.array([], dtype=object)
+        return gdf[column].to_numpy()
+
+    def log_unmatched(self, num_unmatched: int, unmatched: list, column: str, osw_file: str, max_errors: int) -> None:
+        if not num_unmatched:
+            return
+        displayed_unmatched = ', '.join(map(str, unmatched[:min(num_unmatched, max_errors)]))
+        self.log_errors(
+            message=(f"All {column}'s in {osw_file} should be part of _id's mentioned in nodes. "
+                     f"Showing {max_errors if num_unmatched > max_errors else 'all'} out of {num_unmatched} "
+                     f"unmatched {column}'s: {displayed_unmatched}"),
+            filename='All',
+            feature_index=None
+        )
+        self.budget.add(num_unmatched)
+
+    def log_invalid_geometries(self, invalid_geometries: Dict[str, list], max_errors: int) -> None:
+        for osw_file, invalid_ids in invalid_geometries.items():
+            if not invalid_ids:
+                continue
+            num_invalid = len(invalid_ids)
+            displayed_invalid = ', '.join(map(str, invalid_ids[:min(num_invalid, max_errors)]))
+            self.log_errors(
+                message=(f"Showing {max_errors if num_invalid > max_errors else 'all'} out of {num_invalid} "
+                         f"invalid {osw_file} geometries, id's of invalid geometries: {displayed_invalid}"),
+                filename='All',
+                feature_index=None
+            )
+
+    def check_extensions(self, files: ExtractedDataValidator, max_errors: int) -> None:
+        for file in files.externalExtensions:
+            if self.budget.exhausted:
+                return
+            file_name = os.path.basename(file)
+            try:
+                extension_file = gpd.read_file(file)
+            except Exception as e:
+                self.log_errors(message=f"Failed to read extension '{file_name}' as GeoJSON: {e}",
+                                filename=file_name, feature_index=None)
+                self.budget.add(1)
+                continue
+
+            invalid_geojson = extension_file[extension_file.is_valid == False]
+            if len(invalid_geojson) > 0:
+                try:
+                    invalid_ids = list(set(invalid_geojson.get('_id', invalid_geojson.index)))
+                    num_invalid = len(invalid_ids)
+                    displayed_invalid = ', '.join(map(str, invalid_ids[:min(num_invalid, max_errors)]))
+                    self.log_errors(
+                        message=(f"Invalid geometries found in extension file `{file_name}`. "
+                                 f"Showing {max_errors if num_invalid > max_errors else 'all'} of {num_invalid} "
+                                 f"invalid geometry IDs: {displayed_invalid}"),
+                        filename=file_name,
+                        feature_index=None
+                    )
+                    self.budget.add(num_invalid)
+                except Exception as e:
+                    self.log_errors(
+                        message=f"Invalid features found in `{file_name}`, but failed to extract IDs: {e}",
+                        filename=file_name,
+                        feature_index=None
+                    )
+                    self.budget.add(1)
+
+            error = serialization_error(extension_file.drop(columns='geometry'))
+            if error is not None:
+                self.log_errors(message=f"Extension file `{file_name}` has non-serializable properties: {error}",
+                                filename=file_name, feature_index=None)
+                self.budget.add(1)
+                # The library stops at the first extension file that can not be serialized
+                break
+
+
+def run_file_stage(validator_kwargs: dict, options: PipelineOptions, stage: str, file_path: str, max_errors: int,
+                   budget_spent: int, output_dir: str = None) -> FileResult:
+    """Runs the per-file `stage` of a validation on one file, in this process or in one of the pool"""
+    validator = PipelineValidation(zipfile_path=None, options=options, **validator_kwargs)
+    validator.output_dir = output_dir
+    validator.budget = ErrorBudget(max_errors, enforced=options.fail_fast)
+    validator.budget.spent = budget_spent
+    if stage == 'schema':
+        value = validator.validate_osw_errors(file_path=file_path, max_errors=max_errors)
+    else:
+        value = validator.read_file_ids(file_path)
+    return FileResult(value, validator.errors, validator.issues, validator.feature_counts,
+                      validator.budget.spent - budget_spent)
+
+
+def serialization_error(properties: pd.DataFrame) -> Optional[Exception]:
+    """
+    The error of the first row of `properties` that can not be dumped as JSON, None when all of them can. Columns
+    of numbers, booleans or strings can always be dumped, the rows are only dumped with the other columns, as
+    dicts instead of the series of `iterrows`. The rows are gone through in the same order, so the error is the same.
+    """
+    columns = [column for column, dtype in properties.dtypes.items() if not _always_serializable(dtype)]
+    if not columns:
+        return None
+    try:
+        for row in properties[columns].to_dict('records'):
+            json.dumps(row)
+    except Exception as e:
+        return e
+    return None
+
+
+def _always_serializable(dtype) -> bool:
+    if isinstance(dtype, np.dtype):
+        return dtype.kind in 'biuf'
+    # Missing strings are NaN, pd.NA can not be dumped
+    return isinstance(dtype, pd.StringDtype) and dtype.na_value is np.nan
+
+
+def dataset_key(file_path: str) -> str:
+    """Key of the OSW file, like `edges` for `opensidewalks.edges.geojson`, empty for other files"""
+    file_name = os.path.basename(str(file_path))
+    return next((osw_key for osw_key in OSW_DATASET_FILES.keys() if osw_key in file_name), '')
@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Optional
+import python_osw_validation
+from .interface.cache_backend_abstract import CacheBackendAbstract
+from .models.queue_message_content import ValidationResult
+
+logging.basicConfig()
+logger = logging.getLogger('RESULT_CACHE')
+logger.setLevel(logging.INFO)
+
+
+class LocalDiskCacheBackend(CacheBackendAbstract):
+    """
+    Stores every entry as a small json file in `cache_dir`.
+    Entries older than `ttl_seconds` are ignored and removed, and the oldest
+    entries are evicted once the directory grows over `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 100 * 1024 * 1024, ttl_seconds: int = 86400):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_bytes)
+        self.ttl_seconds = int(ttl_seconds)
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path_for(key)
+        with self._lock:
+            try:
+                if self._is_expired(os.path.getmtime(path)):
+                    os.remove(path)
+                    return None
+                with open(path, 'r') as entry:
+                    return json.load(entry)
+            except (OSError, ValueError):
+                return None
+
+    def set(self, key: str, value: dict) -> None:
+        path = self._path_for(key)
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        with self._lock:
+            with open(temp_path, 'w') as entry:
+                json.dump(value, entry)
+            os.replace(temp_path, path)
+            self._evict()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            try:
+                os.remove(self._path_for(key))
+            except FileNotFoundError:
+                pass
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def _is_expired(self, modified_time: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - modified_time > self.ttl_seconds
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if self._is_expired(stat.st_mtime):
+                os.remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            os.remove(path)
+            total_size -= size
+
+
+class ResultCache:
+    """
+    Caches validation results by the content hash of the archive, so the same
+    zip uploaded again does not go through the OSW validation a second time.
+    The key also carries the validator version and max_errors, since both change the result,
+    and `variant` for validation options that change it too.
+    """
+
+    def __init__(self, backend: CacheBackendAbstract, variant: str = ''):
+        self.backend = backend
+        self.variant = variant
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(content_hash: str, max_errors: int, variant: str = '') -> str:
+        key = f'{content_hash}-{python_osw_validation.__version__}-{max_errors}'
+        return f'{key}-{variant}' if variant else key
+
+    def get(self, content_hash: str, max_errors: int) -> Optional[ValidationResult]:
+        value = None
+        try:
+            value = self.backend.get(self.make_key(content_hash, max_errors, self.variant))
+        except Exception as e:
+            logger.error(f'Error reading validation result from cache: {e}')
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        result = ValidationResult()
+        result.is_valid = value['is_valid']
+        result.validation_message = value['validation_message']
+        return result
+
+    def set(self, content_hash: str, max_errors: int, result: ValidationResult) -> None:
+        try:
+            self.backend.set(self.make_key(content_hash, max_errors, self.variant), {
+                'is_valid': result.is_valid,
+                'validation_message': result.validation_message
+            })
+        except Exception as e:
+            logger.error(f'Error writing validation result to cache: {e}')
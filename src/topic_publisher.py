@@ -0,0 +1,183 @@
+import json
+import logging
+import threading
+from typing import List, Tuple
+from concurrent.futures import Future
+from azure.servicebus import ServiceBusMessage
+from python_ms_core.core.queue.models.queue_message import QueueMessage
+
+logging.basicConfig()
+logger = logging.getLogger('TOPIC_PUBLISHER')
+logger.setLevel(logging.INFO)
+
+
+class TopicPublisher:
+    """
+    Keeps one topic client for the lifetime of the service instead of opening a new one per message.
+    The client is created on first use and sends one message or batch at a time, service bus senders are not
+    thread safe. A failed send is tried once more on a new client before it fails.
+
+    With `batch_size` above 1 messages are buffered and sent together once `batch_size`
+    messages are waiting or `flush_interval_ms` has passed since the first buffered message.
+    `publish` waits for the batch of its message to be sent. A batch that could not be sent is buffered again
+    and retried after `flush_interval_ms`, only the messages still buffered when the publisher closes are lost.
+    """
+
+    def __init__(self, core, topic_name: str, batch_size: int = 1, flush_interval_ms: int = 500):
+        self.core = core
+        self.topic_name = topic_name
+        self.batch_size = max(int(batch_size), 1)
+        self.flush_interval = max(int(flush_interval_ms), 0) / 1000
+        self._topic = None
+        self._topic_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._pending: List[Tuple[QueueMessage, Future]] = []
+        self._pending_lock = threading.Lock()
+        self._timer = None
+
+    def publish(self, data: QueueMessage) -> None:
+        """
+        Returns once the message is on the topic. A buffered message waits for its batch to be sent, so the
+        incoming message it answers is only settled after that. Raises when the message could not be published.
+        """
+        if self.batch_size == 1:
+            self._send([data])
+            return
+        sent = Future()
+        batch = None
+        with self._pending_lock:
+            self._pending.append((data, sent))
+            if len(self._pending) >= self.batch_size:
+                batch = self._take_pending()
+            else:
+                self._start_timer()
+        if batch:
+            try:
+                self._send_or_keep(batch)
+            except Exception as e:
+                logger.error(f'Error occurred while publishing batch to {self.topic_name}, '
+                             f'{len(batch)} messages are kept to retry: {e}')
+        sent.result()
+
+    def flush(self) -> None:
+        """Sends the buffered messages. When that fails they stay buffered and the error is raised"""
+        with self._pending_lock:
+            batch = self._take_pending()
+        if batch:
+            self._send_or_keep(batch)
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            with self._pending_lock:
+                dropped = self._take_pending()
+            logger.error(f'Error occurred while flushing pending messages for {self.topic_name}, '
+                         f'{len(dropped)} messages are not published: {e}')
+            for _, sent in dropped:
+                sent.set_exception(e)
+        with self._topic_lock:
+            topic, self._topic = self._topic, None
+        if topic is not None:
+            self._close_topic(topic)
+
+    def _take_pending(self) -> List[Tuple[QueueMessage, Future]]:
+        # Caller holds the pending lock
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _start_timer(self) -> None:
+        # Caller holds the pending lock
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _send_or_keep(self, batch: List[Tuple[QueueMessage, Future]]) -> None:
+        try:
+            self._send([data for data, _ in batch])
+        except Exception:
+            # Ahead of the messages buffered in the meantime, to keep the order
+            with self._pending_lock:
+                self._pending[:0] = batch
+                self._start_timer()
+            raise
+        logger.info(f'Published {len(batch)} messages to {self.topic_name}: '
+                    f'{", ".join(str(data.messageId) for data, _ in batch)}')
+        for _, sent in batch:
+            sent.set_result(None)
+
+    def _flush_on_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f'Error occurred while publishing batch to {self.topic_name}, messages are kept to retry: {e}')
+
+    def _get_topic(self):
+        with self._topic_lock:
+            if self._topic is None:
+                self._topic = self.core.get_topic(topic_name=self.topic_name)
+            return self._topic
+
+    def _reset(self, topic) -> None:
+        with self._topic_lock:
+            if self._topic is topic:
+                self._topic = None
+        self._close_topic(topic)
+
+    def _close_topic(self, topic) -> None:
+        # Service bus topics keep a sender and a client, each holding a connection
+        for name in ('publisher', 'client'):
+            resource = getattr(topic, name, None)
+            close = getattr(resource, 'close', None)
+            if not callable(close):
+                continue
+            try:
+                close()
+            except Exception as e:
+                logger.warning(f'Error occurred while closing the {name} of {self.topic_name}: {e}')
+
+    def _send(self, messages: List[QueueMessage]) -> None:
+        # Listener threads and the flush timer share the sender of the topic
+        with self._send_lock:
+            topic = self._get_topic()
+            try:
+                self._send_to(topic, messages)
+            except Exception as e:
+                logger.warning(f'Error occurred while publishing to {self.topic_name}, retrying on a new client: {e}')
+                self._reset(topic)
+                topic = self._get_topic()
+                try:
+                    self._send_to(topic, messages)
+                except Exception:
+                    self._reset(topic)
+                    raise
+
+    @classmethod
+    def _send_to(cls, topic, messages: List[QueueMessage]) -> None:
+        if len(messages) == 1:
+            topic.publish(data=messages[0])
+        else:
+            cls._send_batch(topic, messages)
+
+    @staticmethod
+    def _send_batch(topic, messages: List[QueueMessage]) -> None:
+        sender = getattr(topic, 'publisher', None)
+        if sender is None or not hasattr(sender, 'create_message_batch'):
+            for data in messages:
+                topic.publish(data=data)
+            return
+        # Service bus senders take a whole batch in one round trip, split it only when it is over the size limit
+        batch = sender.create_message_batch()
+        for data in messages:
+            message = ServiceBusMessage(json.dumps(QueueMessage.to_dict(data)))
+            try:
+                batch.add_message(message)
+            except ValueError:
+                sender.send_messages(batch)
+                batch = sender.create_message_batch()
+                batch.add_message(message)
+        sender.send_messages(batch)
@@ -1,12 +1,15 @@
-import gc
 import os
 import time
 import shutil
 import logging
 import traceback
 from pathlib import Path
+from contextlib import nullcontext
 from .config import Settings
-from python_osw_validation import OSWValidation
+from .file_downloader import FileDownloader
+from .job_metrics import JobMetrics
+from .validation_engine import run_osw_validation
+from .pipeline.columnar import columnar_dir, columnar_files
 from .models.queue_message_content import ValidationResult
 import uuid
 import json
@@ -21,13 +24,22 @@ logger.setLevel(logging.INFO)
 
 
 class Validation:
-    def __init__(self, file_path=None, storage_client=None):
+    def __init__(self, file_path=None, storage_client=None, engine=None, result_cache=None, job_metrics=None,
+                 admission=None):
         settings = Settings()
+        self.engine = engine
+        self.result_cache = result_cache
+        self.admission = admission
+        self._file_entity = None
+        self.job_metrics = job_metrics or JobMetrics()
         self.container_name = settings.event_bus.container_name
         self.storage_client = storage_client
         self.file_path = file_path
         self.file_relative_path = file_path.split('/')[-1]
-        self.client = self.storage_client.get_container(container_name=self.container_name)
+        # Files uploaded directly to the service come without a storage client
+        self.client = self.storage_client.get_container(container_name=self.container_name) \
+            if self.storage_client else None
+        self.downloader = FileDownloader(chunk_size=settings.download_chunk_size)
         is_exists = os.path.exists(DOWNLOAD_DIR)
         unique_id = self.get_unique_id()
         if not is_exists:
@@ -42,43 +54,119 @@ class Validation:
         finally:
             Validation.clean_up(self.unique_dir_path)
 
-    def is_osw_valid(self, max_errors) -> ValidationResult:
+    # Validates a file-like object instead of downloading `file_path` from storage
+    def validate_stream(self, stream, max_errors=20) -> ValidationResult:
+        try:
+            return self.is_osw_valid(max_errors, stream=stream)
+        finally:
+            Validation.clean_up(self.unique_dir_path)
+
+    def is_osw_valid(self, max_errors, stream=None) -> ValidationResult:
         start_time = time.time()
         result = ValidationResult()
         result.is_valid = False
         result.validation_message = ''
         root, ext = os.path.splitext(self.file_relative_path)
         if ext and ext.lower() == '.zip':
-            downloaded_file_path = self.download_single_file(self.file_path)
-            if downloaded_file_path:
-                logger.info(f' Downloaded file path: {downloaded_file_path}')
-                validator = OSWValidation(zipfile_path=downloaded_file_path)
-                validation_result = validator.validate(max_errors)
-                result.is_valid = validation_result.is_valid
-                if not result.is_valid:
-                    result.validation_message = json.dumps(validation_result.issues)
-                    logger.error(f' Error While Validating File: {json.dumps(validation_result.issues)}')
-                Validation.clean_up(downloaded_file_path)
-            else:
-                result.validation_message = 'Failed to validate because unknown file format'
+            with self.admit(stream):
+                with self.job_metrics.stage('download'):
+                    if stream is None:
+                        downloaded_file_path = self.download_single_file(self.file_path)
+                    else:
+                        downloaded_file_path = self.save_stream(stream)
+                if downloaded_file_path:
+                    logger.info(f' Downloaded file path: {downloaded_file_path}')
+                    self.job_metrics.download_bytes = self.downloader.bytes_downloaded
+                    if os.path.isfile(downloaded_file_path):
+                        self.job_metrics.archive_bytes = os.path.getsize(downloaded_file_path)
+                    content_hash = self.downloader.content_hash
+                    cached_result = self.result_cache.get(content_hash, max_errors) \
+                        if self.result_cache and content_hash else None
+                    if cached_result:
+                        logger.info(f' Found cached validation result for archive: {content_hash}')
+                        self.job_metrics.cached = True
+                        result = cached_result
+                    else:
+                        is_valid, issues = self.run_osw_validation(downloaded_file_path, max_errors)
+                        result.is_valid = is_valid
+                        if not result.is_valid:
+                            result.validation_message = json.dumps(issues)
+                            logger.error(f' Error While Validating File: {json.dumps(issues)}')
+                        elif self.client:
+                            self.upload_columnar(downloaded_file_path)
+                        if self.result_cache and content_hash:
+                            self.result_cache.set(content_hash, max_errors, result)
+                    Validation.clean_up(downloaded_file_path)
+                else:
+                    result.validation_message = 'Failed to validate because unknown file format'
         else:
             result.validation_message = 'Failed to validate because unknown file format'
             logger.error(f' Failed to validate because unknown file format')
         end_time = time.time()
         time_taken = end_time - start_time
+        self.job_metrics.is_valid = result.is_valid
         logger.info(f'Validation completed in {time_taken} seconds')
-        gc.collect()
         return result
 
+    # Waits for the admission controller to admit an archive of this size, if there is one
+    def admit(self, stream=None):
+        if not self.admission:
+            return nullcontext()
+        return self.admission.admit(self.archive_size(stream))
+
+    # Size of the archive before it is downloaded, None when it cannot be known
+    def archive_size(self, stream=None):
+        try:
+            if stream is not None:
+                position = stream.tell()
+                stream.seek(0, os.SEEK_END)
+                size = stream.tell() - position
+                stream.seek(position)
+                return size
+            return FileDownloader.size_of(self.get_file_entity(self.file_path))
+        except Exception as e:
+            logger.warning(f' Could not read the archive size: {e}')
+            return None
+
+    def get_file_entity(self, file_upload_path=None):
+        if self._file_entity is None or self._file_entity[0] != file_upload_path:
+            self._file_entity = (file_upload_path,
+                                 self.storage_client.get_file_from_url(self.container_name, file_upload_path))
+        return self._file_entity[1]
+
+    # Runs the OSW validation on the worker pool when an engine is given, otherwise in the current thread
+    def run_osw_validation(self, zipfile_path: str, max_errors: int):
+        if self.engine:
+            validation_result = self.engine.run(zipfile_path, max_errors)
+        else:
+            validation_result = run_osw_validation(zipfile_path, max_errors)
+        self.job_metrics.add_validation(validation_result.get('metrics'))
+        return validation_result['is_valid'], validation_result['issues']
+
+    # Uploads the GeoParquet files written while the archive was validated next to the original file,
+    # `<name>.parquet/<osw file>.parquet`, see `write_columnar`. A failed upload does not change the result
+    def upload_columnar(self, downloaded_file_path: str):
+        files = columnar_files(columnar_dir(downloaded_file_path))
+        if not files:
+            return
+        with self.job_metrics.stage('columnar'):
+            try:
+                remote_dir = columnar_dir(self.get_file_entity(self.file_path).name)
+                for local_path in files.values():
+                    with open(local_path, 'rb') as stream:
+                        self.client.create_file(f'{remote_dir}/{os.path.basename(local_path)}').upload(stream)
+                logger.info(f' Uploaded {len(files)} GeoParquet files to {remote_dir}')
+            except Exception as e:
+                logger.error(f' Could not upload the GeoParquet files: {e}')
+
     # Downloads the single file into a unique directory
     def download_single_file(self, file_upload_path=None) -> str:
-        file = self.storage_client.get_file_from_url(self.container_name, file_upload_path)
+        file = self.get_file_entity(file_upload_path)
         try:
             if file.file_path:
                 file_path = os.path.basename(file.file_path)
                 local_download_path = os.path.join(self.unique_dir_path, file_path)
-                with open(local_download_path, 'wb') as blob:
-                    blob.write(file.get_stream())
+                self.downloader.download(file, local_download_path)
                 logger.info(f' File downloaded to location: {local_download_path}')
                 return local_download_path
             else:
@@ -86,8 +174,13 @@ class Validation:
         except Exception as e:
             traceback.print_exc()
             logger.error(e)
-        finally:
-            gc.collect()
+
+    # Copies an uploaded file into the unique directory
+    def save_stream(self, stream) -> str:
+        local_file_path = os.path.join(self.unique_dir_path, self.file_relative_path)
+        self.downloader.copy(stream, local_file_path)
+        logger.info(f' File saved to location: {local_file_path}')
+        return local_file_path
 
     # Generates a unique string for directory
     def get_unique_id(self) -> str:
@@ -103,4 +196,3 @@ class Validation:
             # folder = os.path.join(DOWNLOAD_FILE_PATH, path)
             logger.info(f' Removing Folder: {path}')
             shutil.rmtree(path, ignore_errors=False)
-        gc.collect()
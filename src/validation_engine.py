@@ -0,0 +1,251 @@
+import os
+import time
+import queue
+import shutil
+import logging
+import tempfile
+import threading
+import traceback
+import multiprocessing
+from python_osw_validation import OSWValidation
+from python_osw_validation.extracted_data_validator import OSW_DATASET_FILES
+from .config import Settings
+from .job_metrics import PeakRSS
+from .pipeline import PipelineOptions, PipelineValidation
+from .pipeline.schemas import warm_schemas
+
+logging.basicConfig()
+logger = logging.getLogger('VALIDATION_ENGINE')
+logger.setLevel(logging.INFO)
+
+
+class ValidationEngineError(Exception):
+    pass
+
+
+class ValidationTimeoutError(ValidationEngineError):
+    def __init__(self, timeout_seconds: float):
+        self.timeout_seconds = timeout_seconds
+        super().__init__(f'Validation did not finish within {timeout_seconds:.0f} seconds')
+
+
+class InstrumentedOSWValidation(OSWValidation):
+    """
+    OSWValidation that records how long its stages take and how many features each file has.
+    The library extracts the archive and checks its layout before reading the first file,
+    so that time is reported as `extraction`. Everything after the schema checks is `integrity`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stage_seconds = {}
+        self.feature_counts = {}
+        self._start_time = None
+
+    def validate(self, max_errors=20):
+        self._start_time = time.perf_counter()
+        try:
+            return super().validate(max_errors)
+        finally:
+            total = time.perf_counter() - self._start_time
+            self.stage_seconds.setdefault('extraction', total)
+            if 'schema' in self.stage_seconds:
+                self.stage_seconds['integrity'] = max(
+                    total - self.stage_seconds['extraction'] - self.stage_seconds['schema'], 0.0)
+            self.stage_seconds['validation'] = total
+
+    def validate_osw_errors(self, file_path: str, max_errors: int) -> bool:
+        start_time = time.perf_counter()
+        if self._start_time is not None:
+            self.stage_seconds.setdefault('extraction', start_time - self._start_time)
+        try:
+            return super().validate_osw_errors(file_path, max_errors)
+        finally:
+            self.stage_seconds['schema'] = self.stage_seconds.get('schema', 0.0) + time.perf_counter() - start_time
+
+    def load_osw_file(self, graph_geojson_path: str):
+        geojson_data = super().load_osw_file(graph_geojson_path)
+        file_name = os.path.basename(graph_geojson_path)
+        osw_file = next((osw_key for osw_key in OSW_DATASET_FILES.keys() if osw_key in file_name), file_name)
+        features = geojson_data.get('features') if isinstance(geojson_data, dict) else None
+        self.feature_counts[osw_file] = len(features) if isinstance(features, list) else 0
+        return geojson_data
+
+
+def run_osw_validation(zipfile_path: str, max_errors: int, options: PipelineOptions = None) -> dict:
+    # Worker processes read the options from the same environment as the service
+    options = options or PipelineOptions.from_settings(Settings())
+    with PeakRSS() as peak_rss:
+        if options.enabled:
+            validator = PipelineValidation(zipfile_path=zipfile_path, options=options)
+        else:
+            validator = InstrumentedOSWValidation(zipfile_path=zipfile_path)
+        validation_result = validator.validate(max_errors)
+    return {
+        'is_valid': validation_result.is_valid,
+        'issues': validation_result.issues,
+        'metrics': {
+            'stages': validator.stage_seconds,
+            'feature_counts': validator.feature_counts,
+            'peak_rss_bytes': peak_rss.peak_bytes
+        }
+    }
+
+
+def _worker_main(connection, max_tasks: int, temp_dir: str = None) -> None:
+    # Runs inside the child process, one job at a time until it has served `max_tasks` jobs
+    if temp_dir:
+        # Archives are extracted here, so the parent can remove what a killed worker leaves behind
+        tempfile.tempdir = temp_dir
+    # Compiled once for every job this worker serves
+    warm_schemas()
+    tasks_done = 0
+    while tasks_done < max_tasks:
+        try:
+            job = connection.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        zipfile_path, max_errors = job
+        try:
+            connection.send(('ok', run_osw_validation(zipfile_path, max_errors)))
+        except Exception as e:
+            traceback.print_exc()
+            connection.send(('error', str(e)))
+        tasks_done += 1
+    connection.close()
+
+
+class _Worker:
+    def __init__(self, context, max_tasks: int):
+        self.connection, child_connection = context.Pipe()
+        self.temp_dir = tempfile.mkdtemp(prefix='osw-validation-worker-')
+        # Not a daemon so a worker can still fan out to its own processes if needed
+        self.process = context.Process(target=_worker_main, args=(child_connection, max_tasks, self.temp_dir),
+                                       daemon=False)
+        self.process.start()
+        child_connection.close()
+        self.tasks_done = 0
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def stop(self, kill=False) -> None:
+        try:
+            if kill:
+                self.process.kill()
+            else:
+                self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+class ValidationEngine:
+    """
+    Runs OSWValidation jobs in a pool of worker processes, so the CPU heavy
+    schema and geometry checks do not compete for the GIL of the listener process.
+    Each worker is replaced after `max_tasks_per_child` jobs to give back any leaked memory.
+    Worker processes are started lazily on the first job.
+
+    A job that runs past its deadline is stopped by killing its worker. The deadline is
+    `timeout_seconds` plus `timeout_per_mb_seconds` for every MB of the archive, capped at
+    `max_timeout_seconds`. A `timeout_seconds` of 0 means no deadline.
+    """
+
+    def __init__(self, max_workers: int = 2, max_tasks_per_child: int = 10, timeout_seconds: float = 0,
+                 timeout_per_mb_seconds: float = 0, max_timeout_seconds: float = 0):
+        self.max_workers = max(int(max_workers), 1)
+        self.max_tasks_per_child = max(int(max_tasks_per_child), 1)
+        self.timeout_seconds = float(timeout_seconds)
+        self.timeout_per_mb_seconds = float(timeout_per_mb_seconds)
+        self.max_timeout_seconds = float(max_timeout_seconds)
+        self._context = multiprocessing.get_context('spawn')
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._idle_workers = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._workers = set()
+        self._is_shutdown = False
+
+    def timeout_for(self, zipfile_path: str):
+        """Deadline of a job in seconds, None when jobs have no deadline"""
+        if self.timeout_seconds <= 0:
+            return None
+        archive_bytes = os.path.getsize(zipfile_path) if os.path.isfile(zipfile_path) else 0
+        timeout = self.timeout_seconds + self.timeout_per_mb_seconds * archive_bytes / (1024 * 1024)
+        if self.max_timeout_seconds > 0:
+            timeout = min(timeout, self.max_timeout_seconds)
+        return timeout
+
+    def run(self, zipfile_path: str, max_errors: int) -> dict:
+        if self._is_shutdown:
+            raise ValidationEngineError('Validation engine is shut down')
+        timeout = self.timeout_for(zipfile_path)
+        with self._slots:
+            worker = self._checkout()
+            try:
+                worker.connection.send((zipfile_path, max_errors))
+                if timeout is not None and not worker.connection.poll(timeout):
+                    logger.error(f' Validation of {zipfile_path} did not finish within {timeout:.0f} seconds, '
+                                 f'killing worker pid: {worker.process.pid}')
+                    self._discard(worker, kill=True)
+                    raise ValidationTimeoutError(timeout)
+                status, payload = worker.connection.recv()
+            except (EOFError, OSError) as e:
+                self._discard(worker, kill=True)
+                raise ValidationEngineError(f'Validation worker exited unexpectedly: {e}')
+            self._checkin(worker)
+        if status != 'ok':
+            raise ValidationEngineError(payload)
+        return payload
+
+    def shutdown(self) -> None:
+        self._is_shutdown = True
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+    @property
+    def worker_count(self) -> int:
+        with self._lock:
+            return len(self._workers)
+
+    def worker_pids(self) -> list:
+        with self._lock:
+            return [worker.process.pid for worker in self._workers if worker.process.pid]
+
+    def _checkout(self) -> _Worker:
+        while True:
+            try:
+                worker = self._idle_workers.get_nowait()
+            except queue.Empty:
+                break
+            if worker.is_alive():
+                return worker
+            self._discard(worker)
+        worker = _Worker(self._context, self.max_tasks_per_child)
+        with self._lock:
+            self._workers.add(worker)
+        logger.info(f' Started validation worker pid: {worker.process.pid}')
+        return worker
+
+    def _checkin(self, worker: _Worker) -> None:
+        worker.tasks_done += 1
+        if worker.tasks_done >= self.max_tasks_per_child or self._is_shutdown:
+            # The child leaves its loop by itself after its last task
+            self._discard(worker)
+        else:
+            self._idle_workers.put(worker)
+
+    def _discard(self, worker: _Worker, kill=False) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+        worker.stop(kill=kill)
@@ -0,0 +1,277 @@
+import os
+import json
+import math
+import random
+import zipfile
+import argparse
+
+SCHEMA_URL = 'https://sidewalks.washington.edu/opensidewalks/0.3/schema.json'
+DATASET_KEYS = ('nodes', 'edges', 'points', 'lines', 'polygons', 'zones')
+# Kind of error that can be injected and the file it is injected in
+ERROR_TARGETS = {
+    'schema': 'edges',
+    'enum': 'edges',
+    'duplicate_ids': 'nodes',
+    'dangling_refs': 'edges',
+    'geometry': 'zones'
+}
+ERROR_KINDS = tuple(ERROR_TARGETS)
+
+# Share of the requested number of features that goes to each file
+FEATURE_SHARES = {
+    'points': 0.06,
+    'lines': 0.03,
+    'polygons': 0.03,
+    'zones': 0.01
+}
+
+ORIGIN = (-122.3321, 47.6062)
+GRID_SPACING = 0.0004  # ~30 m between intersections
+METERS_PER_DEGREE = 111320
+
+EDGE_TAGS = [
+    {'highway': 'footway', 'footway': 'sidewalk', 'surface': 'concrete'},
+    {'highway': 'footway', 'footway': 'sidewalk', 'surface': 'asphalt'},
+    {'highway': 'footway', 'footway': 'crossing', 'crossing:markings': 'zebra'},
+    {'highway': 'footway'},
+    {'highway': 'residential'},
+    {'highway': 'service', 'service': 'alley'},
+    {'highway': 'pedestrian', 'surface': 'paving_stones'},
+    {'highway': 'steps', 'climb': 'up', 'step_count': 12}
+]
+NODE_TAGS = [
+    {},
+    {},
+    {},
+    {'barrier': 'kerb', 'kerb': 'lowered', 'tactile_paving': 'yes'},
+    {'barrier': 'kerb', 'kerb': 'flush'},
+    {'barrier': 'kerb', 'kerb': 'raised'}
+]
+POINT_TAGS = [
+    {'amenity': 'bench'},
+    {'amenity': 'waste_basket'},
+    {'barrier': 'bollard'},
+    {'emergency': 'fire_hydrant'},
+    {'highway': 'street_lamp'},
+    {'power': 'pole'},
+    {'natural': 'tree', 'leaf_cycle': 'deciduous'}
+]
+LINE_TAGS = [
+    {'barrier': 'fence'},
+    {'natural': 'tree_row', 'leaf_type': 'broadleaved'}
+]
+POLYGON_TAGS = [
+    {'building': 'house'},
+    {'building': 'retail', 'name': 'Corner store'},
+    {'natural': 'wood', 'leaf_cycle': 'mixed'}
+]
+
+
+class DatasetPlan:
+    """Sizes of the generated network for a requested total number of features"""
+
+    def __init__(self, features: int):
+        features = max(int(features), 10)
+        extra = sum(FEATURE_SHARES.values())
+        # A grid of n nodes has about 2n edges, the rest is shared by the other files
+        nodes = max(int(features * (1 - extra) / 3), 4)
+        self.columns = max(int(math.sqrt(nodes)), 2)
+        self.rows = max(nodes // self.columns, 2)
+        self.cells = (self.rows - 1) * (self.columns - 1)
+        self.counts = {
+            'nodes': self.rows * self.columns,
+            'edges': self.rows * (self.columns - 1) + self.columns * (self.rows - 1)
+        }
+        for key, share in FEATURE_SHARES.items():
+            self.counts[key] = min(max(int(features * share), 1), self.cells)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+class DatasetGenerator:
+    """
+    Builds an OSW 0.3 dataset on a regular street grid: nodes at the intersections, sidewalks,
+    crossings and streets between neighbouring nodes, and street furniture, fences, buildings
+    and pedestrian zones inside the blocks. Every file is streamed to the zip, so memory stays
+    flat whatever the number of features.
+
+    `errors` maps an error kind from ERROR_KINDS to the number of features that get that error.
+    """
+
+    def __init__(self, features: int = 1000, errors: dict = None, seed: int = 0):
+        self.plan = DatasetPlan(features)
+        self.errors = {kind: int(count) for kind, count in (errors or {}).items() if int(count) > 0}
+        unknown = set(self.errors) - set(ERROR_KINDS)
+        if unknown:
+            raise ValueError(f'Unknown error kinds: {", ".join(sorted(unknown))}')
+        self.seed = seed
+
+    def write(self, output_path: str) -> dict:
+        """Writes the zip to `output_path` and returns the number of features of each file"""
+        self.random = random.Random(self.seed)
+        self.error_positions = {
+            kind: set(self.random.sample(range(self.plan.counts[self._target_for(kind)]),
+                                         min(count, self.plan.counts[self._target_for(kind)])))
+            for kind, count in self.errors.items()
+        }
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for key in DATASET_KEYS:
+                features = getattr(self, f'_{key}')()
+                with archive.open(f'opensidewalks.{key}.geojson', 'w', force_zip64=True) as member:
+                    self._write_collection(member, features)
+        return dict(self.plan.counts)
+
+    @staticmethod
+    def _target_for(kind: str) -> str:
+        return ERROR_TARGETS[kind]
+
+    def _has_error(self, kind: str, index: int) -> bool:
+        return index in self.error_positions.get(kind, ())
+
+    @staticmethod
+    def _write_collection(member, features) -> None:
+        member.write(f'{{"type": "FeatureCollection", "$schema": "{SCHEMA_URL}", "features": ['.encode('utf-8'))
+        separator = b''
+        buffer = []
+        for feature in features:
+            buffer.append(separator + json.dumps(feature, separators=(',', ':')).encode('utf-8'))
+            separator = b',\n'
+            if len(buffer) >= 1000:
+                member.write(b''.join(buffer))
+                buffer = []
+        member.write(b''.join(buffer) + b']}')
+
+    def _coordinate(self, row: int, column: int) -> list:
+        return [round(ORIGIN[0] + column * GRID_SPACING, 7), round(ORIGIN[1] + row * GRID_SPACING, 7)]
+
+    def _node_id(self, row: int, column: int) -> str:
+        return f'n{row * self.plan.columns + column}'
+
+    def _cell(self, index: int):
+        # Spread block features over the whole grid instead of piling them in the first rows
+        cell = (index * 7919) % self.plan.cells
+        return divmod(cell, self.plan.columns - 1)
+
+    @staticmethod
+    def _feature(geometry_type: str, coordinates, properties: dict) -> dict:
+        return {
+            'type': 'Feature',
+            'geometry': {'type': geometry_type, 'coordinates': coordinates},
+            'properties': properties
+        }
+
+    def _nodes(self):
+        for index in range(self.plan.counts['nodes']):
+            row, column = divmod(index, self.plan.columns)
+            node_id = self._node_id(row, column)
+            if self._has_error('duplicate_ids', index):
+                node_id = self._node_id(0, 0)
+            properties = {'_id': node_id, **NODE_TAGS[index % len(NODE_TAGS)]}
+            yield self._feature('Point', self._coordinate(row, column), properties)
+
+    def _edge_endpoints(self):
+        rows, columns = self.plan.rows, self.plan.columns
+        for row in range(rows):
+            for column in range(columns - 1):
+                yield (row, column), (row, column + 1)
+        for row in range(rows - 1):
+            for column in range(columns):
+                yield (row, column), (row + 1, column)
+
+    def _edges(self):
+        for index, (start, end) in enumerate(self._edge_endpoints()):
+            start_coordinate, end_coordinate = self._coordinate(*start), self._coordinate(*end)
+            middle = [round((start_coordinate[0] + end_coordinate[0]) / 2, 7),
+                      round((start_coordinate[1] + end_coordinate[1]) / 2 + GRID_SPACING / 50, 7)]
+            length = GRID_SPACING * METERS_PER_DEGREE * math.cos(math.radians(ORIGIN[1]))
+            properties = {
+                '_id': f'e{index}',
+                '_u_id': self._node_id(*start),
+                '_v_id': self._node_id(*end),
+                'length': round(length, 2),
+                'incline': round(self.random.uniform(-0.08, 0.08), 3),
+                **EDGE_TAGS[index % len(EDGE_TAGS)]
+            }
+            if self._has_error('dangling_refs', index):
+                properties['_v_id'] = f'missing{index}'
+            if self._has_error('schema', index):
+                properties['crossing'] = 'marked'
+            if self._has_error('enum', index):
+                properties['surface'] = 'lava'
+            yield self._feature('LineString', [start_coordinate, middle, end_coordinate], properties)
+
+    def _block_ring(self, row: int, column: int, inset: float) -> list:
+        west, south = self._coordinate(row, column)
+        east, north = self._coordinate(row + 1, column + 1)
+        offset = (east - west) * inset
+        west, south, east, north = west + offset, south + offset, east - offset, north - offset
+        return [[round(x, 7), round(y, 7)] for x, y in
+                ((west, south), (east, south), (east, north), (west, north), (west, south))]
+
+    def _points(self):
+        for index in range(self.plan.counts['points']):
+            row, column = self._cell(index)
+            west, south = self._coordinate(row, column)
+            coordinate = [round(west + GRID_SPACING * 0.1, 7), round(south + GRID_SPACING * 0.5, 7)]
+            yield self._feature('Point', coordinate, {'_id': f'p{index}', **POINT_TAGS[index % len(POINT_TAGS)]})
+
+    def _lines(self):
+        for index in range(self.plan.counts['lines']):
+            ring = self._block_ring(*self._cell(index), inset=0.15)
+            yield self._feature('LineString', ring[:3], {'_id': f'l{index}', **LINE_TAGS[index % len(LINE_TAGS)]})
+
+    def _polygons(self):
+        for index in range(self.plan.counts['polygons']):
+            ring = self._block_ring(*self._cell(index), inset=0.3)
+            yield self._feature('Polygon', [ring], {'_id': f'g{index}', **POLYGON_TAGS[index % len(POLYGON_TAGS)]})
+
+    def _zones(self):
+        for index in range(self.plan.counts['zones']):
+            row, column = self._cell(index)
+            corners = [(row, column), (row, column + 1), (row + 1, column + 1), (row + 1, column)]
+            ring = [self._coordinate(*corner) for corner in corners]
+            if self._has_error('geometry', index):
+                # Swapping two corners turns the square into a self-intersecting bow tie
+                ring[1], ring[2] = ring[2], ring[1]
+            properties = {
+                '_id': f'z{index}',
+                '_w_id': [self._node_id(*corner) for corner in corners],
+                'highway': 'pedestrian',
+                'surface': 'paving_stones'
+            }
+            yield self._feature('Polygon', [ring + [ring[0]]], properties)
+
+
+def generate_dataset(output_path: str, features: int = 1000, errors: dict = None, seed: int = 0) -> dict:
+    return DatasetGenerator(features=features, errors=errors, seed=seed).write(output_path)
+
+
+def parse_errors(values) -> dict:
+    errors = {}
+    for value in values or []:
+        kind, _, count = value.partition('=')
+        errors[kind] = int(count or 1)
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generates a synthetic OSW 0.3 dataset zip')
+    parser.add_argument('output', help='Path of the zip file to write')
+    parser.add_argument('--features', type=int, default=1000, help='Approximate total number of features')
+    parser.add_argument('--error', action='append', metavar='KIND=COUNT',
+                        help=f'Inject COUNT features with an error, KIND is one of: {", ".join(ERROR_KINDS)}')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    counts = generate_dataset(args.output, features=args.features, errors=parse_errors(args.error), seed=args.seed)
+    print(f'Generated {sum(counts.values())} features in {args.output}')
+    for key, count in counts.items():
+        print(f'  {key:<10} {count}')
+
+
+if __name__ == '__main__':
+    main()
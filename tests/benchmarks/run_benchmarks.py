@@ -0,0 +1,349 @@
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import platform
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import psutil
+import geopandas as gpd
+import python_osw_validation
+from python_osw_validation import OSWValidation
+from python_osw_validation.zipfile_handler import ZipFileHandler
+from python_osw_validation.extracted_data_validator import ExtractedDataValidator
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+
+from src.validation import Validation
+from src.osw_validator import OSWValidator
+from src.memory_policy import MemoryPolicy
+from src.validation_engine import ValidationEngine
+from src.models.queue_message_content import Upload, ValidationResult
+from tests.benchmarks.generate_osw_dataset import generate_dataset
+
+TEST_FILES_DIR = os.path.join(ROOT_DIR, 'tests', 'unit_tests', 'test_files')
+DEFAULT_DATASETS = [os.path.join(TEST_FILES_DIR, 'valid.zip'), os.path.join(TEST_FILES_DIR, 'invalid.zip')]
+RESULTS_DIR = os.path.join(ROOT_DIR, 'benchmark_results')
+GENERATED_DIR = os.path.join(RESULTS_DIR, 'datasets')
+
+
+class LocalFile:
+    """Storage file entity reading from the local disk"""
+
+    def __init__(self, path):
+        self.file_path = path
+        self.name = os.path.basename(path)
+
+    def get_stream(self):
+        with open(self.file_path, 'rb') as f:
+            return f.read()
+
+
+class LocalStorageClient:
+    """Stand-in for the storage client, file urls are local paths"""
+
+    def get_container(self, container_name=None):
+        return container_name
+
+    def get_file_from_url(self, container_name, full_url):
+        return LocalFile(full_url)
+
+
+class InMemoryTopic:
+    def __init__(self):
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def publish(self, data=None):
+        # Serialise like the service bus topic does so the cost is part of the measurement
+        payload = json.dumps(data.__dict__)
+        with self.lock:
+            self.messages.append(payload)
+
+    def subscribe(self, subscription=None, callback=None):
+        pass
+
+
+class LocalCore:
+    """Stand-in for python_ms_core.Core used to build an OSWValidator without cloud connections"""
+    __version__ = 'benchmark'
+
+    def __init__(self):
+        self.topic = InMemoryTopic()
+        self.storage_client = LocalStorageClient()
+
+    def get_topic(self, topic_name=None, max_concurrent_messages=None):
+        return self.topic
+
+    def get_logger(self):
+        return None
+
+    def get_storage_client(self):
+        return self.storage_client
+
+    def get_authorizer(self, config=None):
+        return None
+
+
+class PeakRSSSampler:
+    """Samples the resident memory of this process and its worker processes in the background"""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _sample(self):
+        process = psutil.Process()
+        rss = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except psutil.Error:
+                pass
+        self.peak_rss = max(self.peak_rss, rss)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+
+def timed(fn, *args, **kwargs):
+    start_time = time.perf_counter()
+    value = fn(*args, **kwargs)
+    return time.perf_counter() - start_time, value
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'min': samples[0],
+        'median': samples[len(samples) // 2],
+        'max': samples[-1],
+        'mean': sum(samples) / len(samples)
+    }
+
+
+def make_upload_message(file_path, index=0):
+    return Upload(data={
+        'messageId': f'benchmark-{index}',
+        'messageType': 'VALIDATION_ONLY',
+        'data': {
+            'file_upload_path': file_path,
+            'user_id': 'benchmark',
+            'tdei_project_group_id': 'benchmark'
+        }
+    })
+
+
+def make_validator(workers):
+    with patch('src.osw_validator.Core', LocalCore), patch.object(OSWValidator, 'start_listening'):
+        validator = OSWValidator()
+    # Measure the validation itself, not the caches in front of it
+    if validator.engine:
+        validator.engine.shutdown()
+    validator.engine = ValidationEngine(max_workers=workers) if workers > 0 else None
+    validator.result_cache = None
+    validator.permission_cache = None
+    validator.memory_policy = MemoryPolicy(mode=MemoryPolicy.NEVER)
+    return validator
+
+
+def bench_stages(dataset, max_errors, validator):
+    """Runs every stage of one validation separately and returns the time each one took"""
+    timings = {}
+    zip_handler = None
+    try:
+        validation = Validation(file_path=dataset, storage_client=LocalStorageClient())
+        timings['download'], downloaded_path = timed(validation.download_single_file, dataset)
+
+        zip_handler = ZipFileHandler(downloaded_path)
+        timings['unzip'], extracted_dir = timed(zip_handler.extract_zip)
+        files_validator = ExtractedDataValidator(extracted_dir)
+        files_validator.is_valid()
+
+        osw_validation = OSWValidation(zipfile_path=downloaded_path)
+
+        def schema_stage():
+            for file in files_validator.files:
+                if not osw_validation.validate_osw_errors(file_path=str(file), max_errors=max_errors):
+                    break
+
+        timings['schema'], _ = timed(schema_stage)
+
+        def geometry_stage():
+            for file in files_validator.files:
+                gdf = gpd.read_file(file)
+                gdf.is_valid.all()
+                gdf.geometry.type.unique()
+                gdf.duplicated('_id').any()
+
+        timings['geometry'], _ = timed(geometry_stage)
+
+        result = ValidationResult()
+        result.is_valid = not osw_validation.errors
+        result.validation_message = json.dumps(osw_validation.issues)
+        timings['publish'], _ = timed(validator.send_status, result=result,
+                                      upload_message=make_upload_message(dataset))
+        Validation.clean_up(validation.unique_dir_path)
+    finally:
+        if zip_handler:
+            zip_handler.remove_extracted_files()
+    return timings
+
+
+def bench_end_to_end(dataset, messages, concurrency, validator):
+    """Pushes `messages` messages for `dataset` through OSWValidator.validate, `concurrency` at a time"""
+    latencies = []
+    # Warm up so starting the worker processes is not part of the measurement
+    validator.validate(make_upload_message(dataset, -1))
+
+    def handle(index):
+        latency, _ = timed(validator.validate, make_upload_message(dataset, index))
+        latencies.append(latency)
+
+    with PeakRSSSampler() as sampler:
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(handle, range(messages)))
+        elapsed = time.perf_counter() - start_time
+    return {
+        'messages': messages,
+        'concurrency': concurrency,
+        'elapsed_seconds': elapsed,
+        'messages_per_second': messages / elapsed,
+        'latency_seconds': summarize(latencies),
+        'peak_rss_bytes': sampler.peak_rss
+    }
+
+
+def generated_datasets(sizes):
+    """Generates a valid synthetic dataset for every feature count, reusing the ones generated before"""
+    datasets = []
+    for size in sizes:
+        path = os.path.join(GENERATED_DIR, f'osw-{size}.zip')
+        if not os.path.exists(path):
+            print(f'Generating : {path}')
+            generate_dataset(path, features=size)
+        datasets.append(path)
+    return datasets
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return 'unknown'
+
+
+def run(datasets, repeat, messages, concurrency, workers, max_errors):
+    validator = make_validator(workers)
+    report = {
+        'revision': git_revision(),
+        'created_at': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'python-osw-validation': python_osw_validation.__version__,
+        'cpu_count': os.cpu_count(),
+        'workers': workers,
+        'max_errors': max_errors,
+        'datasets': {}
+    }
+    try:
+        for dataset in datasets:
+            name = os.path.basename(dataset)
+            print(f'Benchmarking : {name}')
+            stage_samples = {}
+            with PeakRSSSampler() as sampler:
+                for _ in range(repeat):
+                    for stage, seconds in bench_stages(dataset, max_errors, validator).items():
+                        stage_samples.setdefault(stage, []).append(seconds)
+            report['datasets'][name] = {
+                'path': dataset,
+                'size_bytes': os.path.getsize(dataset),
+                'stages': {stage: summarize(samples) for stage, samples in stage_samples.items()},
+                'stages_peak_rss_bytes': sampler.peak_rss,
+                'end_to_end': bench_end_to_end(dataset, messages, concurrency, validator)
+            }
+            print_dataset(name, report['datasets'][name])
+    finally:
+        validator.stop_listening()
+    return report
+
+
+def print_dataset(name, result):
+    print(f'  {name} ({result["size_bytes"]} bytes)')
+    for stage, timing in result['stages'].items():
+        print(f'    {stage:<10} median {timing["median"] * 1000:10.1f} ms')
+    end_to_end = result['end_to_end']
+    print(f'    end to end {end_to_end["messages_per_second"]:.2f} messages/sec, '
+          f'p50 {end_to_end["latency_seconds"]["median"] * 1000:.1f} ms, '
+          f'peak rss {end_to_end["peak_rss_bytes"] / (1024 * 1024):.1f} MB')
+
+
+def compare(report, baseline):
+    """Prints the change of every median stage timing and of the throughput against a previous run"""
+    print(f'\nComparing {report["revision"]} against {baseline["revision"]}')
+    for name, result in report['datasets'].items():
+        previous = baseline['datasets'].get(name)
+        if not previous:
+            continue
+        print(f'  {name}')
+        for stage, timing in result['stages'].items():
+            if stage in previous['stages']:
+                before = previous['stages'][stage]['median']
+                change = (timing['median'] - before) / before * 100 if before else 0
+                print(f'    {stage:<10} {change:+7.1f}%')
+        before = previous['end_to_end']['messages_per_second']
+        change = (result['end_to_end']['messages_per_second'] - before) / before * 100 if before else 0
+        print(f'    throughput {change:+7.1f}%')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks the OSW validation service')
+    parser.add_argument('datasets', nargs='*', help='OSW zip files to benchmark')
+    parser.add_argument('--generate', help='Comma separated feature counts of synthetic datasets to benchmark, '
+                                           'e.g. 1000,100000,1000000')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs of the per-stage benchmark')
+    parser.add_argument('--messages', type=int, default=4, help='Number of messages for the end to end benchmark')
+    parser.add_argument('--concurrency', type=int, default=2, help='Messages validated at the same time')
+    parser.add_argument('--workers', type=int, default=2, help='Validation worker processes, 0 to validate in-thread')
+    parser.add_argument('--max-errors', type=int, default=20)
+    parser.add_argument('--output', help='Path of the json report, defaults to benchmark_results/<revision>.json')
+    parser.add_argument('--compare', help='Previous json report to compare against')
+    args = parser.parse_args()
+
+    datasets = list(args.datasets)
+    if args.generate:
+        datasets += generated_datasets([int(size) for size in args.generate.split(',')])
+    report = run(datasets or DEFAULT_DATASETS, args.repeat, args.messages, args.concurrency, args.workers, args.max_errors)
+
+    output = args.output or os.path.join(RESULTS_DIR, f'{report["revision"]}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nBenchmark results saved to {output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import random
+import argparse
+import datetime
+import threading
+from collections import Counter
+from python_ms_core.core.queue.models.queue_message import QueueMessage
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(ROOT_DIR)))
+
+from src.config import Settings
+from src.local_backends import LocalCore, MEMORY
+from tests.test_harness.run_tests import get_core
+
+DEFAULT_MANIFEST = os.path.join(ROOT_DIR, 'load_manifest.json')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.dirname(ROOT_DIR)), 'load_test_results')
+TIMED_OUT_PREFIX = 'Validation timed out'
+ERROR_PREFIX = 'Error occurred while validating OSW request'
+
+
+def load_manifest(path: str) -> list:
+    """
+    Reads the datasets to replay, like -
+    {"Datasets": [{"Name": "valid", "Input_file": "../unit_tests/test_files/valid.zip", "Weight": 3, "Result": true}]}
+    `Input_file` is relative to the manifest and is uploaded before the run. A dataset already in storage
+    is given by its `File_upload_path` instead. `Weight` defaults to 1, `Result` is optional.
+    """
+    with open(path) as f:
+        datasets = json.load(f)['Datasets']
+    manifest_dir = os.path.dirname(os.path.abspath(path))
+    for dataset in datasets:
+        if dataset.get('Input_file'):
+            dataset['Input_file'] = os.path.join(manifest_dir, dataset['Input_file'])
+        dataset.setdefault('Name', os.path.basename(dataset.get('Input_file') or dataset.get('File_upload_path')))
+        dataset.setdefault('Weight', 1)
+    return datasets
+
+
+def upload_datasets(datasets: list, storage_client, container_name: str, run_id: str) -> None:
+    container = storage_client.get_container(container_name=container_name)
+    for dataset in datasets:
+        if dataset.get('File_upload_path'):
+            continue
+        test_file = container.create_file(f'load_test/{run_id}/{os.path.basename(dataset["Input_file"])}')
+        with open(dataset['Input_file'], 'rb') as f:
+            test_file.upload(f)
+        dataset['File_upload_path'] = test_file.get_remote_url()
+        print(f'Uploaded {dataset["Name"]} to {dataset["File_upload_path"]}')
+
+
+def percentile(samples: list, percent: float):
+    """Nearest-rank percentile, None without samples"""
+    if not samples:
+        return None
+    samples = sorted(samples)
+    rank = max(math.ceil(percent / 100 * len(samples)), 1)
+    return samples[rank - 1]
+
+
+def outcome_of(dataset: dict, data: dict) -> str:
+    message = data.get('message') or ''
+    if message.startswith(TIMED_OUT_PREFIX):
+        return 'timed_out'
+    if message.startswith(ERROR_PREFIX):
+        return 'error'
+    outcome = 'valid' if data.get('success') else 'invalid'
+    if dataset.get('Result') is not None and bool(data.get('success')) != bool(dataset['Result']):
+        return f'unexpected_{outcome}'
+    return outcome
+
+
+class ResponseTracker:
+    """Matches the results on the validation topic with the messages the load generator sent"""
+
+    def __init__(self):
+        self.sent = {}
+        self.latencies = []
+        self.outcomes = Counter()
+        self.first_sent_at = None
+        self.last_received_at = None
+        self._condition = threading.Condition()
+
+    def record_sent(self, message_id: str, dataset: dict) -> None:
+        with self._condition:
+            now = time.monotonic()
+            self.first_sent_at = self.first_sent_at or now
+            self.sent[message_id] = (now, dataset)
+
+    def record_response(self, queue_message) -> None:
+        with self._condition:
+            sent = self.sent.pop(queue_message.messageId, None)
+            if sent is None:
+                # Result of another run or of another client of the topic
+                return
+            now = time.monotonic()
+            sent_at, dataset = sent
+            self.latencies.append(now - sent_at)
+            self.outcomes[outcome_of(dataset, queue_message.data or {})] += 1
+            self.last_received_at = now
+            self._condition.notify_all()
+
+    def wait_below(self, in_flight: int, timeout: float) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: len(self.sent) < in_flight, timeout=timeout)
+
+    def report(self) -> dict:
+        with self._condition:
+            latencies = list(self.latencies)
+            outcomes = dict(self.outcomes)
+            lost = len(self.sent)
+            elapsed = (self.last_received_at - self.first_sent_at) if self.last_received_at else None
+        received = len(latencies)
+        return {
+            'sent': received + lost,
+            'received': received,
+            'lost': lost,
+            'elapsed_seconds': elapsed,
+            'throughput_per_second': received / elapsed if elapsed else None,
+            'latency_seconds': {
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'max': max(latencies) if latencies else None
+            },
+            'outcomes': outcomes
+        }
+
+
+class LoadGenerator:
+    """
+    Publishes upload messages for the datasets of a manifest and waits for their results.
+
+    With `rate` messages go out at that many per second whatever the service does (open loop), with
+    `concurrency` a new message goes out whenever a result comes back (closed loop).
+    """
+
+    def __init__(self, core, request_topic: str, response_topic: str, subscription: str, datasets: list,
+                 message_type: str = 'workflow_identifier', seed: int = None):
+        self.core = core
+        self.request_topic = core.get_topic(topic_name=request_topic)
+        self.response_topic = core.get_topic(topic_name=response_topic, max_concurrent_messages=8)
+        self.subscription = subscription
+        self.datasets = datasets
+        self.message_type = message_type
+        self.random = random.Random(seed)
+        self.tracker = None
+        self._listener = None
+
+    def start(self) -> None:
+        create_subscription = getattr(self.response_topic, 'create_subscription', None)
+        if callable(create_subscription):
+            create_subscription(self.subscription)
+        # Subscriptions block, results are gathered in the background for the whole run
+        self._listener = threading.Thread(target=self.response_topic.subscribe, daemon=True,
+                                          kwargs={'subscription': self.subscription, 'callback': self.on_response})
+        self._listener.start()
+
+    def stop(self) -> None:
+        close = getattr(self.response_topic, 'close', None)
+        if callable(close):
+            close()
+
+    def on_response(self, queue_message) -> None:
+        if self.tracker:
+            self.tracker.record_response(queue_message)
+
+    def publish(self) -> None:
+        dataset = self.random.choices(self.datasets, weights=[item['Weight'] for item in self.datasets])[0]
+        message_id = uuid.uuid4().hex
+        self.tracker.record_sent(message_id, dataset)
+        self.request_topic.publish(data=QueueMessage.data_from({
+            'messageId': message_id,
+            'messageType': self.message_type,
+            'publishedDate': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'data': {
+                'file_upload_path': dataset['File_upload_path'],
+                'user_id': dataset.get('User_id', 'load-test'),
+                'tdei_project_group_id': dataset.get('Project_group_id', 'load-test')
+            }
+        }))
+
+    def run_stage(self, messages: int, duration: float, rate: float = None, concurrency: int = None,
+                  drain_timeout: float = 300) -> dict:
+        """Sends `messages` messages, or keeps sending for `duration` seconds, then waits for the results"""
+        self.tracker = ResponseTracker()
+        start_time = time.monotonic()
+        sent = 0
+
+        def keep_sending() -> bool:
+            if messages:
+                return sent < messages
+            return time.monotonic() - start_time < duration
+
+        while keep_sending():
+            if rate:
+                next_at = start_time + sent / rate
+                time.sleep(max(next_at - time.monotonic(), 0))
+            elif not self.tracker.wait_below(concurrency, timeout=drain_timeout):
+                print(f'No result within {drain_timeout} seconds, stopping the stage')
+                break
+            self.publish()
+            sent += 1
+        self.tracker.wait_below(1, timeout=drain_timeout)
+        report = self.tracker.report()
+        report.update({'rate': rate, 'concurrency': concurrency})
+        return report
+
+
+def parse_levels(value: str) -> list:
+    return [float(level) for level in value.split(',') if level.strip()] if value else []
+
+
+def print_report(report: dict) -> None:
+    def seconds(value):
+        return f'{value:.2f}s' if value is not None else '-'
+
+    level = f'rate {report["rate"]:g}/s' if report['rate'] else f'concurrency {report["concurrency"]}'
+    latency = report['latency_seconds']
+    throughput = report['throughput_per_second']
+    print(f'{level}: {report["received"]}/{report["sent"]} results, {report["lost"]} lost, '
+          f'throughput {f"{throughput:.2f}/s" if throughput else "-"}, '
+          f'latency p50 {seconds(latency["p50"])} p95 {seconds(latency["p95"])} p99 {seconds(latency["p99"])} '
+          f'max {seconds(latency["max"])}, outcomes {report["outcomes"]}')
+
+
+def start_in_process_service():
+    # Topics kept in memory only reach a service running in this process
+    from src.osw_validator import OSWValidator
+    validator = OSWValidator()
+    return validator, validator.core
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replays OSW zips through the validation queue and measures it')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST, help='Datasets to replay, see load_manifest.json')
+    parser.add_argument('--rate', help='Comma separated messages per second, one stage each, e.g. 0.5,1,2')
+    parser.add_argument('--concurrency', help='Comma separated messages in flight, one stage each, e.g. 1,2,4,8')
+    parser.add_argument('--messages', type=int, default=20, help='Messages per stage')
+    parser.add_argument('--duration', type=float, help='Seconds per stage, instead of a number of messages')
+    parser.add_argument('--drain-timeout', type=float, default=300, help='Seconds to wait for the last results')
+    parser.add_argument('--subscription', default='load_test', help='Subscription of the validation topic to read')
+    parser.add_argument('--message-type', default='workflow_identifier',
+                        help='Message type, VALIDATION_ONLY skips the permission check')
+    parser.add_argument('--seed', type=int, help='Seed of the dataset choice')
+    parser.add_argument('--output', help='Path of the json report, defaults to load_test_results/<time>.json')
+    args = parser.parse_args()
+    if bool(args.rate) == bool(args.concurrency):
+        parser.error('Give either --rate or --concurrency')
+
+    settings = Settings()
+    validator = None
+    if str(settings.backend_provider).lower() == MEMORY:
+        validator, core = start_in_process_service()
+    else:
+        core = get_core()
+    if isinstance(core, LocalCore):
+        # A subscription only gets what is published after it exists, the service may not be up yet
+        core.get_topic(topic_name=settings.event_bus.upload_topic).create_subscription(
+            settings.event_bus.upload_subscription)
+
+    run_id = datetime.datetime.now().strftime('%y%m%d_%H%M%S')
+    datasets = load_manifest(args.manifest)
+    upload_datasets(datasets, core.get_storage_client(), settings.event_bus.container_name, run_id)
+    generator = LoadGenerator(core, request_topic=settings.event_bus.upload_topic,
+                              response_topic=settings.event_bus.validation_topic, subscription=args.subscription,
+                              datasets=datasets, message_type=args.message_type, seed=args.seed)
+    generator.start()
+    reports = []
+    try:
+        stages = [{'rate': rate} for rate in parse_levels(args.rate)] or \
+                 [{'concurrency': int(concurrency)} for concurrency in parse_levels(args.concurrency)]
+        for stage in stages:
+            report = generator.run_stage(messages=0 if args.duration else args.messages, duration=args.duration,
+                                         drain_timeout=args.drain_timeout, **stage)
+            print_report(report)
+            reports.append(report)
+    finally:
+        generator.stop()
+        if validator:
+            validator.stop_listening()
+
+    output = args.output or os.path.join(RESULTS_DIR, f'{run_id}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'run_id': run_id,
+            'backend_provider': settings.backend_provider,
+            'manifest': os.path.abspath(args.manifest),
+            'datasets': [{key: value for key, value in dataset.items() if key != 'Input_file'} for dataset in datasets],
+            'stages': reports
+        }, f, indent=2)
+    print(f'Report written to {output}')
+    # The service bus subscription never returns
+    os._exit(0)
+
+
+if __name__ == '__main__':
+    main()
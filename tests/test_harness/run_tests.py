@@ -1,14 +1,21 @@
 import os
+import sys
 import datetime
 import json
 import time
 import uuid
+import threading
 from python_ms_core import Core
 from python_ms_core.core.queue.models.queue_message import QueueMessage
 from pydantic import BaseSettings
 from dotenv import load_dotenv
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(ROOT_DIR)))
+
+from src.config import Settings as ServiceSettings
+from src.local_backends import LocalCore, LOCAL
+
 TEST_JSON_FILE = os.path.join(ROOT_DIR, 'tests.json')
 TEST_FILE = open(TEST_JSON_FILE)
 TEST_DATA = json.loads(TEST_FILE.read())
@@ -22,6 +29,7 @@ class Settings(BaseSettings):
     publishing_topic_name: str = os.environ.get('VALIDATION_REQ_TOPIC', None)
     subscription_topic_name: str = os.environ.get('VALIDATION_RES_TOPIC', None)
     subscription_name: str = 'test_subscribtion'
+    request_subscription_name: str = os.environ.get('VALIDATION_REQ_SUB', None)
     container_name: str = os.environ.get('CONTAINER_NAME', 'tdei-storage-test')
 
 
@@ -80,12 +88,34 @@ def subscribe(core, settings: Settings):
             # print(parsed_message)
             print('Message Received from NodeJS publisher. \n')
 
-    try:
-        listening_topic = core.get_topic(topic_name=settings.subscription_topic_name)
-        listening_topic.subscribe(subscription=settings.subscription_name, callback=process)
-    except Exception as e:
-        print(e)
-        print('Tests Done!')
+    def listen():
+        try:
+            listening_topic.subscribe(subscription=settings.subscription_name, callback=process)
+        except Exception as e:
+            print(e)
+            print('Tests Done!')
+
+    listening_topic = core.get_topic(topic_name=settings.subscription_topic_name)
+    if isinstance(core, LocalCore):
+        # Local subscriptions only receive what is published after they exist
+        listening_topic.create_subscription(settings.subscription_name)
+        if settings.request_subscription_name:
+            request_topic = core.get_topic(topic_name=settings.publishing_topic_name)
+            request_topic.create_subscription(settings.request_subscription_name)
+    # Subscriptions block, keep listening while the tests are published
+    threading.Thread(target=listen, daemon=True).start()
+
+
+# With BACKEND_PROVIDER=local the harness talks to a service on the same machine through the local backends
+def get_core():
+    service_settings = ServiceSettings()
+    if str(service_settings.backend_provider).lower() == LOCAL:
+        return LocalCore(storage_dir=service_settings.local_storage_dir,
+                         topic_dir=service_settings.local_topic_dir,
+                         topic_provider=LOCAL,
+                         poll_interval_ms=service_settings.local_topic_poll_interval_ms,
+                         max_delivery_count=service_settings.local_topic_max_delivery_count)
+    return Core()
 
 
 def test_harness(core):
@@ -96,7 +126,7 @@ def test_harness(core):
 
 
 if __name__ == "__main__":
-    core = Core()
+    core = get_core()
     time.sleep(1)
     print(f'Performing tests :')
     test_harness(core)
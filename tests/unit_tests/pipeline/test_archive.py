@@ -0,0 +1,98 @@
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from python_osw_validation.extracted_data_validator import ExtractedDataValidator
+from python_osw_validation.zipfile_handler import ZipFileHandler
+from src.pipeline.archive import ArchiveDataValidator, ArchiveMember
+
+SAVED_FILE_PATH = f'{Path.cwd()}/tests/unit_tests/test_files'
+FEATURES = b'{"type": "FeatureCollection", "features": []}'
+
+
+class TestArchiveDataValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_zip(self, *names) -> str:
+        path = os.path.join(self.temp_dir, f'{len(os.listdir(self.temp_dir))}.zip')
+        with zipfile.ZipFile(path, 'w') as archive:
+            for name in names:
+                archive.writestr(name, b'' if name.endswith('/') else FEATURES)
+        return path
+
+    def assert_same_layout(self, zipfile_path: str):
+        handler = ZipFileHandler(zipfile_path)
+        try:
+            extracted_dir = handler.extract_zip()
+            archive = ArchiveDataValidator(zipfile_path)
+            if not extracted_dir:
+                self.assertFalse(archive.read())
+                self.assertEqual(archive.error, handler.error)
+                return
+            expected = ExtractedDataValidator(extracted_dir)
+            self.assertTrue(archive.read())
+            self.assertEqual(archive.is_valid(), expected.is_valid())
+            self.assertEqual(archive.error, expected.error)
+            self.assertEqual([os.path.basename(file) for file in archive.files],
+                             [os.path.basename(file) for file in expected.files])
+            self.assertEqual(sorted(os.path.basename(file) for file in archive.externalExtensions),
+                             sorted(os.path.basename(file) for file in expected.externalExtensions))
+        finally:
+            handler.remove_extracted_files()
+
+    def test_same_layout_as_extracted_archive(self):
+        for file in sorted(os.listdir(SAVED_FILE_PATH)):
+            with self.subTest(file=file):
+                self.assert_same_layout(f'{SAVED_FILE_PATH}/{file}')
+
+    def test_layouts(self):
+        layouts = [
+            ('opensidewalks.nodes.geojson', 'opensidewalks.edges.geojson'),
+            ('osw/', 'osw/opensidewalks.nodes.geojson', 'osw/ext/custom.geojson'),
+            ('opensidewalks.nodes.geojson', 'a/opensidewalks.nodes.geojson'),
+            ('opensidewalks.nodes.geojson', 'other.geojson'),
+            ('city.nodes.geojson', 'city.edges.geojson', 'dir/city.points.geojson', 'deep/er/city.lines.geojson'),
+            ('city.nodes.geojson', 'other.geojson'),
+            ('city.nodes.geojson', 'more.nodes.geojson'),
+            ('__MACOSX/', '__MACOSX/._city.nodes.geojson', 'city.nodes.geojson'),
+            ('readme.txt',),
+        ]
+        for names in layouts:
+            with self.subTest(names=names):
+                self.assert_same_layout(self.make_zip(*names))
+
+    def test_broken_archives(self):
+        not_a_zip = os.path.join(self.temp_dir, 'not_a.zip')
+        with open(not_a_zip, 'w') as f:
+            f.write('not a zip')
+        for zipfile_path in (self.make_zip(), not_a_zip, os.path.join(self.temp_dir, 'missing.zip')):
+            with self.subTest(zipfile_path=os.path.basename(zipfile_path)):
+                self.assert_same_layout(zipfile_path)
+
+
+class TestArchiveMember(unittest.TestCase):
+
+    def test_member(self):
+        member = ArchiveMember(f'{SAVED_FILE_PATH}/valid.zip', 'valid/wa.microsoft.graph.nodes.OSW.geojson')
+        self.assertEqual(os.path.basename(member), 'wa.microsoft.graph.nodes.OSW.geojson')
+        self.assertTrue(member.startswith('/vsizip/{'))
+        with member.open() as file:
+            self.assertEqual(file.read(1), b'{')
+
+    def test_pickle(self):
+        member = ArchiveMember(f'{SAVED_FILE_PATH}/valid.zip', 'valid/wa.microsoft.graph.nodes.OSW.geojson')
+        copy = pickle.loads(pickle.dumps(member))
+        self.assertEqual(copy, member)
+        self.assertEqual((copy.archive, copy.member), (member.archive, member.member))
+
+
+if __name__ == '__main__':
+    unittest.main()
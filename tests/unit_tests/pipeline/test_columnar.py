@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import geopandas as gpd
+from shapely.geometry import Point
+from src.pipeline.columnar import columnar_dir, columnar_files, write_columnar
+
+
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.gdf = gpd.GeoDataFrame({'_id': ['1', '2']}, geometry=[Point(0, 1), Point(1, 2)], crs='EPSG:4326')
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    def test_columnar_dir_next_to_archive(self):
+        self.assertEqual(columnar_dir('/tmp/job/dataset.zip'), '/tmp/job/dataset.parquet')
+        self.assertEqual(columnar_dir('uploads/2024/dataset.zip'), 'uploads/2024/dataset.parquet')
+
+    def test_columnar_files(self):
+        self.assertEqual(columnar_files(os.path.join(self.output_dir, 'missing')), {})
+        for name in ('nodes.parquet', 'edges.parquet', 'notes.txt'):
+            open(os.path.join(self.output_dir, name), 'w').close()
+        self.assertEqual(columnar_files(self.output_dir), {
+            'edges': os.path.join(self.output_dir, 'edges.parquet'),
+            'nodes': os.path.join(self.output_dir, 'nodes.parquet')
+        })
+
+    def test_failed_write_leaves_nothing(self):
+        gdf = MagicMock()
+
+        def partial_write(path, **kwargs):
+            open(path, 'w').close()
+            raise ValueError('unsupported column')
+
+        gdf.to_parquet.side_effect = partial_write
+        with self.assertLogs('VALIDATION_PIPELINE', level='WARNING'):
+            self.assertIsNone(write_columnar(gdf, self.output_dir, 'nodes'))
+        self.assertEqual(columnar_files(self.output_dir), {})
+
+    def test_round_trip(self):
+        path = write_columnar(self.gdf, self.output_dir, 'nodes')
+        self.assertEqual(columnar_files(self.output_dir), {'nodes': path})
+        gdf = gpd.read_parquet(path)
+        self.assertEqual(list(gdf['_id']), ['1', '2'])
+        self.assertTrue(gdf.geometry.geom_equals(self.gdf.geometry).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.pipeline.integrity import factorize_ids, find_duplicates, find_unmatched, flatten_ids
+
+
+def ids(*values) -> np.ndarray:
+    return np.array(values, dtype=object)
+
+
+def library_duplicates(values: np.ndarray) -> list:
+    frame = pd.DataFrame({'_id': values})
+    return list(frame[frame.duplicated('_id', keep=False)]['_id'].unique())
+
+
+class TestFactorizeIds(unittest.TestCase):
+
+    def test_same_code_across_columns(self):
+        (nodes, edges), _, num_ids = factorize_ids([ids('a', 'b', None), ids('b', 'c')])
+        self.assertEqual(list(nodes), [0, 1, -1])
+        self.assertEqual(list(edges), [1, 2])
+        self.assertEqual(num_ids, 3)
+
+    def test_integers_next_to_strings(self):
+        (nodes, edges), _, _ = factorize_ids([np.array([1, 2]), np.array(['1', '2'])])
+        self.assertEqual(len(set(nodes) & set(edges)), 0)
+
+    def test_unhashable_ids_as_strings(self):
+        _, columns, _ = factorize_ids([ids('a', ['b']), ids('a')])
+        self.assertEqual(list(columns[0]), ['a', "['b']"])
+        self.assertEqual(list(columns[1]), ['a'])
+
+
+class TestFindDuplicates(unittest.TestCase):
+
+    def test_no_duplicates(self):
+        self.assertEqual(find_duplicates(ids('a', 'b', 'c'), 20), (0, []))
+
+    def test_first_appearance_order(self):
+        values = ids('c', 'a', 'b', 'a', 'c', 'c', 'd')
+        self.assertEqual(find_duplicates(values, 20), (2, library_duplicates(values)))
+        self.assertEqual(find_duplicates(values, 1), (2, ['c']))
+
+    def test_integers(self):
+        values = np.array([5, 3, 5, 1, 3])
+        self.assertEqual(find_duplicates(values, 20), (2, [5, 3]))
+
+    def test_same_as_library(self):
+        cases = [ids('a', None, 'b', None), ids('a', None, 'a'), ids(1, '1', 1.0, 2), ids('x', np.nan, 'x', np.nan)]
+        for values in cases:
+            with self.subTest(values=values):
+                # The ids as the validator takes them out of the GeoDataFrame
+                count, duplicates = find_duplicates(pd.Series(values).to_numpy(), 20)
+                expected = library_duplicates(values)
+                self.assertEqual(count, len(expected))
+                self.assertEqual([str(value) for value in duplicates], [str(value) for value in expected])
+
+    def test_many_ids(self):
+        values = np.array([f'n{index}' for index in range(100000)] + ['n5', 'n99999', 'n5'], dtype=object)
+        self.assertEqual(find_duplicates(values, 20), (2, ['n5', 'n99999']))
+
+
+class TestFindUnmatched(unittest.TestCase):
+
+    def test_all_matched(self):
+        self.assertEqual(find_unmatched(ids('a', 'b', 'c'), [ids('a', 'b', 'a')], 20), [(0, [])])
+
+    def test_first_appearance_order(self):
+        references = ids('x', 'a', 'z', 'x', 'y', None)
+        self.assertEqual(find_unmatched(ids('a', 'b'), [references], 20), [(3, ['x', 'z', 'y'])])
+        self.assertEqual(find_unmatched(ids('a', 'b'), [references], 2), [(3, ['x', 'z'])])
+
+    def test_several_columns(self):
+        self.assertEqual(find_unmatched(ids('a', 'b'), [ids('a', 'x'), ids(), ids('y', 'b', 'y')], 20),
+                         [(1, ['x']), (0, []), (1, ['y'])])
+
+    def test_same_as_sets(self):
+        cases = [
+            (ids('1', 2, 3.0), ids(1, 2, 3)),
+            (np.array([1, 2, 3]), np.array([1, 3])),
+            (ids('a', 'b'), ids(None, 'a')),
+            (ids(['a'], 'b'), ids('a', ['b'])),
+        ]
+        for references, node_ids in cases:
+            with self.subTest(references=references, node_ids=node_ids):
+                [(count, unmatched)] = find_unmatched(node_ids, [references], 20)
+                try:
+                    expected = set(pd.Series(references).dropna()) - set(pd.Series(node_ids).dropna())
+                except TypeError:
+                    expected = set(map(str, pd.Series(references).dropna())) - \
+                        set(map(str, pd.Series(node_ids).dropna()))
+                self.assertEqual(count, len(expected))
+                self.assertEqual(set(unmatched), expected)
+
+    def test_many_references(self):
+        node_ids = np.array([f'n{index}' for index in range(100000)], dtype=object)
+        references = np.concatenate([node_ids[::-1], ids('missing2', 'n1', 'missing1', 'missing2')])
+        self.assertEqual(find_unmatched(node_ids, [references], 20), [(2, ['missing2', 'missing1'])])
+
+
+class TestFlattenIds(unittest.TestCase):
+
+    def test_lists_and_values(self):
+        self.assertEqual(list(flatten_ids(ids(['a', 'b'], None, [], 'c', ('d',)))), ['a', 'b', 'c', 'd'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from unittest.mock import MagicMock
+from src.pipeline import PipelineOptions
+
+
+class TestPipelineOptions(unittest.TestCase):
+
+    def test_disabled_by_default(self):
+        options = PipelineOptions()
+        self.assertFalse(options.fail_fast)
+        self.assertFalse(options.enabled)
+
+    def test_fail_fast_enables_pipeline(self):
+        self.assertTrue(PipelineOptions(fail_fast=True).enabled)
+
+    def test_file_workers_enable_pipeline(self):
+        self.assertFalse(PipelineOptions(file_workers=1).enabled)
+        self.assertTrue(PipelineOptions(file_workers=4).enabled)
+        self.assertEqual(PipelineOptions(file_workers=4).result_variant, '')
+
+    def test_streaming_enables_pipeline(self):
+        self.assertTrue(PipelineOptions(streaming=True).enabled)
+        self.assertEqual(PipelineOptions(streaming=True).result_variant, '')
+
+    def test_read_from_archive_enables_pipeline(self):
+        self.assertTrue(PipelineOptions(read_from_archive=True).enabled)
+
+    def test_vectorized_integrity_enables_pipeline(self):
+        self.assertTrue(PipelineOptions(vectorized_integrity=True).enabled)
+        self.assertEqual(PipelineOptions(vectorized_integrity=True).result_variant, '')
+
+    def test_compiled_schemas_enable_pipeline(self):
+        self.assertTrue(PipelineOptions(compiled_schemas=True).enabled)
+        self.assertEqual(PipelineOptions(compiled_schemas=True).result_variant, '')
+
+    def test_columnar_output_enables_pipeline(self):
+        self.assertTrue(PipelineOptions(columnar_output=True).enabled)
+        self.assertEqual(PipelineOptions(columnar_output=True).result_variant, '')
+
+    def test_result_variant(self):
+        self.assertEqual(PipelineOptions().result_variant, '')
+        self.assertEqual(PipelineOptions(fail_fast=True).result_variant, 'fail-fast')
+
+    def test_from_settings(self):
+        options = PipelineOptions.from_settings(MagicMock(validation_fail_fast=True, validation_file_workers='3',
+                                                           validation_streaming=False,
+                                                           validation_read_from_archive=True,
+                                                           validation_vectorized_integrity=False,
+                                                           validation_compiled_schemas=True,
+                                                           validation_columnar_output=True))
+        self.assertEqual(options.to_dict(), {'fail_fast': True, 'file_workers': 3, 'streaming': False,
+                                             'read_from_archive': True, 'vectorized_integrity': False,
+                                             'compiled_schemas': True, 'columnar_output': True})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import unittest
+from src.pipeline.parallel import file_pool, shutdown_file_pool, _watch_parent
+
+
+def parent_pid() -> int:
+    return os.getppid()
+
+
+class TestFilePool(unittest.TestCase):
+
+    def tearDown(self):
+        shutdown_file_pool()
+
+    def test_pool_is_shared(self):
+        self.assertIs(file_pool(2), file_pool(2))
+
+    def test_pool_is_replaced_when_size_changes(self):
+        pool = file_pool(2)
+        self.assertIsNot(file_pool(3), pool)
+
+    def test_runs_in_child_process(self):
+        self.assertEqual(file_pool(2).submit(parent_pid).result(timeout=60), os.getpid())
+
+    def test_shutdown(self):
+        pool = file_pool(2)
+        shutdown_file_pool()
+        self.assertIsNot(file_pool(2), pool)
+
+    def test_watch_parent_keeps_running_with_parent(self):
+        _watch_parent(os.getppid())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import json
+import tempfile
+import unittest
+from python_osw_validation import DEFAULT_DATASET_SCHEMAS
+from src.pipeline.schemas import COLLECTION, FEATURE, HEADER, load_schema, schema_part, schema_validator, \
+    warm_schemas, clear_schemas
+
+EDGES_SCHEMA = DEFAULT_DATASET_SCHEMAS['edges']
+
+
+class TestSchemas(unittest.TestCase):
+
+    def setUp(self):
+        clear_schemas()
+
+    def tearDown(self):
+        clear_schemas()
+
+    def test_schema_is_read_once(self):
+        self.assertIs(load_schema(EDGES_SCHEMA), load_schema(EDGES_SCHEMA))
+
+    def test_validator_is_compiled_once(self):
+        for part in (COLLECTION, FEATURE, HEADER):
+            with self.subTest(part=part):
+                self.assertIs(schema_validator(EDGES_SCHEMA, part), schema_validator(EDGES_SCHEMA, part))
+        self.assertIsNot(schema_validator(EDGES_SCHEMA, FEATURE), schema_validator(EDGES_SCHEMA, COLLECTION))
+
+    def test_parts(self):
+        schema = load_schema(EDGES_SCHEMA)
+        self.assertIs(schema_part(schema, COLLECTION), schema)
+        self.assertIs(schema_part(schema, FEATURE), schema['properties']['features']['items'])
+        header = schema_part(schema, HEADER)
+        self.assertNotIn('items', header['properties']['features'])
+        self.assertIn('items', schema['properties']['features'])
+
+    def test_features_without_one_schema(self):
+        schema = {'type': 'object', 'properties': {'features': {'type': 'array', 'items': [{'type': 'object'}]}}}
+        self.assertIsNone(schema_part(schema, FEATURE))
+        self.assertIsNone(schema_part(schema, HEADER))
+
+    def test_feature_validator(self):
+        validator = schema_validator(EDGES_SCHEMA, FEATURE)
+        self.assertFalse(validator.is_valid({'type': 'Feature'}))
+        self.assertTrue(schema_validator(EDGES_SCHEMA, HEADER).is_valid({
+            '$schema': 'https://sidewalks.washington.edu/opensidewalks/0.3/schema.json',
+            'type': 'FeatureCollection', 'features': [None]
+        }))
+
+    def test_warm_schemas(self):
+        self.assertEqual(warm_schemas(), len(set(DEFAULT_DATASET_SCHEMAS.values())))
+
+    def test_warm_schemas_skips_unreadable_schema(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            broken_schema = os.path.join(temp_dir, 'broken.json')
+            with open(broken_schema, 'w') as f:
+                f.write('{')
+            self.assertEqual(warm_schemas([EDGES_SCHEMA, broken_schema, os.path.join(temp_dir, 'missing.json')]), 1)
+
+    def test_custom_schema(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            schema_path = os.path.join(temp_dir, 'schema.json')
+            with open(schema_path, 'w') as f:
+                json.dump({'type': 'object', 'required': ['type']}, f)
+            self.assertFalse(schema_validator(schema_path).is_valid({}))
+            self.assertIsNone(schema_validator(schema_path, FEATURE))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import io
+import json
+import unittest
+from src.pipeline.streaming import FeatureStream, StreamDecodeError
+
+COLLECTION = {
+    '$schema': 'https://sidewalks.washington.edu/opensidewalks/0.3/schema.json',
+    'type': 'FeatureCollection',
+    'features': [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [-122.3, 47.6]},
+         'properties': {'_id': str(index), 'name': 'é' * index}}
+        for index in range(5)
+    ],
+    'dataSource': {'name': 'test'},
+    'count': 1234567890
+}
+
+
+def stream(text: str, chunk_size: int = 7) -> FeatureStream:
+    return FeatureStream(io.BytesIO(text.encode('utf-8')), chunk_size=chunk_size)
+
+
+def json_error(text: str) -> json.JSONDecodeError:
+    try:
+        json.loads(text)
+    except json.JSONDecodeError as e:
+        return e
+
+
+class TestFeatureStream(unittest.TestCase):
+
+    def assert_same_error(self, text: str, chunk_size: int = 7):
+        expected = json_error(text)
+        with self.assertRaises(json.JSONDecodeError) as context:
+            list(stream(text, chunk_size))
+        error = context.exception
+        self.assertEqual((error.msg, error.lineno, error.colno, error.pos),
+                         (expected.msg, expected.lineno, expected.colno, expected.pos))
+
+    def test_features_and_header(self):
+        for chunk_size in (1, 7, 1024):
+            with self.subTest(chunk_size=chunk_size):
+                features = stream(json.dumps(COLLECTION, indent=2), chunk_size)
+                self.assertEqual(list(features), COLLECTION['features'])
+                self.assertEqual(features.header, {key: value for key, value in COLLECTION.items()
+                                                   if key != 'features'})
+                self.assertEqual(features.feature_count, 5)
+                self.assertTrue(features.has_feature_array)
+
+    def test_empty_features(self):
+        features = stream('{"type": "FeatureCollection", "features": [ ]}')
+        self.assertEqual(list(features), [])
+        self.assertTrue(features.has_feature_array)
+
+    def test_features_not_an_array(self):
+        features = stream('{"features": {}, "type": "FeatureCollection"}')
+        self.assertEqual(list(features), [])
+        self.assertFalse(features.has_feature_array)
+        self.assertEqual(features.header, {'features': {}, 'type': 'FeatureCollection'})
+
+    def test_numbers_across_chunks(self):
+        features = stream('{"features": [], "count": 1234567890123}', chunk_size=3)
+        list(features)
+        self.assertEqual(features.header['count'], 1234567890123)
+
+    def test_errors_located_like_json(self):
+        text = json.dumps(COLLECTION, indent=2)
+        for broken in (text.replace('"geometry":', '"geometry"', 3), text[:len(text) // 2], text + ' x', '',
+                       '{"features": [1 2]}', '{"a" 1}', '{1: 2}'):
+            with self.subTest(broken=broken[-20:]):
+                self.assert_same_error(broken)
+
+    def test_not_a_collection(self):
+        with self.assertRaises(json.JSONDecodeError):
+            list(stream('[]'))
+
+    def test_windows_line_endings(self):
+        text = json.dumps(COLLECTION, indent=2).replace('\n', '\r\n')
+        self.assertEqual(len(list(stream(text))), 5)
+        broken = text.replace('"geometry":', '"geometry"', 3)
+        with self.assertRaises(json.JSONDecodeError) as context:
+            list(stream(broken))
+        # Located on the text with `\n` line endings, like json.load on a file opened in text mode
+        expected = json_error(broken.replace('\r\n', '\n'))
+        self.assertEqual((context.exception.lineno, context.exception.colno, context.exception.pos),
+                         (expected.lineno, expected.colno, expected.pos))
+
+    def test_stream_error_is_json_error(self):
+        error = StreamDecodeError('Expecting value', 10, 2, 3)
+        self.assertIsInstance(error, json.JSONDecodeError)
+        self.assertEqual(str(error), 'Expecting value: line 2 column 3 (char 10)')
+
+
+if __name__ == '__main__':
+    unittest.main()
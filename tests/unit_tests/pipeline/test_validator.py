@@ -0,0 +1,309 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+import zipfile
+import pandas as pd
+from pathlib import Path
+from unittest.mock import patch
+from python_osw_validation import OSWValidation
+from python_osw_validation.extracted_data_validator import ExtractedDataValidator
+from src.pipeline import PipelineValidation, PipelineOptions, ErrorBudget
+from src.pipeline.parallel import shutdown_file_pool
+from src.pipeline.validator import dataset_key, run_file_stage, serialization_error
+from tests.benchmarks.generate_osw_dataset import generate_dataset
+
+SAVED_FILE_PATH = f'{Path.cwd()}/tests/unit_tests/test_files'
+TEST_FILES = sorted(file for file in os.listdir(SAVED_FILE_PATH) if file.endswith('.zip'))
+
+
+class TestErrorBudget(unittest.TestCase):
+
+    def test_exhausted_only_when_enforced(self):
+        budget = ErrorBudget(max_errors=2)
+        budget.add(3)
+        self.assertEqual(budget.remaining, 0)
+        self.assertFalse(budget.exhausted)
+
+    def test_enforced(self):
+        budget = ErrorBudget(max_errors=2, enforced=True)
+        budget.add(1)
+        self.assertEqual(budget.remaining, 1)
+        self.assertFalse(budget.exhausted)
+        budget.add(1)
+        self.assertTrue(budget.exhausted)
+
+
+class TestPipelineValidation(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dataset_dir = tempfile.mkdtemp()
+        cls.many_errors = os.path.join(cls.dataset_dir, 'many_errors.zip')
+        generate_dataset(cls.many_errors, features=2000, seed=1,
+                         errors={'duplicate_ids': 10, 'dangling_refs': 5, 'geometry': 5})
+        # One problem of each kind, the library lists several ids in set order, which differs between processes
+        cls.one_error_each = os.path.join(cls.dataset_dir, 'one_error_each.zip')
+        generate_dataset(cls.one_error_each, features=2000, seed=1,
+                         errors={'schema': 1, 'duplicate_ids': 1, 'dangling_refs': 1, 'geometry': 1})
+        cls.schema_errors = os.path.join(cls.dataset_dir, 'schema_errors.zip')
+        generate_dataset(cls.schema_errors, features=2000, seed=1, errors={'schema': 30, 'enum': 10})
+        cls.no_errors = os.path.join(cls.dataset_dir, 'no_errors.zip')
+        generate_dataset(cls.no_errors, features=2000, seed=1, errors={})
+        cls.integrity_errors = os.path.join(cls.dataset_dir, 'integrity_errors.zip')
+        generate_dataset(cls.integrity_errors, features=2000, seed=1,
+                         errors={'duplicate_ids': 1, 'dangling_refs': 1, 'geometry': 1})
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.dataset_dir, ignore_errors=True)
+        shutdown_file_pool()
+
+    def assert_same_result(self, zipfile_path: str, max_errors: int, options: PipelineOptions = None):
+        expected = OSWValidation(zipfile_path=zipfile_path).validate(max_errors)
+        result = PipelineValidation(zipfile_path=zipfile_path, options=options).validate(max_errors)
+        self.assertEqual(result.is_valid, expected.is_valid)
+        self.assertEqual(result.errors, expected.errors)
+        self.assertEqual(result.issues, expected.issues)
+
+    def test_same_result_as_library(self):
+        for file in TEST_FILES:
+            for max_errors in (20, 2):
+                with self.subTest(file=file, max_errors=max_errors):
+                    self.assert_same_result(f'{SAVED_FILE_PATH}/{file}', max_errors)
+
+    def test_same_result_as_library_on_integrity_errors(self):
+        self.assert_same_result(self.many_errors, 20)
+
+    def test_file_workers_same_result_as_library(self):
+        options = PipelineOptions(file_workers=2)
+        for zipfile_path in (f'{SAVED_FILE_PATH}/valid.zip', f'{SAVED_FILE_PATH}/invalid.zip',
+                             f'{SAVED_FILE_PATH}/edges_invalid.zip', self.one_error_each, self.integrity_errors):
+            with self.subTest(zipfile_path=os.path.basename(zipfile_path)):
+                self.assert_same_result(zipfile_path, 20, options)
+
+    def test_file_workers_stage_metrics(self):
+        validator = PipelineValidation(zipfile_path=f'{SAVED_FILE_PATH}/valid.zip',
+                                       options=PipelineOptions(file_workers=2))
+        validator.validate()
+        self.assertEqual(validator.feature_counts, {'edges': 3234, 'nodes': 5817, 'points': 133})
+        self.assertEqual(set(validator.stage_seconds), {'extraction', 'schema', 'integrity', 'validation'})
+
+    def test_run_file_stage_unreadable_file(self):
+        result = run_file_stage({}, PipelineOptions(), 'integrity', self.integrity_errors, 20, 0)
+        # The archive itself is not an OSW file, it can not be read as GeoJSON
+        self.assertEqual(result.value, ('', None, None))
+        self.assertEqual(result.problems, 1)
+        self.assertEqual(len(result.errors), 1)
+
+    def test_streaming_same_result_as_library(self):
+        options = PipelineOptions(streaming=True)
+        for zipfile_path in [f'{SAVED_FILE_PATH}/{file}' for file in TEST_FILES] + [self.schema_errors]:
+            for max_errors in (20, 2):
+                with self.subTest(zipfile_path=os.path.basename(zipfile_path), max_errors=max_errors):
+                    self.assert_same_result(zipfile_path, max_errors, options)
+
+    def test_streaming_counts_features(self):
+        validator = PipelineValidation(zipfile_path=f'{SAVED_FILE_PATH}/valid.zip',
+                                       options=PipelineOptions(streaming=True))
+        self.assertTrue(validator.validate().is_valid)
+        self.assertEqual(validator.feature_counts, {'edges': 3234, 'nodes': 5817, 'points': 133})
+
+    def test_streaming_collection_errors(self):
+        file_path = os.path.join(self.dataset_dir, 'opensidewalks.nodes.geojson')
+        with open(file_path, 'w') as f:
+            json.dump({'type': 'FeatureCollection', 'extra': 1, 'features': [
+                {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [-122.3, 47.6]},
+                 'properties': {'_id': 'n1', 'barrier': 'not-a-barrier'}}
+            ]}, f)
+        expected = OSWValidation(zipfile_path=None)
+        expected.validate_osw_errors(file_path, 20)
+        validator = PipelineValidation(zipfile_path=None, options=PipelineOptions(streaming=True))
+        self.assertFalse(validator.validate_osw_errors(file_path, 2))
+        validator = PipelineValidation(zipfile_path=None, options=PipelineOptions(streaming=True))
+        validator.validate_osw_errors(file_path, 20)
+        self.assertEqual(validator.errors, expected.errors)
+        self.assertEqual(validator.issues, expected.issues)
+        self.assertEqual(validator.issues[-1]['feature_index'], -1)
+
+    def test_streaming_invalid_json(self):
+        file_path = os.path.join(self.dataset_dir, 'opensidewalks.edges.geojson')
+        with open(file_path, 'w') as f:
+            f.write('{"type": "FeatureCollection",\n "features": [{"type": }]}')
+        expected = OSWValidation(zipfile_path=None)
+        expected.validate_osw_errors(file_path, 20)
+        validator = PipelineValidation(zipfile_path=None, options=PipelineOptions(streaming=True))
+        self.assertFalse(validator.validate_osw_errors(file_path, 20))
+        self.assertEqual(validator.errors, expected.errors)
+
+    def test_read_from_archive_same_result_as_library(self):
+        for options in (PipelineOptions(read_from_archive=True),
+                        PipelineOptions(read_from_archive=True, streaming=True)):
+            for zipfile_path in [f'{SAVED_FILE_PATH}/{file}' for file in TEST_FILES] + \
+                                [self.schema_errors, self.one_error_each, f'{SAVED_FILE_PATH}/missing.zip']:
+                with self.subTest(zipfile_path=os.path.basename(zipfile_path), options=options.to_dict()):
+                    self.assert_same_result(zipfile_path, 20, options)
+
+    def test_read_from_archive_does_not_extract(self):
+        validator = PipelineValidation(zipfile_path=f'{SAVED_FILE_PATH}/valid.zip',
+                                       options=PipelineOptions(read_from_archive=True))
+        with patch('src.pipeline.validator.ZipFileHandler') as mock_handler:
+            self.assertTrue(validator.validate().is_valid)
+        mock_handler.assert_not_called()
+        self.assertEqual(validator.feature_counts, {'edges': 3234, 'nodes': 5817, 'points': 133})
+
+    def test_read_from_archive_in_file_workers(self):
+        self.assert_same_result(self.one_error_each, 20, PipelineOptions(read_from_archive=True, file_workers=2))
+
+    def test_vectorized_integrity_same_result_as_library(self):
+        options = PipelineOptions(vectorized_integrity=True)
+        for zipfile_path in [f'{SAVED_FILE_PATH}/{file}' for file in TEST_FILES] + \
+                            [self.one_error_each]:
+            with self.subTest(zipfile_path=zipfile_path):
+                self.assert_same_result(zipfile_path, 20, options)
+
+    def test_vectorized_integrity_same_errors_as_library(self):
+        result = PipelineValidation(zipfile_path=self.many_errors,
+                                    options=PipelineOptions(vectorized_integrity=True)).validate(100)
+        expected = OSWValidation(zipfile_path=self.many_errors).validate(100)
+        self.assertEqual(len(result.errors), len(expected.errors))
+        for error, expected_error in zip(result.errors, expected.errors):
+            message, _, ids = error.rpartition(': ')
+            expected_message, _, expected_ids = expected_error.rpartition(': ')
+            self.assertEqual(message, expected_message)
+            self.assertEqual(set(ids.split(', ')), set(expected_ids.split(', ')))
+
+    def test_vectorized_integrity_lists_ids_in_file_order(self):
+        result = PipelineValidation(zipfile_path=self.integrity_errors,
+                                    options=PipelineOptions(vectorized_integrity=True)).validate()
+        with zipfile.ZipFile(self.integrity_errors) as archive:
+            edges_file = next(name for name in archive.namelist() if name.endswith('edges.geojson'))
+            nodes_file = next(name for name in archive.namelist() if name.endswith('nodes.geojson'))
+            edges = json.loads(archive.read(edges_file))
+            node_ids = {feature['properties']['_id'] for feature in json.loads(archive.read(nodes_file))['features']}
+        v_ids = [feature['properties']['_v_id'] for feature in edges['features']]
+        expected = list(dict.fromkeys(v_id for v_id in v_ids if v_id not in node_ids))
+        self.assertEqual(len(expected), 2)
+        message = next(error for error in result.errors if "unmatched _v_id's" in error)
+        self.assertTrue(message.endswith(f"unmatched _v_id's: {', '.join(expected)}"))
+
+    def test_compiled_schemas_same_result_as_library(self):
+        options = PipelineOptions(compiled_schemas=True)
+        for zipfile_path in [f'{SAVED_FILE_PATH}/{file}' for file in TEST_FILES] + [self.schema_errors]:
+            for max_errors in (20, 2):
+                with self.subTest(zipfile_path=zipfile_path, max_errors=max_errors):
+                    self.assert_same_result(zipfile_path, max_errors, options)
+
+    def test_compiled_schemas_check_valid_files_without_library(self):
+        validator = PipelineValidation(zipfile_path=self.no_errors, options=PipelineOptions(compiled_schemas=True))
+        with patch.object(OSWValidation, 'validate_osw_errors') as library_check:
+            self.assertTrue(validator.validate().is_valid)
+        library_check.assert_not_called()
+        self.assertTrue(validator.feature_counts and all(validator.feature_counts.values()))
+        self.assert_same_result(self.no_errors, 20, PipelineOptions(compiled_schemas=True))
+
+    def test_compiled_schemas_load_file_once(self):
+        validator = PipelineValidation(zipfile_path=f'{SAVED_FILE_PATH}/edges_invalid.zip',
+                                       options=PipelineOptions(compiled_schemas=True))
+        with patch.object(OSWValidation, 'load_osw_file', side_effect=OSWValidation.load_osw_file,
+                          autospec=True) as load_file:
+            validator.validate()
+        loaded = [call.args[1] for call in load_file.call_args_list]
+        self.assertEqual(len(loaded), len(set(loaded)))
+
+    def test_columnar_output_writes_files_read(self):
+        zipfile_path = f'{SAVED_FILE_PATH}/valid.zip'
+        validator = PipelineValidation(zipfile_path=zipfile_path, options=PipelineOptions(columnar_output=True))
+        with patch('src.pipeline.validator.write_columnar') as write:
+            self.assertTrue(validator.validate().is_valid)
+        written = {call.args[2]: (call.args[1], len(call.args[0])) for call in write.call_args_list}
+        output_dir = f'{SAVED_FILE_PATH}/valid.parquet'
+        self.assertEqual(written, {'edges': (output_dir, 3234), 'nodes': (output_dir, 5817), 'points': (output_dir, 133)})
+
+    def test_columnar_output_skips_invalid_geometries(self):
+        validator = PipelineValidation(zipfile_path=self.integrity_errors, options=PipelineOptions(columnar_output=True))
+        with patch('src.pipeline.validator.write_columnar') as write:
+            self.assertFalse(validator.validate().is_valid)
+        written = [call.args[2] for call in write.call_args_list]
+        self.assertTrue(written)
+        self.assertNotIn('zones', written)
+        self.assert_same_result(self.integrity_errors, 20, PipelineOptions(columnar_output=True))
+
+    def test_fail_fast_stops_at_max_errors(self):
+        validator = PipelineValidation(zipfile_path=self.many_errors, options=PipelineOptions(fail_fast=True))
+        result = validator.validate(max_errors=5)
+        self.assertFalse(result.is_valid)
+        # The 5 invalid zones spend the budget while the files are read, the cross-file checks never run
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn('invalid zones geometries', result.errors[0])
+        self.assertTrue(validator.budget.exhausted)
+        self.assertGreater(len(OSWValidation(zipfile_path=self.many_errors).validate(5).errors), 1)
+
+    def test_fail_fast_keeps_going_below_max_errors(self):
+        validator = PipelineValidation(zipfile_path=self.many_errors, options=PipelineOptions(fail_fast=True))
+        result = validator.validate(max_errors=100)
+        expected = OSWValidation(zipfile_path=self.many_errors).validate(100)
+        self.assertEqual(result.errors, expected.errors)
+
+    def test_fail_fast_valid_file(self):
+        validator = PipelineValidation(zipfile_path=f'{SAVED_FILE_PATH}/valid.zip',
+                                       options=PipelineOptions(fail_fast=True))
+        self.assertTrue(validator.validate(max_errors=1).is_valid)
+
+    def test_stages_and_feature_counts(self):
+        validator = PipelineValidation(zipfile_path=f'{SAVED_FILE_PATH}/valid.zip')
+        validator.validate()
+        self.assertEqual(set(validator.stage_seconds), {'extraction', 'schema', 'integrity', 'validation'})
+        self.assertEqual(validator.feature_counts, {'edges': 3234, 'nodes': 5817, 'points': 133})
+
+    def test_missing_archive(self):
+        result = PipelineValidation(zipfile_path=f'{SAVED_FILE_PATH}/missing.zip').validate()
+        self.assertFalse(result.is_valid)
+        self.assertEqual(len(result.errors), 1)
+
+    def test_extension_serialization_errors_same_as_library(self):
+        extension_dir = tempfile.mkdtemp(dir=self.dataset_dir)
+        extensions = []
+        for name in ('trees', 'benches'):
+            # Read back as timestamps, which json can not serialize
+            features = [{'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [0, index]},
+                         'properties': {'_id': str(index), 'surveyed': f'2024-01-0{index + 1}T10:00:00'}}
+                        for index in range(2)]
+            path = os.path.join(extension_dir, f'city.{name}.geojson')
+            with open(path, 'w') as f:
+                json.dump({'type': 'FeatureCollection', 'features': features}, f)
+            extensions.append(path)
+        is_valid = ExtractedDataValidator.is_valid
+
+        # The layout checks of the library never keep extension files next to OSW files, add them afterwards
+        def with_extensions(files):
+            valid = is_valid(files)
+            files.externalExtensions.extend(extensions)
+            return valid
+
+        with patch.object(ExtractedDataValidator, 'is_valid', autospec=True, side_effect=with_extensions):
+            self.assertEqual(len(OSWValidation(zipfile_path=self.no_errors).validate().errors), 1)
+            self.assert_same_result(self.no_errors, 20)
+
+    def test_dataset_key(self):
+        self.assertEqual(dataset_key('/tmp/a/opensidewalks.edges.geojson'), 'edges')
+        self.assertEqual(dataset_key('/tmp/a/custom.geojson'), '')
+
+    def test_serialization_error(self):
+        properties = pd.DataFrame({'_id': ['1', '2', None], 'width': [1.5, 2, 3], 'count': [1, 2, 3],
+                                   'tags': [['a'], None, {'b': 1}]})
+        self.assertIsNone(serialization_error(properties))
+        self.assertIsNone(serialization_error(properties[['_id', 'width']]))
+        properties['tags'] = [['a'], {1, 2}, None]
+        properties['surveyed'] = [pd.Timestamp('2024-01-01'), pd.Timestamp('2024-01-02'), None]
+        try:
+            for _, row in properties.iterrows():
+                json.dumps(row.to_dict())
+        except Exception as e:
+            expected = str(e)
+        self.assertEqual(str(serialization_error(properties)), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import time
+import threading
+import unittest
+from src.admission import AdmissionController
+
+MB = 1024 * 1024
+
+
+class TestAdmissionController(unittest.TestCase):
+
+    def setUp(self):
+        # 1 MB archives need 10 MB of memory and 2 MB of disk
+        self.controller = AdmissionController(memory_budget_bytes=25 * MB, disk_budget_bytes=100 * MB,
+                                              memory_factor=10, disk_factor=2,
+                                              large_job_threshold_bytes=1 * MB, large_job_concurrency=1)
+
+    def run_in_thread(self, archive_bytes, admitted, release):
+        def job():
+            with self.controller.admit(archive_bytes):
+                admitted.append(archive_bytes)
+                release.wait(5)
+
+        thread = threading.Thread(target=job)
+        thread.start()
+        return thread
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_estimate(self):
+        self.assertEqual(self.controller.estimate(1 * MB), (10 * MB, 2 * MB))
+        self.assertEqual(self.controller.estimate(None), (0, 0))
+
+    def test_lane(self):
+        self.assertEqual(self.controller.lane_for(1 * MB), AdmissionController.SMALL)
+        self.assertEqual(self.controller.lane_for(2 * MB), AdmissionController.LARGE)
+        self.assertEqual(self.controller.lane_for(None), AdmissionController.SMALL)
+
+    def test_budget_released(self):
+        with self.controller.admit(1 * MB) as lane:
+            self.assertEqual(lane, AdmissionController.SMALL)
+            self.assertEqual(self.controller.memory_reserved, 10 * MB)
+            self.assertEqual(self.controller.disk_reserved, 2 * MB)
+        self.assertEqual(self.controller.memory_reserved, 0)
+        self.assertEqual(self.controller.disk_reserved, 0)
+
+    def test_budget_released_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.controller.admit(1 * MB):
+                raise RuntimeError('validation failed')
+        self.assertEqual(self.controller.memory_reserved, 0)
+
+    def test_job_waits_for_budget(self):
+        admitted, release = [], threading.Event()
+        threads = [self.run_in_thread(1 * MB, admitted, release) for _ in range(3)]
+        self.wait_for(lambda: len(admitted) == 2 and self.controller.waiting == 1)
+
+        # Two jobs fit in the 25 MB memory budget, the third one waits
+        self.assertEqual(len(admitted), 2)
+        self.assertEqual(self.controller.waiting, 1)
+
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(admitted), 3)
+
+    def test_large_lane_limits_concurrency(self):
+        controller = AdmissionController(memory_budget_bytes=1000 * MB, disk_budget_bytes=1000 * MB,
+                                         memory_factor=1, disk_factor=1, large_job_threshold_bytes=1 * MB,
+                                         large_job_concurrency=1)
+        self.controller = controller
+        admitted, release = [], threading.Event()
+        threads = [self.run_in_thread(10 * MB, admitted, release) for _ in range(2)]
+        threads.append(self.run_in_thread(100, admitted, release))
+        self.wait_for(lambda: len(admitted) == 2 and controller.waiting == 1)
+
+        # One large job runs, the small job runs next to it, the second large job waits
+        self.assertEqual(sorted(admitted), [100, 10 * MB])
+        self.assertEqual(controller.running, {'small': 1, 'large': 1})
+
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(admitted), 3)
+
+    def test_oversized_job_runs_alone(self):
+        admitted, release = [], threading.Event()
+        with self.controller.admit(10 * MB):
+            # Needs 100 MB of memory, more than the whole budget, yet nothing else runs
+            self.assertEqual(self.controller.running['large'], 1)
+
+        small_done = threading.Event()
+        first = self.run_in_thread(100, admitted, small_done)
+        self.wait_for(lambda: len(admitted) == 1)
+        oversized = self.run_in_thread(10 * MB, admitted, release)
+        self.wait_for(lambda: self.controller.waiting == 1)
+        late = self.run_in_thread(100, admitted, release)
+        self.wait_for(lambda: self.controller.waiting == 2)
+
+        # The small job that came after the oversized one waits for it
+        self.assertEqual(admitted, [100])
+
+        small_done.set()
+        first.join(5)
+        self.wait_for(lambda: len(admitted) == 2)
+        self.assertEqual(admitted[1], 10 * MB)
+
+        release.set()
+        oversized.join(5)
+        late.join(5)
+        self.assertEqual(admitted, [100, 10 * MB, 100])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import io
+import os
+import hashlib
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+from src.file_downloader import FileDownloader, DEFAULT_CHUNK_SIZE
+
+
+class FakeBlobStream:
+    def __init__(self, content: bytes):
+        self.content = content
+        self.offset = 0
+        self.read_sizes = []
+
+    def read(self, size=-1):
+        self.read_sizes.append(size)
+        chunk = self.content[self.offset:self.offset + size]
+        self.offset += len(chunk)
+        return chunk
+
+
+class TestFileDownloader(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.destination = os.path.join(self.temp_dir.name, 'file.zip')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_default_chunk_size(self):
+        downloader = FileDownloader()
+        self.assertEqual(downloader.chunk_size, DEFAULT_CHUNK_SIZE)
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(ValueError):
+            FileDownloader(chunk_size=0)
+
+    def test_download_blob_in_chunks(self):
+        content = b'0123456789' * 10
+        stream = FakeBlobStream(content)
+        file = MagicMock()
+        file.blob_client.download_blob.return_value = stream
+
+        downloader = FileDownloader(chunk_size=32)
+        written = downloader.download(file, self.destination)
+
+        self.assertEqual(written, len(content))
+        self.assertEqual(downloader.bytes_downloaded, len(content))
+        self.assertEqual(downloader.chunks_written, 4)
+        self.assertTrue(all(size == 32 for size in stream.read_sizes))
+        file.get_stream.assert_not_called()
+        with open(self.destination, 'rb') as f:
+            self.assertEqual(f.read(), content)
+
+    def test_download_without_blob_client(self):
+        file = MagicMock(spec=['get_stream', 'file_path'])
+        file.get_stream.return_value = 'some text content'
+
+        downloader = FileDownloader(chunk_size=5)
+        written = downloader.download(file, self.destination)
+
+        self.assertEqual(written, len('some text content'))
+        self.assertEqual(downloader.chunks_written, 4)
+        self.assertEqual(downloader.content_hash, hashlib.sha256(b'some text content').hexdigest())
+        with open(self.destination, 'rb') as f:
+            self.assertEqual(f.read(), b'some text content')
+
+    def test_size_of_blob(self):
+        file = MagicMock()
+        file.blob_client.get_blob_properties.return_value.size = 2048
+        self.assertEqual(FileDownloader.size_of(file), 2048)
+        file.blob_client.download_blob.assert_not_called()
+
+    def test_size_of_local_file(self):
+        with open(self.destination, 'wb') as f:
+            f.write(b'12345')
+        file = MagicMock(spec=['get_stream', 'file_path'])
+        file.file_path = self.destination
+        self.assertEqual(FileDownloader.size_of(file), 5)
+
+    def test_size_of_unknown(self):
+        file = MagicMock(spec=['get_stream', 'file_path'])
+        file.file_path = 'remote/file.zip'
+        self.assertIsNone(FileDownloader.size_of(file))
+
+        failing = MagicMock()
+        failing.blob_client.get_blob_properties.side_effect = Exception('forbidden')
+        self.assertIsNone(FileDownloader.size_of(failing))
+
+    def test_copy_stream(self):
+        downloader = FileDownloader(chunk_size=4)
+        written = downloader.copy(io.BytesIO(b'uploaded archive'), self.destination)
+
+        self.assertEqual(written, len(b'uploaded archive'))
+        self.assertEqual(downloader.chunks_written, 4)
+        self.assertEqual(downloader.content_hash, hashlib.sha256(b'uploaded archive').hexdigest())
+        with open(self.destination, 'rb') as f:
+            self.assertEqual(f.read(), b'uploaded archive')
+
+    def test_counters_reset_between_downloads(self):
+        file = MagicMock(spec=['get_stream', 'file_path'])
+        file.get_stream.return_value = b'abcdef'
+        downloader = FileDownloader(chunk_size=4)
+
+        downloader.download(file, self.destination)
+        downloader.download(file, self.destination)
+
+        self.assertEqual(downloader.bytes_downloaded, 6)
+        self.assertEqual(downloader.chunks_written, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
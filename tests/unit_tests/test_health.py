@@ -0,0 +1,82 @@
+import datetime
+import unittest
+from unittest.mock import patch, MagicMock
+from src.health import HealthMonitor, free_disk_bytes, memory_headroom_bytes, queue_lag_seconds
+
+
+class TestHealthHelpers(unittest.TestCase):
+
+    def test_free_disk_of_missing_directory(self):
+        self.assertGreater(free_disk_bytes('/tmp/does/not/exist/yet'), 0)
+
+    @patch('src.health._read_int', side_effect=[4096, 1024])
+    def test_memory_headroom_from_cgroup(self, mock_read_int):
+        self.assertEqual(memory_headroom_bytes(), 3072)
+
+    @patch('src.health._read_int', return_value=None)
+    @patch('src.health.psutil.virtual_memory')
+    def test_memory_headroom_without_limit(self, mock_virtual_memory, mock_read_int):
+        mock_virtual_memory.return_value.available = 2048
+        self.assertEqual(memory_headroom_bytes(), 2048)
+
+    def test_queue_lag(self):
+        received_at = datetime.datetime(2024, 1, 1, 12, 0, 30, tzinfo=datetime.timezone.utc)
+        self.assertEqual(queue_lag_seconds('2024-01-01T12:00:00.000Z', received_at), 30)
+        self.assertEqual(queue_lag_seconds('2024-01-01 12:00:00', received_at), 30)
+
+    def test_queue_lag_unreadable_date(self):
+        self.assertIsNone(queue_lag_seconds(None))
+        self.assertIsNone(queue_lag_seconds('yesterday'))
+
+
+class TestHealthMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.validator = MagicMock()
+        self.validator.listener_thread.is_alive.return_value = True
+        self.validator.jobs_in_flight = 1
+        self.validator.max_concurrent_messages = 2
+        self.validator.queue_lag_seconds = 4.5
+        self.monitor = HealthMonitor(validator=self.validator, download_dir='/tmp', min_free_disk_mb=0,
+                                     min_free_memory_mb=0)
+
+    def test_live(self):
+        self.assertEqual(self.monitor.liveness(), {'status': 'ok', 'listener_alive': True})
+
+    def test_not_live_when_listener_died(self):
+        self.validator.listener_thread.is_alive.return_value = False
+        self.assertEqual(self.monitor.liveness()['status'], 'failed')
+
+    def test_not_live_without_validator(self):
+        self.assertEqual(HealthMonitor(validator=None, download_dir='/tmp').liveness()['status'], 'failed')
+
+    def test_ready(self):
+        readiness = self.monitor.readiness()
+        self.assertEqual(readiness['status'], 'ok')
+        self.assertEqual(readiness['jobs_in_flight'], 1)
+        self.assertEqual(readiness['max_concurrent_messages'], 2)
+        self.assertEqual(readiness['queue_lag_seconds'], 4.5)
+
+    def test_not_ready_when_saturated(self):
+        self.validator.jobs_in_flight = 2
+        readiness = self.monitor.readiness()
+        self.assertEqual(readiness['status'], 'failed')
+        self.assertFalse(readiness['checks']['capacity'])
+
+    @patch('src.health.free_disk_bytes', return_value=10 * 1024 * 1024)
+    def test_not_ready_when_disk_is_low(self, mock_free_disk):
+        self.monitor.min_free_disk_bytes = 100 * 1024 * 1024
+        readiness = self.monitor.readiness()
+        self.assertEqual(readiness['status'], 'failed')
+        self.assertFalse(readiness['checks']['disk'])
+
+    @patch('src.health.memory_headroom_bytes', return_value=10 * 1024 * 1024)
+    def test_not_ready_when_memory_is_low(self, mock_memory_headroom):
+        self.monitor.min_free_memory_bytes = 100 * 1024 * 1024
+        readiness = self.monitor.readiness()
+        self.assertEqual(readiness['status'], 'failed')
+        self.assertFalse(readiness['checks']['memory'])
+
+
+if __name__ == '__main__':
+    unittest.main()
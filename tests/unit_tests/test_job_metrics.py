@@ -0,0 +1,80 @@
+import json
+import unittest
+from unittest.mock import patch
+from src.job_metrics import JobMetrics, STAGE_SECONDS, FEATURES, PeakRSS
+
+
+class TestJobMetrics(unittest.TestCase):
+
+    def setUp(self):
+        STAGE_SECONDS.clear()
+        FEATURES.clear()
+        self.job_metrics = JobMetrics(message_id='message-1')
+
+    def test_stage_adds_up(self):
+        with self.job_metrics.stage('publish'):
+            pass
+        self.job_metrics.add_stage('download', 1.5)
+        self.job_metrics.add_stage('download', 0.5)
+
+        self.assertEqual(self.job_metrics.stages['download'], 2.0)
+        self.assertGreaterEqual(self.job_metrics.stages['publish'], 0)
+
+    def test_stage_recorded_when_it_fails(self):
+        with self.assertRaises(RuntimeError):
+            with self.job_metrics.stage('download'):
+                raise RuntimeError('storage unavailable')
+        self.assertIn('download', self.job_metrics.stages)
+
+    def test_add_validation(self):
+        self.job_metrics.add_validation({
+            'stages': {'extraction': 1, 'schema': 2},
+            'feature_counts': {'nodes': 10, 'edges': 5},
+            'peak_rss_bytes': 1024
+        })
+        self.job_metrics.add_validation(None)
+
+        self.assertEqual(self.job_metrics.stages, {'extraction': 1, 'schema': 2})
+        self.assertEqual(self.job_metrics.feature_count, 15)
+        self.assertEqual(self.job_metrics.peak_rss_bytes, 1024)
+
+    @patch('src.job_metrics.logger')
+    def test_finish_logs_json_record(self, mock_logger):
+        self.job_metrics.download_bytes = 2048
+        self.job_metrics.feature_counts = {'nodes': 10}
+        self.job_metrics.add_stage('download', 0.2)
+
+        self.job_metrics.finish()
+
+        record = json.loads(mock_logger.info.call_args[0][0])
+        self.assertEqual(record['message_id'], 'message-1')
+        self.assertEqual(record['download_bytes'], 2048)
+        self.assertEqual(record['stages'], {'download': 0.2})
+        self.assertEqual(record['features'], 10)
+
+    @patch('src.job_metrics.logger')
+    def test_finish_observes_histograms_once(self, mock_logger):
+        self.job_metrics.add_stage('schema', 0.2)
+        self.job_metrics.feature_counts = {'nodes': 10}
+
+        self.job_metrics.finish()
+        self.job_metrics.finish()
+
+        self.assertEqual(STAGE_SECONDS.count(stage='schema'), 1)
+        self.assertEqual(FEATURES.count(), 1)
+        mock_logger.info.assert_called_once()
+
+    def test_peak_rss_above_start_of_job(self):
+        size = 64 * 1024 * 1024
+        with PeakRSS() as peak_rss:
+            block = b'x' * size
+        self.assertGreaterEqual(peak_rss.peak_bytes, size // 2)
+        del block
+
+        with PeakRSS() as peak_rss:
+            pass
+        self.assertLess(peak_rss.peak_bytes, size // 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,237 @@
+import os
+import io
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from python_ms_core.core.queue.models.queue_message import QueueMessage
+from src.file_downloader import FileDownloader
+from src.local_backends import LocalCore, DirectoryStorageClient, InMemoryTopic, FileTopic, LOCAL, MEMORY, _PollingTopic
+
+SAVED_FILE_PATH = f'{Path.cwd()}/tests/unit_tests/test_files'
+
+
+def message(message_id: str) -> QueueMessage:
+    return QueueMessage.data_from({'messageId': message_id, 'messageType': 'test', 'data': {'id': message_id}})
+
+
+class TopicTestMixin:
+    topic = None
+
+    def collect(self, expected: int, fail_first: bool = False):
+        received, done = [], threading.Event()
+        failed = []
+
+        def callback(queue_message):
+            if fail_first and not failed:
+                failed.append(queue_message.messageId)
+                raise ValueError('boom')
+            received.append(queue_message.messageId)
+            if len(received) == expected:
+                done.set()
+
+        thread = threading.Thread(target=self.topic.subscribe, kwargs={'subscription': 'sub', 'callback': callback})
+        thread.start()
+        done.wait(5)
+        self.topic.close()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+        return received, failed
+
+    def test_delivers_in_order(self):
+        self.topic.create_subscription('sub')
+        for index in range(3):
+            self.topic.publish(data=message(f'm{index}'))
+
+        received, _ = self.collect(3)
+
+        self.assertEqual(received, ['m0', 'm1', 'm2'])
+        self.assertEqual(self.topic.pending('sub'), 0)
+
+    def test_failed_message_is_delivered_again(self):
+        self.topic.create_subscription('sub')
+        self.topic.publish(data=message('m0'))
+
+        received, failed = self.collect(1, fail_first=True)
+
+        self.assertEqual(failed, ['m0'])
+        self.assertEqual(received, ['m0'])
+
+    def test_poison_message_is_dead_lettered(self):
+        self.topic.max_delivery_count = 3
+        self.topic.create_subscription('sub')
+        self.topic.publish(data=message('poison'))
+        self.topic.publish(data=message('m1'))
+        attempts, received = [], []
+
+        def callback(queue_message):
+            if queue_message.messageId == 'poison':
+                attempts.append(queue_message.messageId)
+                raise ValueError('boom')
+            received.append(queue_message.messageId)
+
+        thread = threading.Thread(target=self.topic.subscribe, kwargs={'subscription': 'sub', 'callback': callback})
+        thread.start()
+        for _ in range(500):
+            if len(attempts) >= 3 and received and self.topic.pending('sub') == 0:
+                break
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.topic.close()
+        thread.join(5)
+
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(received, ['m1'])
+        self.assertEqual(self.topic.pending('sub'), 0)
+
+    def test_every_subscription_gets_a_copy(self):
+        self.topic.create_subscription('sub')
+        self.topic.create_subscription('other')
+        self.topic.publish(data=message('m0'))
+        self.assertEqual(self.topic.pending('sub'), 1)
+        self.assertEqual(self.topic.pending('other'), 1)
+
+    def test_message_without_subscription_is_dropped(self):
+        self.topic.publish(data=message('m0'))
+        self.topic.create_subscription('sub')
+        self.assertEqual(self.topic.pending('sub'), 0)
+
+
+class TestInMemoryTopic(TopicTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.topic = InMemoryTopic('requests', max_concurrent_messages=1, poll_interval=0.01)
+
+    def test_polling_topic_needs_every_hook(self):
+        class WithoutAbandon(_PollingTopic):
+            def publish(self, data=None):
+                pass
+
+            def create_subscription(self, subscription: str):
+                pass
+
+            def _receive(self, subscription: str):
+                return None
+
+            def _complete(self, subscription: str, receipt) -> None:
+                pass
+
+        with self.assertRaises(TypeError):
+            WithoutAbandon(topic_name='requests')
+
+
+class TestFileTopic(TopicTestMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.topic_dir = tempfile.mkdtemp()
+        self.topic = FileTopic(self.topic_dir, 'requests', max_concurrent_messages=1, poll_interval=0.01)
+
+    def tearDown(self):
+        shutil.rmtree(self.topic_dir, ignore_errors=True)
+
+    def test_message_files(self):
+        self.topic.create_subscription('sub')
+        self.topic.publish(data=message('m0'))
+        self.assertEqual(len(os.listdir(os.path.join(self.topic_dir, 'requests', 'sub'))), 1)
+
+    def test_dead_letter_file_kept(self):
+        self.test_poison_message_is_dead_lettered()
+        names = os.listdir(os.path.join(self.topic_dir, 'requests', 'sub'))
+        self.assertEqual(len(names), 1)
+        self.assertTrue(names[0].endswith(FileTopic.DEAD_LETTER_SUFFIX))
+
+    def test_shared_between_instances(self):
+        other = FileTopic(self.topic_dir, 'requests', poll_interval=0.01)
+        self.topic.create_subscription('sub')
+        other.publish(data=message('m0'))
+
+        received, _ = self.collect(1)
+
+        self.assertEqual(received, ['m0'])
+
+
+class TestDirectoryStorageClient(unittest.TestCase):
+
+    def setUp(self):
+        self.storage_dir = tempfile.mkdtemp()
+        self.client = DirectoryStorageClient(self.storage_dir)
+        self.container_dir = os.path.join(self.storage_dir, 'osw')
+
+    def tearDown(self):
+        shutil.rmtree(self.storage_dir, ignore_errors=True)
+
+    def test_upload_and_download(self):
+        file = self.client.get_container('osw').create_file('test_upload/valid.zip')
+        with open(f'{SAVED_FILE_PATH}/valid.zip', 'rb') as f:
+            file.upload(f)
+
+        found = self.client.get_file_from_url('osw', file.get_remote_url())
+        downloader = FileDownloader(chunk_size=1024)
+        destination = os.path.join(self.storage_dir, 'copy.zip')
+        downloader.download(found, destination)
+
+        self.assertEqual(found.file_path, os.path.join(self.container_dir, 'test_upload', 'valid.zip'))
+        self.assertEqual(downloader.bytes_downloaded, os.path.getsize(f'{SAVED_FILE_PATH}/valid.zip'))
+        self.assertEqual(FileDownloader.size_of(found), downloader.bytes_downloaded)
+
+    def test_blob_url(self):
+        file = self.client.get_file_from_url('osw', 'https://account.blob.core.windows.net/osw/test_upload/a%20b.zip')
+        self.assertEqual(file.file_path, os.path.join(self.container_dir, 'test_upload', 'a b.zip'))
+        self.assertEqual(os.path.basename(file.file_path), 'a b.zip')
+
+    def test_url_of_another_container(self):
+        file = self.client.get_file('other', 'a.zip')
+        found = self.client.get_file_from_url('osw', file.get_remote_url())
+        self.assertEqual(found.file_path, file.file_path)
+
+    def test_path_outside_container(self):
+        with self.assertRaises(ValueError):
+            self.client.get_file('osw', '../secrets.txt')
+
+    def test_list_files(self):
+        self.client.get_file('osw', 'a.txt').upload(b'a')
+        self.client.get_file('osw', 'dir/b.txt').upload(io.BytesIO(b'b'))
+        names = [file.name for file in self.client.get_container('osw').list_files()]
+        self.assertEqual(sorted(names), ['a.txt', os.path.join('dir', 'b.txt')])
+        self.assertEqual(self.client.get_file('osw', 'a.txt').get_body_text(), 'a')
+
+    def test_missing_file(self):
+        file = self.client.get_file_from_url('osw', 'https://account.blob.core.windows.net/osw/missing.zip')
+        self.assertIsNone(FileDownloader.size_of(file))
+
+
+class TestLocalCore(unittest.TestCase):
+
+    def test_memory_topics_are_shared(self):
+        core = LocalCore(storage_dir=tempfile.gettempdir(), topic_provider=MEMORY)
+        subscriber = core.get_topic('requests', max_concurrent_messages=2)
+        subscriber.create_subscription('sub')
+        core.get_topic('requests').publish(data=message('m0'))
+        self.assertEqual(subscriber.pending('sub'), 1)
+        self.assertEqual(subscriber.max_concurrent_messages, 2)
+
+    def test_file_topics(self):
+        topic_dir = tempfile.mkdtemp()
+        try:
+            core = LocalCore(storage_dir=topic_dir, topic_dir=topic_dir, topic_provider=LOCAL)
+            self.assertIsInstance(core.get_topic('requests'), FileTopic)
+        finally:
+            shutil.rmtree(topic_dir, ignore_errors=True)
+
+    def test_file_topics_need_a_directory(self):
+        with self.assertRaises(ValueError):
+            LocalCore(storage_dir=tempfile.gettempdir(), topic_provider=LOCAL)
+
+    def test_unknown_topic_provider(self):
+        with self.assertRaises(ValueError):
+            LocalCore(storage_dir=tempfile.gettempdir(), topic_provider='azure')
+
+    def test_permissions_are_granted(self):
+        core = LocalCore(storage_dir=tempfile.gettempdir())
+        self.assertTrue(core.get_authorizer(config={'provider': 'Hosted'}).has_permission(request_params=None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,13 @@
+import json
 import unittest
+from pathlib import Path
+from unittest.mock import patch, MagicMock
 from fastapi import status
 from fastapi.testclient import TestClient
 from src.main import app, get_settings
+from src.validation_engine import ValidationTimeoutError
+
+SAVED_FILE_PATH = f'{Path.cwd()}/tests/unit_tests/test_files'
 
 
 class TestApp(unittest.TestCase):
@@ -18,6 +24,100 @@ class TestApp(unittest.TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.text.strip('\"'), "I'm healthy !!")
 
+    def test_live(self):
+        validator = MagicMock()
+        validator.listener_thread.is_alive.return_value = True
+        with patch.object(app, 'validator', validator):
+            response = self.client.get('/health/live')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()['listener_alive'])
+
+    def test_live_without_listener(self):
+        response = self.client.get('/health/live')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    @patch('src.main.get_settings')
+    def test_ready_when_saturated(self, mock_get_settings):
+        mock_get_settings.return_value.readiness_min_free_disk_mb = 0
+        mock_get_settings.return_value.readiness_min_free_memory_mb = 0
+        validator = MagicMock(jobs_in_flight=2, max_concurrent_messages=2, queue_lag_seconds=None)
+        validator.listener_thread.is_alive.return_value = True
+        with patch.object(app, 'validator', validator):
+            response = self.client.get('/health/ready')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertFalse(response.json()['checks']['capacity'])
+
+            validator.jobs_in_flight = 1
+            response = self.client.get('/health/ready')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_metrics(self):
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.headers['content-type'].startswith('text/plain'))
+        self.assertIn('# TYPE osw_messages_received_total counter', response.text)
+        self.assertIn('# TYPE osw_job_stage_seconds histogram', response.text)
+
+    def test_validate_valid_file(self):
+        with open(f'{SAVED_FILE_PATH}/valid.zip', 'rb') as f:
+            response = self.client.post('/validate', files={'file': ('valid.zip', f, 'application/zip')})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()['is_valid'])
+        self.assertEqual(response.json()['validation_message'], '')
+
+    def test_validate_invalid_file(self):
+        with open(f'{SAVED_FILE_PATH}/invalid.zip', 'rb') as f:
+            response = self.client.post('/validate?max_errors=10',
+                                        files={'file': ('invalid.zip', f, 'application/zip')})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.json()['is_valid'])
+        errors = json.loads(response.json()['validation_message'])
+        self.assertEqual(len(errors), 5)
+        self.assertEqual(errors[0]['filename'], 'wa.microsoft.graph.edges.OSW.geojson')
+
+    def test_validate_unknown_file_format(self):
+        response = self.client.post('/validate', files={'file': ('data.txt', b'not a zip', 'text/plain')})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.json()['is_valid'])
+        self.assertEqual(response.json()['validation_message'], 'Failed to validate because unknown file format')
+
+    def test_validate_uses_validator_engine(self):
+        validator = MagicMock()
+        validator.result_cache = None
+        validator.engine.run.return_value = {'is_valid': True, 'issues': []}
+        with patch.object(app, 'validator', validator):
+            with open(f'{SAVED_FILE_PATH}/valid.zip', 'rb') as f:
+                response = self.client.post('/validate', files={'file': ('valid.zip', f, 'application/zip')})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.json()['is_valid'])
+        validator.engine.run.assert_called_once()
+        validator.memory_policy.job_finished.assert_called_once()
+        validator.start_job.assert_called_once()
+        validator.end_job.assert_called_once()
+
+    def test_validate_engine_error(self):
+        validator = MagicMock()
+        validator.result_cache = None
+        validator.engine.run.side_effect = Exception('worker died')
+        with patch.object(app, 'validator', validator):
+            response = self.client.post('/validate', files={'file': ('valid.zip', b'data', 'application/zip')})
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertIn('worker died', response.json()['detail'])
+
+    def test_validate_timeout(self):
+        validator = MagicMock()
+        validator.result_cache = None
+        validator.engine.run.side_effect = ValidationTimeoutError(30)
+        with patch.object(app, 'validator', validator):
+            response = self.client.post('/validate', files={'file': ('valid.zip', b'data', 'application/zip')})
+        self.assertEqual(response.status_code, status.HTTP_504_GATEWAY_TIMEOUT)
+        self.assertEqual(response.json()['detail'], 'Validation timed out after 30 seconds')
+        validator.end_job.assert_called_once()
+
+    def test_validate_requires_file(self):
+        response = self.client.post('/validate')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
     def test_get_settings(self):
         settings = get_settings()
         self.assertIsNotNone(settings)
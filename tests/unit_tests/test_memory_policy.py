@@ -0,0 +1,59 @@
+import unittest
+from unittest.mock import patch
+from src.memory_policy import MemoryPolicy
+
+
+class TestMemoryPolicy(unittest.TestCase):
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            MemoryPolicy(mode='sometimes')
+
+    def test_default_mode(self):
+        self.assertEqual(MemoryPolicy(mode=None).mode, MemoryPolicy.RSS)
+
+    @patch('src.memory_policy.gc.collect', return_value=0)
+    def test_always(self, mock_collect):
+        policy = MemoryPolicy(mode='always')
+        self.assertTrue(policy.job_finished())
+        self.assertTrue(policy.job_finished())
+        self.assertEqual(mock_collect.call_count, 2)
+        self.assertEqual(policy.collections, 2)
+
+    @patch('src.memory_policy.gc.collect', return_value=0)
+    def test_never(self, mock_collect):
+        policy = MemoryPolicy(mode='never')
+        self.assertFalse(policy.job_finished())
+        mock_collect.assert_not_called()
+        self.assertEqual(policy.jobs_finished, 1)
+
+    @patch('src.memory_policy.gc.collect', return_value=0)
+    def test_interval(self, mock_collect):
+        policy = MemoryPolicy(mode='interval', every_n_jobs=3)
+        collected = [policy.job_finished() for _ in range(6)]
+        self.assertEqual(collected, [False, False, True, False, False, True])
+        self.assertEqual(mock_collect.call_count, 2)
+
+    @patch('src.memory_policy.gc.collect', return_value=0)
+    @patch.object(MemoryPolicy, 'current_rss')
+    def test_rss_threshold(self, mock_rss, mock_collect):
+        policy = MemoryPolicy(mode='RSS', rss_threshold_mb=100)
+        mock_rss.return_value = 50 * 1024 * 1024
+        self.assertFalse(policy.job_finished())
+        mock_rss.return_value = 150 * 1024 * 1024
+        self.assertTrue(policy.job_finished())
+        mock_collect.assert_called_once()
+
+    def test_collect_records_duration(self):
+        policy = MemoryPolicy(mode='never')
+        time_taken = policy.collect()
+        self.assertGreaterEqual(time_taken, 0)
+        self.assertEqual(policy.last_collect_seconds, time_taken)
+        self.assertEqual(policy.total_collect_seconds, time_taken)
+
+    def test_current_rss(self):
+        self.assertGreater(MemoryPolicy.current_rss(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
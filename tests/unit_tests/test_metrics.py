@@ -0,0 +1,132 @@
+import unittest
+from src.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+class TestHistogram(unittest.TestCase):
+
+    def setUp(self):
+        self.histogram = Histogram('job_seconds', buckets=(1, 5, 10), labels=('stage',))
+
+    def test_cumulative_buckets(self):
+        for value in (0.5, 1, 3, 7, 20):
+            self.histogram.observe(value, stage='download')
+
+        series = self.histogram.snapshot()[('download',)]
+
+        self.assertEqual(series['buckets'], [(1.0, 2), (5.0, 3), (10.0, 4)])
+        self.assertEqual(series['count'], 5)
+        self.assertEqual(series['sum'], 31.5)
+
+    def test_series_per_label_value(self):
+        self.histogram.observe(1, stage='download')
+        self.histogram.observe(1, stage='publish')
+        self.histogram.observe(2, stage='publish')
+
+        self.assertEqual(self.histogram.count(stage='download'), 1)
+        self.assertEqual(self.histogram.count(stage='publish'), 2)
+        self.assertEqual(self.histogram.count(stage='schema'), 0)
+
+    def test_labels_must_match(self):
+        with self.assertRaises(ValueError):
+            self.histogram.observe(1)
+        with self.assertRaises(ValueError):
+            self.histogram.observe(1, stage='download', worker='1')
+
+    def test_clear(self):
+        self.histogram.observe(1, stage='download')
+        self.histogram.clear()
+        self.assertEqual(self.histogram.snapshot(), {})
+
+
+class TestCounter(unittest.TestCase):
+
+    def test_inc(self):
+        counter = Counter('messages_total', labels=('result',))
+        counter.inc(result='valid')
+        counter.inc(2, result='valid')
+        counter.inc(result='invalid')
+
+        self.assertEqual(counter.value(result='valid'), 3)
+        self.assertEqual(counter.value(result='invalid'), 1)
+
+    def test_cannot_decrease(self):
+        with self.assertRaises(ValueError):
+            Counter('messages_total').inc(-1)
+
+    def test_function(self):
+        counter = Counter('cache_requests_total', labels=('result',))
+        counter.set_function(lambda: {('hit',): 4, ('miss',): 1})
+        self.assertEqual(counter.value(result='hit'), 4)
+        self.assertEqual(counter.value(result='miss'), 1)
+
+
+class TestGauge(unittest.TestCase):
+
+    def test_inc_dec_set(self):
+        gauge = Gauge('jobs_in_flight')
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        self.assertEqual(gauge.value(), 1)
+        gauge.set(7)
+        self.assertEqual(gauge.value(), 7)
+
+    def test_function(self):
+        gauge = Gauge('workers')
+        gauge.set(1)
+        gauge.set_function(lambda: 3)
+        self.assertEqual(gauge.value(), 3)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+
+    def test_same_name_returns_same_histogram(self):
+        registry = MetricsRegistry()
+        first = registry.histogram('job_seconds')
+        self.assertIs(registry.histogram('job_seconds'), first)
+        self.assertIs(registry.get('job_seconds'), first)
+        self.assertEqual(registry.metrics(), [first])
+
+    def test_unknown_metric(self):
+        self.assertIsNone(MetricsRegistry().get('job_seconds'))
+
+    def test_name_registered_with_other_type(self):
+        registry = MetricsRegistry()
+        registry.counter('jobs')
+        with self.assertRaises(ValueError):
+            registry.gauge('jobs')
+
+    def test_render(self):
+        registry = MetricsRegistry()
+        registry.counter('messages_total', 'Messages received', labels=('result',)).inc(result='va"lid')
+        registry.gauge('jobs_in_flight', 'Jobs in flight').set(2)
+        registry.histogram('stage_seconds', 'Stage time', buckets=(1, 5), labels=('stage',)).observe(2.5, stage='schema')
+
+        lines = registry.render().splitlines()
+
+        self.assertEqual(lines, [
+            '# HELP jobs_in_flight Jobs in flight',
+            '# TYPE jobs_in_flight gauge',
+            'jobs_in_flight 2',
+            '# HELP messages_total Messages received',
+            '# TYPE messages_total counter',
+            'messages_total{result="va\\"lid"} 1',
+            '# HELP stage_seconds Stage time',
+            '# TYPE stage_seconds histogram',
+            'stage_seconds_bucket{stage="schema",le="1"} 0',
+            'stage_seconds_bucket{stage="schema",le="5"} 1',
+            'stage_seconds_bucket{stage="schema",le="+Inf"} 1',
+            'stage_seconds_sum{stage="schema"} 2.5',
+            'stage_seconds_count{stage="schema"} 1'
+        ])
+
+    def test_render_skips_failing_function(self):
+        registry = MetricsRegistry()
+        registry.gauge('broken').set_function(lambda: 1 / 0)
+        registry.gauge('working').set(1)
+
+        self.assertIn('working 1', registry.render().splitlines())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from unittest.mock import patch
+from src.permission_cache import PermissionCache
+
+
+class TestPermissionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = PermissionCache(max_entries=2, positive_ttl_seconds=60, negative_ttl_seconds=5)
+        self.key = PermissionCache.make_key('user', 'project_group', ['poc', 'tdei-admin'])
+
+    def test_make_key_ignores_role_order(self):
+        other_key = PermissionCache.make_key('user', 'project_group', ['tdei-admin', 'poc'])
+        self.assertEqual(self.key, other_key)
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get(self.key))
+        self.cache.set(self.key, True)
+
+        self.assertTrue(self.cache.get(self.key))
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_negative_decision_cached(self):
+        self.cache.set(self.key, False)
+        self.assertIs(self.cache.get(self.key), False)
+
+    @patch('src.permission_cache.time.monotonic')
+    def test_separate_ttls(self, mock_monotonic):
+        granted_key = PermissionCache.make_key('granted', 'project_group', ['poc'])
+        denied_key = PermissionCache.make_key('denied', 'project_group', ['poc'])
+        mock_monotonic.return_value = 100
+        self.cache.set(granted_key, True)
+        self.cache.set(denied_key, False)
+
+        mock_monotonic.return_value = 110
+
+        self.assertTrue(self.cache.get(granted_key))
+        self.assertIsNone(self.cache.get(denied_key))
+        self.assertEqual(len(self.cache), 1)
+
+    def test_zero_ttl_disables_caching(self):
+        cache = PermissionCache(negative_ttl_seconds=0)
+        cache.set(self.key, False)
+        self.assertIsNone(cache.get(self.key))
+
+    def test_least_recently_used_evicted(self):
+        first = PermissionCache.make_key('first', 'project_group', ['poc'])
+        second = PermissionCache.make_key('second', 'project_group', ['poc'])
+        third = PermissionCache.make_key('third', 'project_group', ['poc'])
+        self.cache.set(first, True)
+        self.cache.set(second, True)
+        self.cache.get(first)
+        self.cache.set(third, True)
+
+        self.assertTrue(self.cache.get(first))
+        self.assertIsNone(self.cache.get(second))
+        self.assertTrue(self.cache.get(third))
+
+    def test_clear(self):
+        self.cache.set(self.key, True)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
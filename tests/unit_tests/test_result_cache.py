@@ -0,0 +1,105 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+import python_osw_validation
+from src.result_cache import ResultCache, LocalDiskCacheBackend
+from src.models.queue_message_content import ValidationResult
+
+
+class TestLocalDiskCacheBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.backend = LocalDiskCacheBackend(cache_dir=self.temp_dir.name, max_bytes=1024, ttl_seconds=60)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_set_and_get(self):
+        self.backend.set('key', {'is_valid': True, 'validation_message': ''})
+        self.assertEqual(self.backend.get('key'), {'is_valid': True, 'validation_message': ''})
+
+    def test_get_missing_key(self):
+        self.assertIsNone(self.backend.get('missing'))
+
+    def test_delete(self):
+        self.backend.set('key', {'is_valid': True})
+        self.backend.delete('key')
+        self.backend.delete('key')
+        self.assertIsNone(self.backend.get('key'))
+
+    def test_expired_entry_is_removed(self):
+        self.backend.set('key', {'is_valid': True})
+        path = os.path.join(self.temp_dir.name, 'key.json')
+        old_time = time.time() - 120
+        os.utime(path, (old_time, old_time))
+
+        self.assertIsNone(self.backend.get('key'))
+        self.assertFalse(os.path.exists(path))
+
+    def test_oldest_entries_evicted_over_max_bytes(self):
+        message = 'x' * 400
+        for index in range(3):
+            self.backend.set(f'key{index}', {'validation_message': message})
+            path = os.path.join(self.temp_dir.name, f'key{index}.json')
+            entry_time = time.time() - 10 + index
+            os.utime(path, (entry_time, entry_time))
+        self.backend.set('key3', {'validation_message': message})
+
+        self.assertIsNone(self.backend.get('key0'))
+        self.assertIsNone(self.backend.get('key1'))
+        self.assertIsNotNone(self.backend.get('key2'))
+        self.assertIsNotNone(self.backend.get('key3'))
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(backend=LocalDiskCacheBackend(cache_dir=self.temp_dir.name))
+        self.result = ValidationResult()
+        self.result.is_valid = False
+        self.result.validation_message = '[{"filename": "edges"}]'
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_make_key(self):
+        key = ResultCache.make_key('abc', 20)
+        self.assertEqual(key, f'abc-{python_osw_validation.__version__}-20')
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get('abc', 20))
+        self.cache.set('abc', 20, self.result)
+        cached = self.cache.get('abc', 20)
+
+        self.assertFalse(cached.is_valid)
+        self.assertEqual(cached.validation_message, self.result.validation_message)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_max_errors_is_part_of_key(self):
+        self.cache.set('abc', 20, self.result)
+        self.assertIsNone(self.cache.get('abc', 10))
+
+    def test_variant_is_part_of_key(self):
+        self.cache.set('abc', 20, self.result)
+        fail_fast_cache = ResultCache(backend=self.cache.backend, variant='fail-fast')
+        self.assertIsNone(fail_fast_cache.get('abc', 20))
+        self.assertEqual(ResultCache.make_key('abc', 20, 'fail-fast'),
+                         f'abc-{python_osw_validation.__version__}-20-fail-fast')
+
+    def test_backend_errors_are_ignored(self):
+        backend = MagicMock()
+        backend.get.side_effect = OSError('disk error')
+        backend.set.side_effect = OSError('disk error')
+        cache = ResultCache(backend=backend)
+
+        cache.set('abc', 20, self.result)
+        self.assertIsNone(cache.get('abc', 20))
+
+
+if __name__ == '__main__':
+    unittest.main()
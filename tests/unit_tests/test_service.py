@@ -1,6 +1,9 @@
 import unittest
 from unittest.mock import patch, MagicMock
-from src.osw_validator import OSWValidator
+from src.osw_validator import OSWValidator, MESSAGES_RECEIVED, MESSAGES_VALIDATED, MESSAGES_FAILED, JOBS_IN_FLIGHT, \
+    MESSAGES_TIMED_OUT, DEFAULT_PUBLISHED_DATE
+from src.validation_engine import ValidationEngine, ValidationTimeoutError
+from src.local_backends import LocalCore
 from src.models.queue_message_content import Upload
 from src.models.queue_message_content import ValidationResult
 
@@ -39,6 +42,29 @@ class TestOSWValidatorService(unittest.TestCase):
             }
         }
 
+    @patch('src.osw_validator.Core')
+    def test_create_core(self, mock_core):
+        self.service._settings = MagicMock(backend_provider='core')
+        self.assertIs(self.service.create_core(), mock_core.return_value)
+
+    def test_create_local_core(self):
+        self.service._settings = MagicMock(backend_provider='memory', local_storage_dir='/tmp/storage',
+                                           local_topic_poll_interval_ms=50, local_topic_max_delivery_count=3)
+        core = self.service.create_core()
+        self.assertIsInstance(core, LocalCore)
+        self.assertEqual(core.topic_provider, 'memory')
+        self.assertEqual(core.poll_interval, 0.05)
+        self.assertEqual(core.get_topic('requests').max_delivery_count, 3)
+
+    def test_stop_listening_closes_topic(self):
+        self.service.stop_listening()
+        self.service.listening_topic.close.assert_called_once()
+
+    def test_engine_created(self):
+        self.assertIsInstance(self.service.engine, ValidationEngine)
+        # Worker processes are only started when the first job comes in
+        self.assertEqual(self.service.engine.worker_count, 0)
+
     @patch('src.osw_validator.QueueMessage')
     @patch('src.osw_validator.Upload')
     def test_subscribe_with_valid_message(self, mock_request_message, mock_queue_message):
@@ -90,6 +116,96 @@ class TestOSWValidatorService(unittest.TestCase):
         # Ensure the upload_message is the expected object
         self.assertEqual(actual_upload_message, mock_request_message)
 
+    @patch('src.osw_validator.Validation')
+    def test_validate_notifies_memory_policy(self, mock_validation):
+        mock_request_message = MagicMock()
+        mock_request_message.data.file_upload_path = 'test_dataset_url'
+        self.service.send_status = MagicMock()
+        self.service.memory_policy = MagicMock()
+
+        self.service.validate(mock_request_message)
+
+        self.service.memory_policy.job_finished.assert_called_once()
+
+    @patch('src.osw_validator.Validation')
+    def test_validate_counts_messages(self, mock_validation):
+        mock_request_message = MagicMock()
+        mock_request_message.data.file_upload_path = 'test_dataset_url'
+        mock_validation.return_value.validate.return_value = MagicMock(is_valid=False)
+        self.service.send_status = MagicMock()
+        received = MESSAGES_RECEIVED.value()
+        invalid = MESSAGES_VALIDATED.value(result='invalid')
+
+        self.service.validate(mock_request_message)
+
+        self.assertEqual(MESSAGES_RECEIVED.value(), received + 1)
+        self.assertEqual(MESSAGES_VALIDATED.value(result='invalid'), invalid + 1)
+        self.assertEqual(JOBS_IN_FLIGHT.value(), 0)
+
+    def test_validate_counts_failed_messages(self):
+        mock_request_message = MagicMock()
+        mock_request_message.data.file_upload_path = None
+        self.service.send_status = MagicMock()
+        failed = MESSAGES_FAILED.value()
+
+        self.service.validate(mock_request_message)
+
+        self.assertEqual(MESSAGES_FAILED.value(), failed + 1)
+
+    @patch('src.osw_validator.Validation')
+    def test_validate_timeout_publishes_timeout_result(self, mock_validation):
+        mock_request_message = MagicMock()
+        mock_request_message.data.file_upload_path = 'test_dataset_url'
+        mock_validation.return_value.validate.side_effect = ValidationTimeoutError(120)
+        self.service.send_status = MagicMock()
+        timed_out = MESSAGES_TIMED_OUT.value()
+        failed = MESSAGES_FAILED.value()
+
+        self.service.validate(mock_request_message)
+
+        result = self.service.send_status.call_args.kwargs['result']
+        self.assertFalse(result.is_valid)
+        self.assertEqual(result.validation_message, 'Validation timed out after 120 seconds')
+        self.assertEqual(MESSAGES_TIMED_OUT.value(), timed_out + 1)
+        self.assertEqual(MESSAGES_FAILED.value(), failed)
+        self.assertEqual(JOBS_IN_FLIGHT.value(), 0)
+
+    def test_jobs_in_flight(self):
+        self.service.start_job()
+        self.service.start_job()
+        self.service.end_job()
+        self.assertEqual(self.service.jobs_in_flight, 1)
+        self.service.end_job()
+
+    def test_record_queue_lag(self):
+        self.service.record_queue_lag('2024-01-01T12:00:00.000Z')
+        self.assertGreater(self.service.queue_lag_seconds, 0)
+
+    def test_record_queue_lag_ignores_default_date(self):
+        self.service.record_queue_lag(DEFAULT_PUBLISHED_DATE)
+        self.service.record_queue_lag(None)
+        self.assertIsNone(self.service.queue_lag_seconds)
+
+    @patch('src.osw_validator.LocalDiskCacheBackend')
+    @patch('src.osw_validator.Core')
+    def test_result_cache_skipped_with_columnar_output(self, mock_core, _):
+        for columnar_output in (False, True):
+            settings = OSWValidator._settings.copy(update={
+                'result_cache_enabled': True, 'validation_workers': 0, 'validation_columnar_output': columnar_output
+            })
+            with patch.object(OSWValidator, '_settings', settings), patch.object(OSWValidator, 'start_listening'):
+                service = OSWValidator()
+            self.assertEqual(service.result_cache is None, columnar_output)
+
+    def test_process_rss(self):
+        rss = self.service.process_rss()
+        self.assertGreater(rss[('service',)], 0)
+        self.assertEqual(rss[('workers',)], 0)
+
+    def test_cache_requests(self):
+        self.assertEqual(OSWValidator.cache_requests(None), {})
+        self.assertEqual(OSWValidator.cache_requests(MagicMock(hits=3, misses=1)), {('hit',): 3, ('miss',): 1})
+
     @patch('src.osw_validator.ValidationResult')
     def test_validate_with_no_file_upload_path(self, mock_validation_result):
         # Arrange
@@ -221,6 +337,68 @@ class TestOSWValidatorService(unittest.TestCase):
         self.assertFalse(result)
         self.service.auth.has_permission.assert_called_once()
 
+    def test_has_permission_uses_cache(self):
+        mock_message = Upload(data={
+            'data': {
+                'user_id': '1233',
+                'tdei_project_group_id': '444444'
+            },
+            'message': 'test_message',
+            'messageType': 'message_type',
+            'messageId': '123'
+        })
+
+        self.service.auth.has_permission = MagicMock()
+        self.service.auth.has_permission.return_value = True
+
+        first = self.service.has_permission(roles=['poc'], queue_message=mock_message)
+        second = self.service.has_permission(roles=['poc'], queue_message=mock_message)
+
+        self.assertTrue(first)
+        self.assertTrue(second)
+        self.service.auth.has_permission.assert_called_once()
+        self.assertEqual(self.service.permission_cache.hits, 1)
+
+    def test_has_permission_without_cache(self):
+        mock_message = Upload(data={
+            'data': {
+                'user_id': '1233',
+                'tdei_project_group_id': '444444'
+            },
+            'message': 'test_message',
+            'messageType': 'message_type',
+            'messageId': '123'
+        })
+
+        self.service.permission_cache = None
+        self.service.auth.has_permission = MagicMock()
+        self.service.auth.has_permission.return_value = True
+
+        self.service.has_permission(roles=['poc'], queue_message=mock_message)
+        self.service.has_permission(roles=['poc'], queue_message=mock_message)
+
+        self.assertEqual(self.service.auth.has_permission.call_count, 2)
+
+    def test_has_permission_error_body_not_cached(self):
+        mock_message = Upload(data={
+            'data': {
+                'user_id': '1233',
+                'tdei_project_group_id': '444444'
+            },
+            'message': 'test_message',
+            'messageType': 'message_type',
+            'messageId': '123'
+        })
+
+        self.service.auth.has_permission = MagicMock()
+        self.service.auth.has_permission.side_effect = [{'message': 'Internal server error'}, None, True]
+
+        self.assertFalse(self.service.has_permission(roles=['poc'], queue_message=mock_message))
+        self.assertFalse(self.service.has_permission(roles=['poc'], queue_message=mock_message))
+        self.assertTrue(self.service.has_permission(roles=['poc'], queue_message=mock_message))
+
+        self.assertEqual(self.service.auth.has_permission.call_count, 3)
+
     def test_has_permission_exception(self):
         mock_message = Upload(data={
             'data': {
@@ -286,6 +464,28 @@ class TestOSWValidatorService(unittest.TestCase):
 
         mock_publish.assert_called_once()
 
+    def test_send_status_reuses_topic(self):
+        validation_result = ValidationResult()
+        validation_result.is_valid = True
+        validation_result.validation_message = ''
+
+        mock_message = Upload(data={
+            'data': {
+                'user_id': '1233',
+                'tdei_project_group_id': '444444'
+            },
+            'message': 'test_message',
+            'messageType': 'message_type',
+            'messageId': '123'
+        })
+        self.service.core.get_topic.reset_mock()
+
+        self.service.send_status(result=validation_result, upload_message=mock_message)
+        self.service.send_status(result=validation_result, upload_message=mock_message)
+
+        self.service.core.get_topic.assert_called_once_with(topic_name=self.service.publisher.topic_name)
+        self.assertEqual(self.service.core.get_topic.return_value.publish.call_count, 2)
+
     def test_send_status_exception(self):
         validation_result = ValidationResult()
         validation_result.is_valid = False
@@ -305,9 +505,11 @@ class TestOSWValidatorService(unittest.TestCase):
         mock_publish = mock_topic.publish
         mock_publish.side_effect = Exception('Mock Exception')
 
-        self.service.send_status(result=validation_result, upload_message=mock_message)
+        with self.assertLogs('OSW_VALIDATOR', level='ERROR'):
+            self.service.send_status(result=validation_result, upload_message=mock_message)
 
-        mock_publish.assert_called_once()
+        # Tried once more on a new client
+        self.assertEqual(mock_publish.call_count, 2)
 
     def test_validate_with_unauthorized(self):
         # Arrange
@@ -0,0 +1,200 @@
+import time
+import threading
+import unittest
+from unittest.mock import MagicMock
+from python_ms_core.core.queue.models.queue_message import QueueMessage
+from src.topic_publisher import TopicPublisher
+
+
+def make_message(message_id: str) -> QueueMessage:
+    return QueueMessage.data_from({'messageId': message_id, 'messageType': 'osw', 'data': {'success': True}})
+
+
+def publish_buffered(publisher: TopicPublisher, message_id: str):
+    """Publishes from another thread, `publish` waits there until the batch is sent"""
+    errors = []
+    buffered = len(publisher._pending) + 1
+
+    def run():
+        try:
+            publisher.publish(make_message(message_id))
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if len(publisher._pending) >= buffered:
+            break
+        time.sleep(0.01)
+    return thread, errors
+
+
+class TestTopicPublisher(unittest.TestCase):
+
+    def setUp(self):
+        self.core = MagicMock()
+        self.topic = MagicMock(spec=['publish'])
+        self.core.get_topic.return_value = self.topic
+
+    def test_topic_created_lazily_and_reused(self):
+        publisher = TopicPublisher(core=self.core, topic_name='validation')
+        self.core.get_topic.assert_not_called()
+
+        publisher.publish(make_message('1'))
+        publisher.publish(make_message('2'))
+
+        self.core.get_topic.assert_called_once_with(topic_name='validation')
+        self.assertEqual(self.topic.publish.call_count, 2)
+
+    def test_retries_on_new_client_after_failure(self):
+        publisher = TopicPublisher(core=self.core, topic_name='validation')
+        self.topic.publish.side_effect = [Exception('connection lost'), None]
+
+        publisher.publish(make_message('1'))
+
+        self.assertEqual(self.core.get_topic.call_count, 2)
+        self.assertEqual(self.topic.publish.call_count, 2)
+
+    def test_failed_client_closed(self):
+        failed, fresh = MagicMock(), MagicMock()
+        failed.publish.side_effect = Exception('connection lost')
+        self.core.get_topic.side_effect = [failed, fresh]
+        publisher = TopicPublisher(core=self.core, topic_name='validation')
+
+        publisher.publish(make_message('1'))
+
+        failed.publisher.close.assert_called_once()
+        failed.client.close.assert_called_once()
+        fresh.publish.assert_called_once()
+        fresh.client.close.assert_not_called()
+
+        publisher.close()
+        fresh.publisher.close.assert_called_once()
+        fresh.client.close.assert_called_once()
+
+    def test_raises_when_retry_fails(self):
+        publisher = TopicPublisher(core=self.core, topic_name='validation')
+        self.topic.publish.side_effect = [Exception('connection lost'), Exception('connection lost'), None]
+
+        with self.assertRaises(Exception):
+            publisher.publish(make_message('1'))
+        publisher.publish(make_message('2'))
+
+        self.assertEqual(self.core.get_topic.call_count, 3)
+
+    def test_sends_one_at_a_time(self):
+        publisher = TopicPublisher(core=self.core, topic_name='validation')
+        sending, overlaps = threading.Lock(), []
+
+        def publish(data):
+            if not sending.acquire(blocking=False):
+                overlaps.append(data)
+                return
+            time.sleep(0.01)
+            sending.release()
+
+        self.topic.publish.side_effect = publish
+        threads = [threading.Thread(target=publisher.publish, args=(make_message(str(index)),)) for index in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.topic.publish.call_count, 5)
+        self.assertEqual(overlaps, [])
+
+    def test_batch_flushed_when_full(self):
+        publisher = TopicPublisher(core=self.core, topic_name='validation', batch_size=3, flush_interval_ms=60000)
+
+        first, _ = publish_buffered(publisher, '1')
+        second, _ = publish_buffered(publisher, '2')
+        self.topic.publish.assert_not_called()
+        self.assertTrue(first.is_alive())
+        publisher.publish(make_message('3'))
+        first.join(timeout=1)
+        second.join(timeout=1)
+
+        self.assertFalse(first.is_alive() or second.is_alive())
+        self.assertEqual(self.topic.publish.call_count, 3)
+        self.assertIsNone(publisher._timer)
+
+    def test_failed_batch_kept_and_retried(self):
+        publisher = TopicPublisher(core=self.core, topic_name='validation', batch_size=2, flush_interval_ms=10)
+        self.topic.publish.side_effect = [Exception('connection lost')] * 2 + [None] * 2
+
+        first, errors = publish_buffered(publisher, '1')
+        publisher.publish(make_message('2'))
+        first.join(timeout=1)
+
+        self.assertEqual([call.kwargs['data'].messageId for call in self.topic.publish.call_args_list[2:]], ['1', '2'])
+        self.assertEqual(errors, [])
+        self.assertEqual(publisher._pending, [])
+
+    def test_close_fails_messages_it_cannot_send(self):
+        publisher = TopicPublisher(core=self.core, topic_name='validation', batch_size=10, flush_interval_ms=60000)
+        first, errors = publish_buffered(publisher, '1')
+        self.topic.publish.side_effect = Exception('connection lost')
+
+        with self.assertLogs('TOPIC_PUBLISHER', level='ERROR'):
+            publisher.close()
+        first.join(timeout=1)
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(publisher._pending, [])
+        self.assertIsNone(publisher._timer)
+
+    def test_batch_flushed_after_interval(self):
+        publisher = TopicPublisher(core=self.core, topic_name='validation', batch_size=10, flush_interval_ms=10)
+
+        publisher.publish(make_message('1'))
+        for _ in range(100):
+            if self.topic.publish.called:
+                break
+            time.sleep(0.01)
+
+        self.topic.publish.assert_called_once()
+
+    def test_batch_uses_service_bus_sender(self):
+        topic = MagicMock()
+        self.core.get_topic.return_value = topic
+        publisher = TopicPublisher(core=self.core, topic_name='validation', batch_size=2, flush_interval_ms=60000)
+
+        first, _ = publish_buffered(publisher, '1')
+        publisher.publish(make_message('2'))
+        first.join(timeout=1)
+
+        topic.publisher.create_message_batch.assert_called_once()
+        self.assertEqual(topic.publisher.create_message_batch.return_value.add_message.call_count, 2)
+        topic.publisher.send_messages.assert_called_once_with(topic.publisher.create_message_batch.return_value)
+        topic.publish.assert_not_called()
+
+    def test_batch_split_when_over_size_limit(self):
+        topic = MagicMock()
+        self.core.get_topic.return_value = topic
+        first_batch, second_batch = MagicMock(), MagicMock()
+        first_batch.add_message.side_effect = [None, ValueError('batch full')]
+        topic.publisher.create_message_batch.side_effect = [first_batch, second_batch]
+        publisher = TopicPublisher(core=self.core, topic_name='validation', batch_size=2, flush_interval_ms=60000)
+
+        first, _ = publish_buffered(publisher, '1')
+        publisher.publish(make_message('2'))
+        first.join(timeout=1)
+
+        self.assertEqual(topic.publisher.send_messages.call_count, 2)
+        second_batch.add_message.assert_called_once()
+
+    def test_close_flushes_pending(self):
+        publisher = TopicPublisher(core=self.core, topic_name='validation', batch_size=10, flush_interval_ms=60000)
+        first, errors = publish_buffered(publisher, '1')
+
+        publisher.close()
+        first.join(timeout=1)
+
+        self.topic.publish.assert_called_once()
+        self.assertEqual(errors, [])
+        self.assertIsNone(publisher._topic)
+
+
+if __name__ == '__main__':
+    unittest.main()
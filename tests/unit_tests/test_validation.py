@@ -1,3 +1,4 @@
+import io
 import os
 import json
 import unittest
@@ -126,15 +127,15 @@ class TestValidation(unittest.TestCase):
         # Ensure clean_up is called twice (once for the file, once for the folder)
         self.assertEqual(mock_clean_up.call_count, 2)
 
-    @patch('src.validation.OSWValidation')
+    @patch('src.validation.run_osw_validation')
     @patch('src.validation.Validation.clean_up')
     def test_validate_invalid_zip(self, mock_clean_up, mock_osw_validation):
         """Test validate method for invalid zip file with errors."""
-        # Mock the OSWValidation validate method to return errors
-        mock_validation_result = MagicMock()
-        mock_validation_result.is_valid = False
-        mock_validation_result.errors = 'Failed to validate because unknown file format'
-        mock_osw_validation.return_value.validate.return_value = mock_validation_result
+        # Mock the OSW validation to return errors
+        mock_osw_validation.return_value = {
+            'is_valid': False,
+            'issues': 'Failed to validate because unknown file format'
+        }
 
         # Act
         result = self.validation.validate(max_errors=10)
@@ -146,6 +147,132 @@ class TestValidation(unittest.TestCase):
         # Ensure clean_up is called twice (once for the file, once for the folder)
         self.assertEqual(mock_clean_up.call_count, 1)
 
+    @patch('src.validation.run_osw_validation')
+    @patch('src.validation.Validation.clean_up')
+    @patch('src.validation.Validation.download_single_file')
+    def test_validate_runs_on_engine(self, mock_download_file, mock_clean_up, mock_osw_validation):
+        """Test that the validation is sent to the engine when one is given."""
+        mock_download_file.return_value = f'{SAVED_FILE_PATH}/{FAILURE_FILE_NAME}'
+        engine = MagicMock()
+        engine.run.return_value = {'is_valid': False, 'issues': [{'filename': 'edges', 'error_message': ['error']}]}
+        self.validation.engine = engine
+
+        result = self.validation.validate(max_errors=10)
+
+        engine.run.assert_called_once_with(f'{SAVED_FILE_PATH}/{FAILURE_FILE_NAME}', 10)
+        mock_osw_validation.assert_not_called()
+        self.assertFalse(result.is_valid)
+        self.assertEqual(json.loads(result.validation_message)[0]['filename'], 'edges')
+
+    @patch('src.validation.Validation.clean_up')
+    @patch('src.validation.Validation.download_single_file')
+    def test_validate_records_job_metrics(self, mock_download_file, mock_clean_up):
+        """Test that the stages, sizes and feature counts of the job are recorded."""
+        mock_download_file.return_value = f'{SAVED_FILE_PATH}/{SUCCESS_FILE_NAME}'
+        self.validation.downloader.bytes_downloaded = 1024
+
+        self.validation.validate(max_errors=10)
+
+        job_metrics = self.validation.job_metrics
+        self.assertTrue(job_metrics.is_valid)
+        self.assertEqual(job_metrics.download_bytes, 1024)
+        self.assertEqual(job_metrics.archive_bytes, os.path.getsize(f'{SAVED_FILE_PATH}/{SUCCESS_FILE_NAME}'))
+        self.assertTrue({'download', 'extraction', 'schema', 'integrity', 'validation'} <= set(job_metrics.stages))
+        self.assertEqual(job_metrics.feature_count, 3234 + 5817 + 133)
+
+    @patch('src.validation.Validation.clean_up')
+    @patch('src.validation.Validation.download_single_file')
+    def test_validate_waits_for_admission(self, mock_download_file, mock_clean_up):
+        """Test that the archive size is checked with the admission controller before the download."""
+        mock_download_file.return_value = None
+        self.validation.admission = MagicMock()
+        self.mock_storage_client.get_file_from_url.return_value.blob_client.get_blob_properties.return_value.size = 512
+
+        self.validation.validate(max_errors=10)
+
+        self.validation.admission.admit.assert_called_once_with(512)
+        self.validation.admission.admit.return_value.__enter__.assert_called_once()
+
+    def test_archive_size_of_stream(self):
+        """Test that the size of an uploaded stream is read without moving its position."""
+        stream = io.BytesIO(b'0123456789')
+        stream.seek(2)
+        self.assertEqual(self.validation.archive_size(stream), 8)
+        self.assertEqual(stream.tell(), 2)
+
+    @patch('src.validation.Validation.run_osw_validation')
+    @patch('src.validation.Validation.clean_up')
+    @patch('src.validation.Validation.download_single_file')
+    def test_validate_uses_cached_result(self, mock_download_file, mock_clean_up, mock_run_osw_validation):
+        """Test that a cached result for the same archive skips the OSW validation."""
+        mock_download_file.return_value = f'{SAVED_FILE_PATH}/{SUCCESS_FILE_NAME}'
+        self.validation.downloader.content_hash = 'archivehash'
+        cached_result = MagicMock(is_valid=True, validation_message='')
+        self.validation.result_cache = MagicMock()
+        self.validation.result_cache.get.return_value = cached_result
+
+        result = self.validation.validate(max_errors=10)
+
+        self.validation.result_cache.get.assert_called_once_with('archivehash', 10)
+        mock_run_osw_validation.assert_not_called()
+        self.validation.result_cache.set.assert_not_called()
+        self.assertIs(result, cached_result)
+
+    @patch('src.validation.Validation.run_osw_validation', return_value=(False, [{'filename': 'edges'}]))
+    @patch('src.validation.Validation.clean_up')
+    @patch('src.validation.Validation.download_single_file')
+    def test_validate_stores_result_in_cache(self, mock_download_file, mock_clean_up, mock_run_osw_validation):
+        """Test that a fresh validation result is stored in the cache."""
+        mock_download_file.return_value = f'{SAVED_FILE_PATH}/{FAILURE_FILE_NAME}'
+        self.validation.downloader.content_hash = 'archivehash'
+        self.validation.result_cache = MagicMock()
+        self.validation.result_cache.get.return_value = None
+
+        result = self.validation.validate(max_errors=10)
+
+        mock_run_osw_validation.assert_called_once()
+        self.validation.result_cache.set.assert_called_once_with('archivehash', 10, result)
+        self.assertFalse(result.is_valid)
+
+    @patch('src.validation.Validation.run_osw_validation', return_value=(True, []))
+    @patch('src.validation.Validation.download_single_file')
+    def test_validate_uploads_columnar_files(self, mock_download_file, mock_run_osw_validation):
+        """Test that the GeoParquet files of a valid archive are uploaded next to it."""
+        downloaded_file_path = os.path.join(self.validation.unique_dir_path, 'dataset.zip')
+        open(downloaded_file_path, 'wb').close()
+        os.makedirs(os.path.join(self.validation.unique_dir_path, 'dataset.parquet'))
+        for osw_file in ('edges', 'nodes'):
+            with open(os.path.join(self.validation.unique_dir_path, 'dataset.parquet', f'{osw_file}.parquet'), 'wb') as f:
+                f.write(osw_file.encode())
+        mock_download_file.return_value = downloaded_file_path
+        self.mock_storage_client.get_file_from_url.return_value.name = 'uploads/dataset.zip'
+        uploaded = {}
+        self.validation.client.create_file.side_effect = lambda name: MagicMock(
+            upload=lambda stream: uploaded.__setitem__(name, stream.read()))
+
+        result = self.validation.validate(max_errors=10)
+
+        self.assertTrue(result.is_valid)
+        self.assertEqual(uploaded, {'uploads/dataset.parquet/edges.parquet': b'edges',
+                                    'uploads/dataset.parquet/nodes.parquet': b'nodes'})
+        self.assertIn('columnar', self.validation.job_metrics.stages)
+        self.assertFalse(os.path.exists(self.validation.unique_dir_path))
+
+    @patch('src.validation.Validation.run_osw_validation', return_value=(False, [{'filename': 'edges'}]))
+    @patch('src.validation.Validation.download_single_file')
+    def test_validate_invalid_archive_uploads_nothing(self, mock_download_file, mock_run_osw_validation):
+        """Test that nothing is uploaded for an invalid archive."""
+        downloaded_file_path = os.path.join(self.validation.unique_dir_path, 'dataset.zip')
+        open(downloaded_file_path, 'wb').close()
+        os.makedirs(os.path.join(self.validation.unique_dir_path, 'dataset.parquet'))
+        open(os.path.join(self.validation.unique_dir_path, 'dataset.parquet', 'edges.parquet'), 'wb').close()
+        mock_download_file.return_value = downloaded_file_path
+
+        self.assertFalse(self.validation.validate(max_errors=10).is_valid)
+
+        self.validation.client.create_file.assert_not_called()
+        self.assertFalse(os.path.exists(self.validation.unique_dir_path))
+
     @patch('src.validation.Validation.download_single_file')
     def test_validate_unknown_file_format(self, mock_download_file):
         """Test validation failure for unknown file format."""
@@ -185,6 +312,22 @@ class TestValidation(unittest.TestCase):
         # Ensure cleanup methods are called for valid paths
         mock_remove.assert_called_once_with(f'{SAVED_FILE_PATH}/{SUCCESS_FILE_NAME}')
 
+    def test_download_single_file_streams_to_disk(self):
+        """Test that download_single_file writes the blob through the chunked downloader."""
+        file_mock = MagicMock(spec=['get_stream', 'file_path'])
+        file_mock.file_path = 'folder/test.zip'
+        file_mock.get_stream.return_value = b'file content'
+        self.validation.storage_client.get_file_from_url.return_value = file_mock
+        self.validation.downloader.chunk_size = 4
+
+        downloaded_path = self.validation.download_single_file(self.file_path)
+
+        self.assertEqual(downloaded_path, os.path.join(self.validation.unique_dir_path, 'test.zip'))
+        with open(downloaded_path, 'rb') as f:
+            self.assertEqual(f.read(), b'file content')
+        self.assertEqual(self.validation.downloader.bytes_downloaded, len(b'file content'))
+        Validation.clean_up(self.validation.unique_dir_path)
+
     @patch('os.remove')
     @patch('os.path.isfile', return_value=True)
     def test_clean_up_file(self, mock_isfile, mock_remove):
@@ -0,0 +1,143 @@
+import os
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+from src.pipeline import PipelineOptions
+from src.validation_engine import ValidationEngine, ValidationEngineError, ValidationTimeoutError, \
+    run_osw_validation
+
+SAVED_FILE_PATH = f'{Path.cwd()}/tests/unit_tests/test_files'
+
+
+class TestRunOSWValidation(unittest.TestCase):
+
+    def test_valid_file(self):
+        result = run_osw_validation(f'{SAVED_FILE_PATH}/valid.zip', 20)
+        self.assertTrue(result['is_valid'])
+
+    def test_invalid_file(self):
+        result = run_osw_validation(f'{SAVED_FILE_PATH}/invalid.zip', 20)
+        self.assertFalse(result['is_valid'])
+        self.assertNotEqual(len(result['issues']), 0)
+
+    def test_reports_metrics(self):
+        metrics = run_osw_validation(f'{SAVED_FILE_PATH}/valid.zip', 20)['metrics']
+        self.assertEqual(set(metrics['stages']), {'extraction', 'schema', 'integrity', 'validation'})
+        self.assertGreaterEqual(metrics['stages']['validation'], metrics['stages']['schema'])
+        self.assertEqual(metrics['feature_counts'], {'edges': 3234, 'nodes': 5817, 'points': 133})
+        self.assertGreaterEqual(metrics['peak_rss_bytes'], 0)
+
+    def test_reports_extraction_when_archive_is_broken(self):
+        metrics = run_osw_validation(f'{SAVED_FILE_PATH}/missing.zip', 20)['metrics']
+        self.assertEqual(set(metrics['stages']), {'extraction', 'validation'})
+        self.assertEqual(metrics['feature_counts'], {})
+
+    def test_fail_fast_uses_pipeline(self):
+        with patch('src.validation_engine.PipelineValidation') as mock_pipeline:
+            mock_pipeline.return_value.validate.return_value.is_valid = True
+            mock_pipeline.return_value.stage_seconds = {'validation': 1.0}
+            mock_pipeline.return_value.feature_counts = {'nodes': 1}
+            result = run_osw_validation(f'{SAVED_FILE_PATH}/valid.zip', 20, PipelineOptions(fail_fast=True))
+        mock_pipeline.return_value.validate.assert_called_once_with(20)
+        self.assertTrue(result['is_valid'])
+        self.assertEqual(result['metrics']['stages'], {'validation': 1.0})
+
+    @patch.dict(os.environ, {'VALIDATION_FAIL_FAST': 'True'})
+    def test_fail_fast_from_settings(self):
+        result = run_osw_validation(f'{SAVED_FILE_PATH}/invalid.zip', 1)
+        self.assertFalse(result['is_valid'])
+        self.assertEqual(len(result['issues']), 1)
+
+
+class TestValidationEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = ValidationEngine(max_workers=1, max_tasks_per_child=2)
+
+    def tearDown(self):
+        self.engine.shutdown()
+
+    def test_workers_start_lazily(self):
+        self.assertEqual(self.engine.worker_count, 0)
+
+    def test_run_in_worker_process(self):
+        valid = self.engine.run(f'{SAVED_FILE_PATH}/valid.zip', 20)
+        invalid = self.engine.run(f'{SAVED_FILE_PATH}/invalid.zip', 20)
+
+        self.assertTrue(valid['is_valid'])
+        self.assertFalse(invalid['is_valid'])
+        self.assertEqual(invalid['issues'][0]['filename'], 'wa.microsoft.graph.edges.OSW.geojson')
+        # The worker is retired once it has served max_tasks_per_child jobs
+        self.assertEqual(self.engine.worker_count, 0)
+
+    def test_worker_is_reused(self):
+        self.engine.run(f'{SAVED_FILE_PATH}/valid.zip', 20)
+        self.assertEqual(self.engine.worker_count, 1)
+
+    @patch('src.validation_engine._Worker')
+    def test_worker_crash_raises(self, mock_worker):
+        mock_worker.return_value.connection.recv.side_effect = EOFError('pipe closed')
+
+        with self.assertRaises(ValidationEngineError):
+            self.engine.run(f'{SAVED_FILE_PATH}/valid.zip', 20)
+        mock_worker.return_value.stop.assert_called_once_with(kill=True)
+        self.assertEqual(self.engine.worker_count, 0)
+
+    @patch('src.validation_engine._Worker')
+    def test_worker_error_raises(self, mock_worker):
+        mock_worker.return_value.connection.recv.return_value = ('error', 'boom')
+        mock_worker.return_value.tasks_done = 0
+
+        with self.assertRaises(ValidationEngineError):
+            self.engine.run(f'{SAVED_FILE_PATH}/valid.zip', 20)
+
+    @patch('src.validation_engine._Worker')
+    def test_timeout_kills_worker(self, mock_worker):
+        self.engine.timeout_seconds = 5
+        mock_worker.return_value.connection.poll.return_value = False
+
+        with self.assertRaises(ValidationTimeoutError) as context:
+            self.engine.run(f'{SAVED_FILE_PATH}/valid.zip', 20)
+        self.assertEqual(context.exception.timeout_seconds, 5)
+        mock_worker.return_value.connection.recv.assert_not_called()
+        mock_worker.return_value.stop.assert_called_once_with(kill=True)
+        self.assertEqual(self.engine.worker_count, 0)
+
+    def test_timeout_stops_running_validation(self):
+        engine = ValidationEngine(max_workers=1, timeout_seconds=0.05)
+        try:
+            engine.run(f'{SAVED_FILE_PATH}/valid.zip', 20)
+            self.fail('The validation should have timed out')
+        except ValidationTimeoutError:
+            pass
+        finally:
+            engine.shutdown()
+        self.assertEqual(engine.worker_count, 0)
+
+    def test_worker_temp_dir_is_removed(self):
+        self.engine.run(f'{SAVED_FILE_PATH}/valid.zip', 20)
+        temp_dir = next(iter(self.engine._workers)).temp_dir
+        self.assertTrue(os.path.isdir(temp_dir))
+        self.engine.shutdown()
+        self.assertFalse(os.path.exists(temp_dir))
+
+    def test_timeout_for(self):
+        path = f'{SAVED_FILE_PATH}/valid.zip'
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        engine = ValidationEngine(timeout_seconds=10, timeout_per_mb_seconds=2)
+        self.assertAlmostEqual(engine.timeout_for(path), 10 + 2 * size_mb)
+        engine.max_timeout_seconds = 10.1
+        self.assertEqual(engine.timeout_for(path), 10.1)
+        self.assertEqual(engine.timeout_for(f'{SAVED_FILE_PATH}/not-there.zip'), 10)
+
+    def test_no_timeout_by_default(self):
+        self.assertIsNone(self.engine.timeout_for(f'{SAVED_FILE_PATH}/valid.zip'))
+
+    def test_run_after_shutdown(self):
+        self.engine.shutdown()
+        with self.assertRaises(ValidationEngineError):
+            self.engine.run(f'{SAVED_FILE_PATH}/valid.zip', 20)
+
+
+if __name__ == '__main__':
+    unittest.main()